@@ -1,15 +1,30 @@
 # api/main.py
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from api.routes import train, predict, backtest
+from api.routes import train, predict, backtest, jobs
+from api.services.model_cache import model_cache
+from api.services.job_service import job_manager
 
-app = FastAPI(title="TrendMind API",description="Backend API for stock movement prediction system",version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the model and latest features once, then keep them current in the background
+    model_cache.refresh()
+    watcher = asyncio.create_task(model_cache.watch())
+    yield
+    watcher.cancel()
+    job_manager.shutdown()
+
+app = FastAPI(title="TrendMind API",description="Backend API for stock movement prediction system",version="1.0.0",lifespan=lifespan)
 
 app.include_router(train.router)
 app.include_router(predict.router)
 app.include_router(backtest.router)
+app.include_router(jobs.router)
 
 # Basic Health Check
 @app.get("/status")
 async def status():
-    return {"status": "OK", "message": "Server running successfully"}
+    snapshot = model_cache.snapshot
+    return {"status": "OK", "message": "Server running successfully", "model_version": snapshot.version if snapshot else None}
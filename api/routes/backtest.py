@@ -2,10 +2,10 @@
 
 from fastapi import APIRouter
 from api.services.backtest_service import run_daily_backtest_service
+from api.services.job_service import job_manager
 
 router = APIRouter()
 
 @router.post("/backtest/daily")
 async def backtest_daily():
-  response = run_daily_backtest_service()
-  return response
\ No newline at end of file
+  return job_manager.submit('backtest_daily', run_daily_backtest_service)
\ No newline at end of file
@@ -0,0 +1,13 @@
+# api/routes/jobs.py
+
+from fastapi import APIRouter, HTTPException
+from api.services.job_service import job_manager
+
+router = APIRouter()
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+  job = job_manager.get(job_id)
+  if job is None:
+    raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+  return job
\ No newline at end of file
@@ -1,5 +1,6 @@
 # api/routes/predict.py
 
+import asyncio
 from fastapi import APIRouter
 from api.services.predict_service import run_daily_prediction_service, get_latest_predictions
 
@@ -7,8 +8,9 @@ router = APIRouter()
 
 @router.post("/predictions/trigger/daily")
 async def predict_daily():
-    response = run_daily_prediction_service()
-    return response
+    # Scoring the loaded snapshot takes well under a second: a thread keeps the event loop free without
+    # a job worker reloading the model and re-syncing the caches
+    return await asyncio.to_thread(run_daily_prediction_service)
 
 @router.get("/predictions/latest")
 async def latest_predictions():
@@ -2,10 +2,13 @@
 
 from fastapi import APIRouter
 from api.services.train_service import run_ensemble_training_service
+from api.services.model_cache import model_cache
+from api.services.job_service import job_manager
 
 router = APIRouter()
 
 @router.post("/train/ensemble")
-async def train_ensemble():
-  response = run_ensemble_training_service()
-  return response
\ No newline at end of file
+async def train_ensemble(incremental: bool = False):
+  # Serve the new version as soon as the job finishes instead of at the next cache poll
+  return job_manager.submit('train_ensemble', run_ensemble_training_service, on_success=model_cache.refresh,
+                            exclusive=True, incremental=incremental)
\ No newline at end of file
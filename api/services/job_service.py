@@ -0,0 +1,111 @@
+# api/services/job_service.py
+
+import json
+import time
+import uuid
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from core.config import API_JOB_WORKERS, API_JOB_HISTORY
+
+FINISHED = ('succeeded', 'failed', 'cancelled')
+
+def _now():
+  return datetime.now().isoformat(timespec="seconds")
+
+def _run_job(fn, kwargs):
+  # Runs in a worker process: the service call plus when it actually started and finished
+  started_at, start = _now(), time.perf_counter()
+  result = fn(**kwargs)
+  return {'result': result, 'started_at': started_at, 'finished_at': _now(), 'run_seconds': round(time.perf_counter() - start, 3)}
+
+class JobManager:
+  # CPU-heavy endpoints hand their service call to a process pool and answer with a job ID at once,
+  # so the event loop keeps serving /status and /jobs while training runs. A submission identical
+  # to a job still queued or running gets that job's ID instead of a second run; with exclusive=True
+  # any job of the same kind counts (two trainings would write the same registry and caches).
+  def __init__(self, workers=API_JOB_WORKERS, history=API_JOB_HISTORY):
+    self.workers = workers
+    self.history = history
+    self._executor = None
+    self._jobs = OrderedDict()  # job id → record, oldest first
+    self._active = {}           # (kind, params) → id of the job still queued or running
+    self._lock = threading.Lock()
+
+  def _pool(self, rebuild=False):
+    if rebuild and self._executor is not None:
+      # A worker died (killed, out of memory): a broken pool refuses every later submit
+      print("[WARNING] Job worker pool broke, starting a new one")
+      self._executor.shutdown(wait=False, cancel_futures=True)
+      self._executor = None
+    if self._executor is None:
+      # spawn: a forked worker would inherit the API's threads and locks (model cache watcher) mid-use
+      self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+    return self._executor
+
+  def submit(self, kind, fn, on_success=None, exclusive=False, **params):
+    key = (kind, None if exclusive else json.dumps(params, sort_keys=True))
+    with self._lock:
+      if key in self._active:
+        return {'status': 'accepted', 'job_id': self._active[key], 'deduplicated': True}
+
+      job_id = uuid.uuid4().hex[:12]
+      job = {'id': job_id, 'kind': kind, 'params': params, 'status': 'queued', 'submitted_at': _now(),
+             'started_at': None, 'finished_at': None, 'run_seconds': None, 'result': None, 'error': None}
+      try:
+        job['future'] = self._pool().submit(_run_job, fn, params)
+      except BrokenProcessPool:
+        job['future'] = self._pool(rebuild=True).submit(_run_job, fn, params)
+      self._jobs[job_id] = job
+      self._active[key] = job_id
+      self._trim()
+
+    job['future'].add_done_callback(lambda future: self._finish(job, key, future, on_success))
+    return {'status': 'accepted', 'job_id': job_id, 'deduplicated': False}
+
+  def _trim(self):
+    # Oldest finished jobs go first; a queued or running job stays reachable by its ID
+    finished = [job_id for job_id, job in self._jobs.items() if job['status'] in FINISHED]
+    for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+      del self._jobs[job_id]
+
+  def _finish(self, job, key, future, on_success):
+    with self._lock:
+      self._active.pop(key, None)
+      if future.cancelled():
+        job['status'] = 'cancelled'
+      elif future.exception() is not None:
+        job.update(status='failed', error=str(future.exception()))
+      else:
+        outcome = future.result()
+        result = outcome.pop('result')
+        job.update(outcome, result=result)
+        # Services report their own failures as {'status': 'error', 'message': ...}
+        failed = isinstance(result, dict) and result.get('status') == 'error'
+        job.update(status='failed' if failed else 'succeeded', error=result.get('message') if failed else None)
+      self._trim()
+    if job['status'] == 'succeeded' and on_success is not None:
+      try:
+        on_success()
+      except Exception as e:
+        print(f"[ERROR] Job {job['id']} follow-up failed: {e}")
+
+  def get(self, job_id):
+    with self._lock:
+      job = self._jobs.get(job_id)
+      if job is None:
+        return None
+      record = {k: v for k, v in job.items() if k != 'future'}
+    if record['status'] == 'queued' and job['future'].running():
+      record['status'] = 'running'
+    return record
+
+  def shutdown(self):
+    if self._executor is not None:
+      self._executor.shutdown(wait=False, cancel_futures=True)
+
+job_manager = JobManager()
@@ -0,0 +1,94 @@
+# api/services/model_cache.py
+
+import asyncio
+import threading
+from datetime import datetime
+import pandas as pd
+
+from core.config import DATA_DIR, ENSEMBLE_MODEL_NAME, MODEL_CACHE_POLL_SECONDS
+from core.features.feature_cache import (cache_path, current_feature_cache, sync_feature_cache, serving_features,
+                                        read_cache_index, latest_cached_date, read_feature_date)
+from core.features.registry import DAILY_FEATURE_COLUMNS
+from core.utils.model_registry import current_version, load_model
+from api.services.job_service import job_manager
+
+class ModelSnapshot:
+  # Everything a prediction request reads. Never modified: a reload builds a new snapshot and swaps
+  # the reference, so a request already holding the old one finishes on the old model.
+  def __init__(self, version, model, meta, features, feature_key):
+    self.version = version
+    self.model = model
+    self.meta = meta
+    self.features = features        # latest date partition of the model's feature cache
+    self.feature_key = feature_key  # (cache dir, latest date, its fingerprint)
+    self.loaded_at = datetime.now().isoformat(timespec="seconds")
+
+class ModelCache:
+  def __init__(self, name=ENSEMBLE_MODEL_NAME, data_dir=DATA_DIR):
+    self.name = name
+    self.data_dir = data_dir
+    self._snapshot = None
+    self._lock = threading.Lock()  # one reload at a time; readers never wait on it
+
+  @property
+  def snapshot(self):
+    # Current snapshot without loading anything (None before the first load)
+    return self._snapshot
+
+  def get(self):
+    snapshot = self._snapshot
+    return snapshot if snapshot is not None else self.refresh()
+
+  def refresh(self, sync=True):
+    # Reloads what changed since the last snapshot: the registry's current version, or the newest
+    # feature partition. Only reads: new bhavcopies are ingested and featurised by a feature_sync job
+    # in a worker process, which reloads the snapshot again when it is done. Until then requests are
+    # served from the cache as it is (the previous trading day).
+    snapshot = self._reload()
+    if sync and snapshot is not None:
+      features = self._features(snapshot.model)
+      if current_feature_cache(features, self.data_dir, ingest=False) is None:
+        job_manager.submit('feature_sync', sync_feature_cache, on_success=lambda: self.refresh(sync=False),
+                           exclusive=True, features=features, data_dir=self.data_dir, verbose=False)
+    return snapshot
+
+  def _features(self, model):
+    return serving_features(list(getattr(model, "feature_names_in_", DAILY_FEATURE_COLUMNS)))
+
+  def _reload(self):
+    with self._lock:
+      old = self._snapshot
+      version = current_version(self.name)
+      if version is None:
+        return old
+
+      if old is not None and old.version == version:
+        model, meta = old.model, old.meta
+      else:
+        model, meta = load_model(self.name, version)
+        print(f"[INFO] Model cache: loaded {self.name} version {version}")
+
+      path = cache_path(self._features(model))
+      latest = latest_cached_date(path)
+      feature_key = (path, latest, read_cache_index(path).get(latest))
+      if old is not None and old.feature_key == feature_key:
+        if old.version == version:
+          return old
+        features = old.features
+      else:
+        features = read_feature_date(path, latest) if latest else pd.DataFrame()
+        print(f"[INFO] Model cache: loaded features for {latest}")
+
+      self._snapshot = ModelSnapshot(version, model, meta, features, feature_key)
+      return self._snapshot
+
+  async def watch(self, interval=MODEL_CACHE_POLL_SECONDS):
+    # Background check for a newly promoted model or a new trading day
+    while True:
+      await asyncio.sleep(interval)
+      try:
+        await asyncio.to_thread(self.refresh)
+      except Exception as e:
+        print(f"[ERROR] Model cache refresh failed: {e}")
+
+model_cache = ModelCache()
@@ -1,15 +1,25 @@
 # api/services/predict_service.py
 
+import threading
 from core.predictor.predict_ensemble import run_ensemble_prediction
+from api.services.model_cache import model_cache
 from sqlalchemy.orm import Session
 from api.db.database import SessionLocal
 from api.db.prediction_model import PredictionDaily
 from datetime import date
 
+_predict_lock = threading.Lock()  # two triggers at once would write the same prediction files
+
 def run_daily_prediction_service():
   try:
-    run_ensemble_prediction()
-    return {'status': 'success', 'message': 'Daily prediction completed'}
+    # Scores the API process's loaded snapshot. Nothing is ingested or featurised here: the model cache
+    # hands that to a feature_sync job and swaps in the new day's features when it is done
+    snapshot = model_cache.get()
+    if snapshot is None:
+      return {'status': 'error', 'message': 'Ensemble model not found'}
+    with _predict_lock:
+      run_ensemble_prediction(model=snapshot.model, latest_df=snapshot.features)
+    return {'status': 'success', 'message': 'Daily prediction completed', 'model_version': snapshot.version}
   except Exception as e:
     return {'status': 'error', 'message': str(e)}
   
@@ -2,9 +2,10 @@
 
 from core.trainer.ensemble_trainer import run_ensemble_training
 
-def run_ensemble_training_service():
+def run_ensemble_training_service(incremental=False):
   try:
-    run_ensemble_training()
-    return {'status': 'success', 'message': 'Ensemble model training completed'}
+    run_ensemble_training(incremental=incremental)
+    mode = 'incremental update' if incremental else 'training'
+    return {'status': 'success', 'message': f'Ensemble model {mode} completed'}
   except Exception as e:
     return {'status': 'error', 'message': str(e)}
\ No newline at end of file
@@ -0,0 +1,88 @@
+# benchmarks/bench_ensemble_memory.py
+# Usage: python -m benchmarks.bench_ensemble_memory [n_symbols] [n_days]
+
+import os
+import sys
+import time
+import resource
+import tempfile
+import contextlib
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+
+def write_synthetic_bhavcopies(data_dir, n_symbols, n_days, seed=42):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, size=(n_days, n_symbols)), axis=0))
+    symbols = [f"SYM{i:04d}" for i in range(n_symbols)]
+
+    os.makedirs(data_dir, exist_ok=True)
+    for day, date in enumerate(pd.bdate_range("2022-01-03", periods=n_days)):
+        close = closes[day]
+        volume = rng.integers(1_000, 1_000_000, n_symbols)
+        pd.DataFrame({
+            "SYMBOL": symbols,
+            "SERIES": "EQ",
+            "OPEN_PRICE": (close * rng.uniform(0.98, 1.02, n_symbols)).round(2),
+            "HIGH_PRICE": (close * 1.03).round(2),
+            "LOW_PRICE": (close * 0.97).round(2),
+            "CLOSE_PRICE": close.round(2),
+            "TTL_TRD_QNTY": volume,
+            "DELIV_QTY": (volume * rng.uniform(0.1, 0.9, n_symbols)).astype(np.int64),
+        }).to_csv(os.path.join(data_dir, date.strftime("%d%m%Y") + ".csv"), index=False)
+
+def max_rss_mb():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def train_in_child(workdir, compact, queue):
+    os.chdir(workdir)
+    from core.features.feature_cache import load_cached_features
+    from core.trainer.ensemble_trainer import run_ensemble_training
+    baseline = max_rss_mb()
+
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        run_ensemble_training(compact=compact)
+        elapsed = time.perf_counter() - start
+        peak = max_rss_mb()
+        # Loaded after the peak is recorded, it is smaller than what training already held
+        frame_mb = load_cached_features(compact=compact).memory_usage(deep=True).sum() / 1e6
+    queue.put((baseline, peak, elapsed, frame_mb))
+
+def run_benchmark(n_symbols=300, n_days=250):
+    repo_root = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="bench_ensemble_")
+    print(f"[INFO] Writing {n_symbols} symbols x {n_days} days of bhavcopies to {workdir}")
+    write_synthetic_bhavcopies(os.path.join(workdir, "data", "bhavcopies"), n_symbols, n_days)
+
+    # Build the store and feature cache up front so both runs only read features and train
+    os.chdir(workdir)
+    sys.path.insert(0, repo_root)
+    from core.features.feature_cache import sync_feature_cache
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        sync_feature_cache()
+    os.chdir(repo_root)
+
+    # Fresh spawned interpreter per mode: ru_maxrss is a high-water mark and never goes down
+    ctx = mp.get_context("spawn")
+    print(f"{'mode':<10} {'frame MB':>10} {'import MB':>10} {'peak MB':>10} {'train MB':>10} {'seconds':>10}")
+    results = {}
+    for name, compact in (("float64", False), ("compact", True)):
+        queue = ctx.Queue()
+        process = ctx.Process(target=train_in_child, args=(workdir, compact, queue))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            print(f"[ERROR] {name} training run failed (exit code {process.exitcode})")
+            return
+        baseline, peak, elapsed, frame_mb = queue.get()
+        results[name] = (peak - baseline, frame_mb)
+        print(f"{name:<10} {frame_mb:>10.1f} {baseline:>10.1f} {peak:>10.1f} {peak - baseline:>10.1f} {elapsed:>10.2f}")
+
+    print(f"\n[RESULT] compact feature frame: {results['compact'][1] / results['float64'][1]:.0%} of float64")
+    print(f"[RESULT] compact peak training RSS: {results['compact'][0] / results['float64'][0]:.0%} of float64")
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run_benchmark(*args)
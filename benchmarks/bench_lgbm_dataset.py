@@ -0,0 +1,57 @@
+# benchmarks/bench_lgbm_dataset.py
+# Usage: python -m benchmarks.bench_lgbm_dataset [n_rows] [n_rounds]
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from lightgbm import LGBMClassifier
+
+from core.features.registry import DAILY_FEATURE_COLUMNS
+from core.trainer.lgbm_dataset import DATASET_FILE, DATASET_PARAMS, load_lgbm_dataset, fit_lgbm_from_dataset
+
+def make_training_set(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n_rows, len(DAILY_FEATURE_COLUMNS))), columns=DAILY_FEATURE_COLUMNS)
+    X.iloc[::17, 3] = np.nan
+    y = (X.iloc[:, :3].sum(axis=1) + rng.normal(0, 2, n_rows) > 0).astype(int)
+    return X, y
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def run_benchmark(n_rows=1_000_000, n_rounds=20):
+    X, y = make_training_set(n_rows)
+    rows = np.arange(0, n_rows * 4 // 5)  # one walk-forward training window
+    print(f"[INFO] {n_rows} rows x {X.shape[1]} features, LightGBM with {n_rounds} rounds")
+
+    workdir = tempfile.mkdtemp(prefix="lgbm_dataset_")
+    try:
+        dataset, build_seconds = timed(lambda: lgb.Dataset(X, label=y.to_numpy(np.float32), params=DATASET_PARAMS).construct())
+        dataset.save_binary(os.path.join(workdir, DATASET_FILE))
+        _, load_seconds = timed(lambda: load_lgbm_dataset(workdir))
+        # What sync_lgbm_dataset does each new trading day: every row re-pushed through the saved bins
+        _, rebuild_seconds = timed(lambda: lgb.Dataset(X, label=y.to_numpy(np.float32), reference=load_lgbm_dataset(workdir),
+                                                       params=DATASET_PARAMS).construct())
+        print(f"{'bin the float matrix':<34} {build_seconds:>8.2f}s")
+        print(f"{'daily rebuild with the saved bins':<34} {rebuild_seconds:>8.2f}s")
+        print(f"{'load the saved binary Dataset':<34} {load_seconds:>8.2f}s")
+
+        estimator = LGBMClassifier(n_estimators=n_rounds, random_state=42, verbose=-1)
+        _, fit_seconds = timed(lambda: estimator.fit(X.iloc[rows], y.iloc[rows]))
+        _, cached_seconds = timed(lambda: fit_lgbm_from_dataset(
+            LGBMClassifier(n_estimators=n_rounds, random_state=42, verbose=-1), load_lgbm_dataset(workdir), rows))
+        print(f"{'fit from X (bins every time)':<34} {fit_seconds:>8.2f}s")
+        print(f"{'fit from the saved Dataset':<34} {cached_seconds:>8.2f}s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run_benchmark(*args)
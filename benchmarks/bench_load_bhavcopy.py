@@ -0,0 +1,48 @@
+# benchmarks/bench_load_bhavcopy.py
+# Usage: python -m benchmarks.bench_load_bhavcopy [repeats]
+
+import os
+import sys
+import time
+import tracemalloc
+
+from core.config import DATA_DIR
+from core.utils.load_bhavcopy import load_bhavcopy
+
+def measure(fn, files, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for path in files:
+            fn(path)
+    elapsed = (time.perf_counter() - start) / (repeats * len(files))
+
+    # Separate pass: tracemalloc slows the parse down and would skew the timing
+    tracemalloc.start()
+    df = fn(files[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, df.memory_usage(deep=True).sum()
+
+def run_benchmark(repeats=5):
+    files = [os.path.join(DATA_DIR, f) for f in sorted(os.listdir(DATA_DIR)) if f.endswith(".csv")]
+    if not files:
+        print(f"[ERROR] No bhavcopies found in {DATA_DIR}")
+        return
+
+    modes = {
+        "current": lambda path: load_bhavcopy(path),
+        "fast": lambda path: load_bhavcopy(path, fast=True),
+    }
+
+    print(f"[INFO] {len(files)} files x {repeats} repeats")
+    print(f"{'mode':<10} {'ms/file':>10} {'peak MB':>10} {'frame MB':>10}")
+    results = {}
+    for name, fn in modes.items():
+        elapsed, peak, frame_bytes = measure(fn, files, repeats)
+        results[name] = elapsed
+        print(f"{name:<10} {elapsed * 1000:>10.2f} {peak / 1e6:>10.2f} {frame_bytes / 1e6:>10.2f}")
+
+    print(f"\n[RESULT] fast path speedup: {results['current'] / results['fast']:.1f}x")
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -1,7 +1,7 @@
 import os
 import pandas as pd
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
-from core.utils.load_multiple_bhavcopies import load_multiple_bhavcopies
+from core.utils.panel_snapshot import load_market_panel
 from core.config import DATA_DIR, DAILY_PREDICTIONS_LATEST_PATH
 
 def run_ensemble_backtest(predictions_file=DAILY_PREDICTIONS_LATEST_PATH):
@@ -13,19 +13,18 @@ def run_ensemble_backtest(predictions_file=DAILY_PREDICTIONS_LATEST_PATH):
 
     prediction_date = pred_df["date"].iloc[0]
 
-    # Load bhavcopies
+    # Only the session after the prediction date is needed: look it up on the panel's date axis
     print("[INFO] Loading bhavcopy data...")
-    bhav_df = load_multiple_bhavcopies(DATA_DIR)
-    bhav_df["date"] = pd.to_datetime(bhav_df["date"])
+    panel = load_market_panel(DATA_DIR)
     pred_date = pd.to_datetime(prediction_date)
-    next_trading_df = bhav_df[bhav_df["date"] > pred_date]
-    
-    if next_trading_df.empty:
+    next_pos = panel.dates.searchsorted(pred_date, side="right")
+
+    if next_pos >= len(panel.dates):
         print("[ERROR] No bhavcopy data available for next trading day after prediction date.")
         return
 
-    next_date = next_trading_df["date"].min()
-    next_day_df = next_trading_df[next_trading_df["date"] == next_date]
+    next_date = panel.dates[next_pos]
+    next_day_df = panel.slice_dates(next_date, next_date).to_long(date_format=None)
 
     # Merge predictions with actual next day prices
     merged = pred_df.merge(next_day_df, on="symbol", how="inner", suffixes=("_pred", "_actual"))
@@ -5,20 +5,35 @@ from datetime import datetime
 # === Data Source ===
 DATA_DIR = "data/bhavcopies"
 MODEL_DIR = "models"
+MODEL_REGISTRY_DIR = f"{MODEL_DIR}/registry"
+MODEL_REGISTRY_KEEP = 10  # versions kept per model on top of the current one and its rollback history
+STORE_DIR = "data/store"
+USE_BHAVCOPY_STORE = True
+INGEST_MANIFEST_PATH = f"{STORE_DIR}/_manifest.json"
+PANEL_SNAPSHOT_PATH = "data/panel_snapshot"
+PANEL_SNAPSHOT_DATE_HEADROOM = 250    # spare sessions per rebuild: new days are appended in place until they run out
+PANEL_SNAPSHOT_SYMBOL_HEADROOM = 250  # spare columns for newly listed symbols
+WEEKLY_BAR_DIR = "data/weekly_bars"
+USE_PANEL_SNAPSHOT = True
+LOADER_WORKERS = None  # None → one worker per CPU core, 1 → parse serially
 TARGET_COLUMN = "target"
+COMPACT_FEATURES = False  # True → float32 features, categorical symbol, datetime64 date
 
 # === Daily Paths ===
-DAILY_MODEL_PATH = f"{MODEL_DIR}/random_forest_model.pkl"
+DAILY_MODEL_NAME = "random_forest_model"
+ENSEMBLE_MODEL_NAME = "ensemble_model"
 DAILY_OUTPUT_DIR = "outputs/daily"
 DAILY_PREDICTIONS_DIR = f"{DAILY_OUTPUT_DIR}/predictions"
 DAILY_BACKTESTS_DIR = f"{DAILY_OUTPUT_DIR}/backtests"
 DAILY_PREDICTIONS_OUTPUT_PATH = f"{DAILY_PREDICTIONS_DIR}/{datetime.now().date()}.csv"
 DAILY_PREDICTIONS_LATEST_PATH = f"{DAILY_PREDICTIONS_DIR}/latest.csv"
 DAILY_BACKTEST_OUTPUT = f"{DAILY_BACKTESTS_DIR}/{datetime.now().date()}.csv"
-DAILY_PROCESSED_PATH = "data/processed_data.csv"
+FEATURE_CACHE_DIR = "data/feature_cache"
+LGBM_DATASET_DIR = "data/lgbm_dataset"  # LightGBM binary Datasets, one per feature cache
+FEATURE_STATE_PATH = f"{MODEL_DIR}/feature_state.npz"
 
 # === Weekly Paths ===
-WEEKLY_MODEL_PATH = f"{MODEL_DIR}/weekly_random_forest.pkl"
+WEEKLY_MODEL_NAME = "weekly_random_forest"
 WEEKLY_OUTPUT_DIR = "outputs/weekly"
 WEEKLY_PREDICTIONS_DIR = f"{WEEKLY_OUTPUT_DIR}/predictions"
 WEEKLY_BACKTESTS_DIR = f"{WEEKLY_OUTPUT_DIR}/backtests"
@@ -27,6 +42,52 @@ WEEKLY_PREDICTIONS_LATEST_PATH = f"{WEEKLY_PREDICTIONS_DIR}/latest.csv"
 WEEKLY_BACKTEST_OUTPUT = f"{WEEKLY_BACKTESTS_DIR}/{datetime.now().date()}.csv"
 WEEKLY_PROCESSED_PATH = "data/weekly_processed.csv"
 
+# === Walk-Forward Validation ===
+CV_SPLITS = 5
+CV_EMBARGO_DAYS = 1  # trading days dropped between train and test on top of the label horizon
+CV_WORKERS = None    # None → one fold per CPU core
+VALIDATION_OUTPUT_DIR = "outputs/validation"
+
+# === Training Threads ===
+TRAIN_CORES = None      # cores one ensemble fit may use; None → every CPU core
+LGBM_CORE_SHARE = 0.15  # fraction of the cores left after LogisticRegression's one given to LightGBM; RF trees get the rest
+
+# === LightGBM Dataset Cache ===
+LGBM_DATASET_CACHE = True        # full-history LightGBM fits read the saved binned Dataset instead of re-binning (never CV folds)
+LGBM_DATASET_REBIN_GROWTH = 0.5  # search new bin boundaries once the rows grew by this fraction since the last search
+
+# === Hyperparameter Search ===
+TUNING_DIR = f"{MODEL_DIR}/tuning"                     # resumable search state, one file per model member
+TUNED_PARAMS_PATH = f"{MODEL_DIR}/tuned_params.json"   # winning settings the trainers build their estimators with
+TUNING_CANDIDATES = 27  # configurations sampled per member for the first rung
+TUNING_ETA = 3          # each rung keeps the best 1/eta candidates and gives them eta x the trading days
+TUNING_MIN_DATES = 60   # fewest trading days (most recent) a rung is scored on; shorter rungs are raised to it and repeats dropped
+TUNING_SPLITS = 3       # walk-forward folds every candidate is scored on
+TUNING_METRIC = "roc_auc"
+TUNING_WORKERS = None   # None → one (candidate, fold) fit per CPU core
+
+# === Feature Pruning ===
+PRUNE_FEATURES = False
+PRUNING_IMPORTANCE = "combined"  # "combined" (RF + LightGBM importances) or "permutation"
+PRUNING_METRIC = "accuracy"
+PRUNING_TOLERANCE = 0.005        # largest accepted drop in mean walk-forward PRUNING_METRIC vs all features
+PRUNING_STEP = 0.2               # fraction of the remaining features dropped per round
+PRUNING_MIN_FEATURES = 5
+PRUNING_PERMUTATION_REPEATS = 5
+
+# === Incremental Retraining ===
+INCREMENTAL_WINDOW_DAYS = 60     # trading days the added LightGBM rounds, RF trees and the LR warm start are fit on
+INCREMENTAL_RF_TREES = 20
+INCREMENTAL_LGBM_ROUNDS = 20
+FULL_REFIT_MAX_UPDATES = 20      # force a full refit after this many incremental updates...
+FULL_REFIT_MAX_DAYS = 30         # ...or once the last full refit is this many calendar days behind the data
+MAX_FOREST_TREES = 500
+
+# === API Model Cache & Jobs ===
+MODEL_CACHE_POLL_SECONDS = 30  # how often the API checks the registry and the feature cache for a newer model or day
+API_JOB_WORKERS = 2            # processes running train / backtest jobs for the API
+API_JOB_HISTORY = 200          # finished jobs kept for GET /jobs/{id}
+
 # === Prediction Filtering ===
 CONFIDENCE_THRESHOLD = 0.6
 CONFIDENCE_BUCKETS = [(0.9, 1.0), (0.7, 0.9), (0.5, 0.7)]
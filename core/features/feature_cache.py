@@ -0,0 +1,222 @@
+# core/features/feature_cache.py
+
+import os
+import json
+import shutil
+import hashlib
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from core.config import DATA_DIR, FEATURE_CACHE_DIR, COMPACT_FEATURES
+from core.features.feature_engineer import compact_frame, create_features
+from core.features.registry import DAILY_FEATURE_COLUMNS, lookback_rows
+from core.utils.atomic_files import file_lock, replace_atomically
+from core.utils.bhavcopy_store import LOCK_FILE, partition_path, list_store_dates, store_is_current, store_paths, sync_store
+from core.utils.ingest_manifest import load_manifest, save_manifest
+from core.utils.panel_snapshot import load_market_panel, lookback_frame
+
+# Source files whose contents define what a feature value means; editing any of them invalidates the cache
+FEATURE_CODE_FILES = ("registry.py", "kernels.py", "feature_engineer.py")
+FEATURE_CACHE_INDEX = "_index.json"
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+
+def feature_code_version():
+    digest = hashlib.sha256()
+    base = os.path.dirname(os.path.abspath(__file__))
+    for name in FEATURE_CODE_FILES:
+        with open(os.path.join(base, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def feature_cache_key(features=DAILY_FEATURE_COLUMNS):
+    digest = hashlib.sha256(feature_code_version().encode())
+    digest.update(json.dumps(list(features)).encode())
+    return digest.hexdigest()[:16]
+
+
+def cache_path(features=DAILY_FEATURE_COLUMNS, cache_dir=FEATURE_CACHE_DIR):
+    return os.path.join(cache_dir, feature_cache_key(features))
+
+
+def serving_features(features):
+    # Feature list whose cache a model's columns are read from. A subset of the daily registry (a
+    # pruned model) reads the full DAILY_FEATURE_COLUMNS cache the trainers keep current, instead of
+    # computing the whole history again into a cache of its own.
+    return list(DAILY_FEATURE_COLUMNS) if set(features) <= set(DAILY_FEATURE_COLUMNS) else list(features)
+
+
+def source_fingerprints(manifest, features=DAILY_FEATURE_COLUMNS):
+    # A date's rows read the trailing lookback window of bhavcopies, and its target reads the
+    # next trading day, so its fingerprint covers those source files. The window is counted in
+    # trading dates while the features count each symbol's own sessions: a symbol back from a
+    # suspension also reads older files, and editing only one of those does not invalidate the date.
+    # Recomputed dates always get the full per-symbol window (see sync_feature_cache).
+    hashes = sorted((entry["date"], entry["sha256"]) for entry in manifest.values())
+    window = lookback_rows(features)
+
+    fingerprints = {}
+    for i, (date_str, _) in enumerate(hashes):
+        sources = hashes[max(0, i - window + 1):i + 2]
+        fingerprints[date_str] = hashlib.sha256(";".join(sha for _, sha in sources).encode()).hexdigest()
+    return fingerprints
+
+
+def read_cache_index(path):
+    return load_manifest(os.path.join(path, FEATURE_CACHE_INDEX))
+
+
+def _write_features(df: pd.DataFrame, date_str: str, path):
+    table = pa.Table.from_pandas(df.drop(columns=["date"]), preserve_index=False)
+    with replace_atomically(partition_path(date_str, path)) as tmp_path:
+        pq.write_table(table, tmp_path)
+
+
+def _stale_runs(dates, stale):
+    # Contiguous runs of stale dates as (first index, last index) into `dates`
+    runs = []
+    for i, date_str in enumerate(dates):
+        if date_str not in stale:
+            continue
+        if runs and runs[-1][1] == i - 1:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+    return runs
+
+
+def _cache_status(features, data_dir, cache_dir, verbose, ingest=True):
+    if ingest:
+        sync_store(data_dir, verbose=verbose)
+    fingerprints = source_fingerprints(load_manifest(store_paths(data_dir)[1]), features)
+
+    path = cache_path(features, cache_dir)
+    index = read_cache_index(path)
+    cached = set(list_store_dates(path))
+    stale = {d for d in fingerprints if index.get(d) != fingerprints[d] or d not in cached}
+    return path, fingerprints, index, cached, stale
+
+
+def current_feature_cache(features=DAILY_FEATURE_COLUMNS, data_dir=DATA_DIR, cache_dir=FEATURE_CACHE_DIR, verbose=False,
+                          ingest=True):
+    # Cache directory if every trading date is already computed from the current bhavcopies, else None
+    # ingest=False: check without writing anything; bhavcopies the store has not ingested yet count as stale
+    if not ingest and not store_is_current(data_dir):
+        return None
+    path, fingerprints, _, cached, stale = _cache_status(features, data_dir, cache_dir, verbose, ingest)
+    if stale or cached - set(fingerprints):
+        return None
+    return path
+
+
+def sync_feature_cache(features=DAILY_FEATURE_COLUMNS, data_dir=DATA_DIR, cache_dir=FEATURE_CACHE_DIR, verbose=True):
+    # Brings the cache for this feature list up to date with the store and returns its directory.
+    # Only dates whose source window changed are recomputed; a new trading day touches two partitions
+    # (itself, and yesterday's target).
+    # One process syncs a cache at a time; a second one waits, then finds the dates already computed
+    with file_lock(os.path.join(cache_path(features, cache_dir), LOCK_FILE)):
+        path, fingerprints, index, cached, stale = _cache_status(features, data_dir, cache_dir, verbose)
+        index_path = os.path.join(path, FEATURE_CACHE_INDEX)
+        dates = sorted(fingerprints)
+
+        for date_str in cached - set(fingerprints):
+            shutil.rmtree(os.path.dirname(partition_path(date_str, path)))
+            index.pop(date_str, None)
+
+        if stale and verbose:
+            print(f"[INFO] Computing features for {len(stale)} of {len(dates)} trading dates into {path}")
+
+        window = lookback_rows(features)
+        # Runs are read off the panel symbol by symbol, already in the (symbol, date) order the kernels need,
+        # led by each symbol's own window - 1 earlier sessions (further back than the calendar for a
+        # symbol that was suspended)
+        panel = load_market_panel(data_dir, verbose=False) if stale else None
+        for first, last in _stale_runs(dates, stale):
+            df = lookback_frame(panel, window, start=dates[first], end=dates[min(last + 1, len(dates) - 1)])
+            computed = create_features(df, predict_mode=False, features=features, presorted=True, compact=False)
+            for date_str, day in computed.groupby("date", sort=True):
+                # Earlier stale dates in the lookback belong to their own run, with their own full window
+                if dates[first] <= date_str <= dates[last] and date_str in stale:
+                    _write_features(day, date_str, path)
+                    index[date_str] = fingerprints[date_str]
+
+            # Index after every run, so an interrupted sync keeps what it finished
+            save_manifest(index, index_path)
+
+        save_manifest(index, index_path)
+        return path
+
+
+def _compact_columns(schema):
+    # Cast numeric columns to float32 inside the scan, so the float64 table is never materialised whole
+    columns = {}
+    for field in schema:
+        is_number = pa.types.is_floating(field.type) or pa.types.is_integer(field.type)
+        if is_number and field.name != "target":
+            # safe=False: volumes above 2**24 round to the nearest float32, as astype would
+            columns[field.name] = ds.field(field.name).cast(pa.float32(), safe=False)
+        else:
+            columns[field.name] = ds.field(field.name)
+    return columns
+
+
+def _to_pandas(table, compact):
+    if not compact:
+        return table.to_pandas()
+
+    df = table.to_pandas(strings_to_categorical=True)
+    # Arrow lists categories in order of appearance; sort them so codes follow symbol order
+    df["symbol"] = df["symbol"].cat.reorder_categories(sorted(df["symbol"].cat.categories))
+    if "date" in df.columns:
+        dates = df["date"].cat
+        df["date"] = pd.to_datetime(dates.categories, format="%Y-%m-%d")[dates.codes]
+    return compact_frame(df)
+
+
+def read_feature_cache(path, start=None, end=None, dates=None, compact=COMPACT_FEATURES) -> pd.DataFrame:
+    available = list_store_dates(path)
+    if dates is not None:
+        wanted = set(dates)
+        available = [d for d in available if d in wanted]
+    if start:
+        available = [d for d in available if d >= start]
+    if end:
+        available = [d for d in available if d <= end]
+    if not available:
+        return pd.DataFrame()
+
+    dataset = ds.dataset(
+        [partition_path(d, path) for d in available],
+        format="parquet",
+        partitioning=PARTITIONING,
+        partition_base_dir=path,
+    )
+    table = dataset.to_table(columns=_compact_columns(dataset.schema)) if compact else dataset.to_table()
+    df = _to_pandas(table, compact)
+    df.sort_values(by=["symbol", "date"], inplace=True, kind="stable")
+    df.reset_index(drop=True, inplace=True)
+    return df
+
+
+def read_feature_date(path, date_str, compact=COMPACT_FEATURES) -> pd.DataFrame:
+    # One partition, one Parquet read: no dataset discovery over the rest of the cache
+    df = _to_pandas(pq.read_table(partition_path(date_str, path)), compact)
+    df["date"] = pd.Timestamp(date_str) if compact else date_str
+    return df
+
+
+def latest_cached_date(path):
+    dates = list_store_dates(path)
+    return dates[-1] if dates else None
+
+
+def load_cached_features(features=DAILY_FEATURE_COLUMNS, data_dir=DATA_DIR, verbose=True, latest_only=False, compact=COMPACT_FEATURES):
+    # Frame with at least `features` (see serving_features)
+    path = sync_feature_cache(serving_features(features), data_dir, verbose=verbose)
+    if latest_only:
+        latest = latest_cached_date(path)
+        return read_feature_date(path, latest, compact) if latest else pd.DataFrame()
+    return read_feature_cache(path, compact=compact)
@@ -0,0 +1,248 @@
+# core/features/kernels.py
+
+import numpy as np
+
+# All kernels take flat arrays sorted by (symbol, date) plus each row's position within its
+# symbol group, and return an array aligned with the input. Windows never cross symbols.
+
+
+def group_positions(symbols: np.ndarray) -> np.ndarray:
+    # Row index within each contiguous run of equal symbols
+    n = len(symbols)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, symbols[1:] != symbols[:-1]])
+    run_lengths = np.diff(np.r_[starts, n])
+    return np.arange(n) - np.repeat(starts, run_lengths)
+
+
+def _window_moments(values: np.ndarray, window: int, positions: np.ndarray):
+    # Trailing-window mean, Σ(y - ȳ)² and Σ(k - k̄)·y (k = 0..window-1, the row's offset in its window)
+    # from prefix and suffix sums inside blocks of `window` rows, like _block_scan: a window is the tail
+    # of one block plus the head of the next. Each run of one symbol inside a block is shifted by its own
+    # mean and the two parts are merged with the pairwise (Chan et al.) update, so no Σy² cancellation on
+    # high-priced scrips and no (n, window) temporaries. Rows without a full window in their symbol are NaN.
+    n = len(values)
+    mean, ssd, sxy = (np.full(n, np.nan) for _ in range(3))
+    if window > n:
+        return mean, ssd, sxy
+
+    run_ids = np.cumsum((positions == 0) | (np.arange(n) % window == 0)) - 1
+    observed = ~np.isnan(values)
+    totals = np.bincount(run_ids, weights=np.where(observed, values, 0.0))
+    counts = np.bincount(run_ids, weights=observed)
+    shifts = np.divide(totals, counts, out=np.zeros(len(totals)), where=counts > 0)[run_ids]
+
+    n_blocks = -(-n // window)
+    deviations = np.zeros(n_blocks * window)  # padding rows stay 0, so the last block's sums stay finite
+    deviations[:n] = values - shifts
+    deviations = deviations.reshape(n_blocks, window)
+    offsets = np.arange(window)
+
+    def scans(terms):
+        prefix = np.cumsum(terms, axis=1).ravel()[:n]
+        suffix = np.cumsum(terms[:, ::-1], axis=1)[:, ::-1].ravel()[:n]
+        return prefix, suffix
+
+    prefix0, suffix0 = scans(deviations)
+    prefix1, suffix1 = scans(deviations * offsets)
+    prefix2, suffix2 = scans(deviations ** 2)
+
+    ends = np.arange(window - 1, n)
+    starts = ends - window + 1
+    split = starts % window             # rows of the window in the next block; 0 when it is one whole block
+    n_a, n_b = window - split, split
+    in_b = split > 0
+    k_mean = (window - 1) / 2
+
+    # Part A: rows starts.. of the first block, offsets t - split. Part B: head of the next block, offsets n_a + t.
+    a0, a1, a2 = suffix0[starts], suffix1[starts] - split * suffix0[starts], suffix2[starts]
+    b0, b1, b2 = (np.where(in_b, scan[ends], 0.0) for scan in (prefix0, prefix1, prefix2))
+    shift_a = shifts[starts]
+    shift_b = np.where(in_b, shifts[ends], shift_a)
+
+    mean_a = shift_a + a0 / n_a
+    mean_b = np.where(in_b, shift_b + b0 / np.maximum(n_b, 1), mean_a)
+    ssd_a = a2 - a0 ** 2 / n_a
+    ssd_b = np.where(in_b, b2 - b0 ** 2 / np.maximum(n_b, 1), 0.0)
+
+    mean[ends] = (n_a * mean_a + n_b * mean_b) / window
+    ssd[ends] = np.maximum(ssd_a + ssd_b + (mean_b - mean_a) ** 2 * n_a * n_b / window, 0.0)
+    # Σ(k - k̄)·y per part on the shifted values; the shifts only enter through their difference
+    centred_a = a1 - k_mean * a0
+    centred_b = b1 + (n_a - k_mean) * b0
+    sum_k_a = n_a * (n_a - 1) / 2 - k_mean * n_a
+    sxy[ends] = centred_a + centred_b + (shift_a - shift_b) * sum_k_a
+
+    outside = positions < window - 1
+    for moment in (mean, ssd, sxy):
+        moment[outside] = np.nan
+    return mean, ssd, sxy
+
+
+def rolling_linregress(values: np.ndarray, window: int, positions: np.ndarray, intercept=False, r2=False):
+    # Least-squares fit of y on x = 0..window-1 for every trailing window, like np.polyfit(x, y, 1).
+    # Centred x keeps the sums well conditioned: slope = Σ(x - x̄)·y / Σ(x - x̄)²
+    values = np.asarray(values, dtype=np.float64)
+    x_centred = np.arange(window) - (window - 1) / 2
+    sxx = (x_centred ** 2).sum()
+
+    mean, syy, sxy = _window_moments(values, window, positions)
+    slope = sxy / sxx
+    result = {"slope": slope}
+    if intercept:
+        result["intercept"] = mean - slope * (window - 1) / 2
+    if r2:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result["r2"] = slope ** 2 * sxx / syy
+
+    return result
+
+
+def rolling_slope(values: np.ndarray, window: int, positions: np.ndarray) -> np.ndarray:
+    return rolling_linregress(values, window, positions)["slope"]
+
+
+# ──────────────────────────────────────────────
+# 🧮 GROUPED ROLLING PRIMITIVES
+# ──────────────────────────────────────────────
+
+def _block_scan(values: np.ndarray, window: int, op):
+    # van Herk / Gil-Werman: prefix and suffix scans inside blocks of `window` rows give every
+    # trailing-window reduction in O(n) for any associative op (the array analogue of a monotonic deque)
+    n = len(values)
+    n_blocks = -(-n // window)
+    padded = np.full(n_blocks * window, np.nan)
+    padded[:n] = values
+    blocks = padded.reshape(n_blocks, window)
+
+    prefix = op.accumulate(blocks, axis=1).ravel()[:n]
+    suffix = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()[:n]
+
+    out = np.full(n, np.nan)
+    if window > n:
+        return out
+    ends = np.arange(window - 1, n)
+    starts = ends - window + 1
+    aligned = starts % window == 0
+    out[ends] = np.where(aligned, suffix[starts], op(suffix[starts], prefix[ends]))
+    return out
+
+
+def rolling_reduce(values: np.ndarray, window: int, positions: np.ndarray, op) -> np.ndarray:
+    # NaN anywhere in the window propagates, matching pandas' default min_periods=window
+    out = _block_scan(np.asarray(values, dtype=np.float64), window, op)
+    out[positions < window - 1] = np.nan
+    return out
+
+
+def rolling_sum(values, window, positions):
+    return rolling_reduce(values, window, positions, np.add)
+
+
+def rolling_mean(values, window, positions):
+    return rolling_sum(values, window, positions) / window
+
+
+def rolling_max(values, window, positions):
+    return rolling_reduce(values, window, positions, np.maximum)
+
+
+def rolling_min(values, window, positions):
+    return rolling_reduce(values, window, positions, np.minimum)
+
+
+def rolling_std(values, window, positions, ddof=1):
+    # Block-shifted running moments (see _window_moments): no Σx² cancellation on high-priced scrips
+    _, ssd, _ = _window_moments(np.asarray(values, dtype=np.float64), window, positions)
+    with np.errstate(divide="ignore", invalid="ignore"):  # window == ddof: NaN, as pandas gives
+        return np.sqrt(ssd / (window - ddof))
+
+
+def shift(values, periods, positions, remaining):
+    # positions / remaining: rows before / after the current one inside the same symbol
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if periods > 0:
+        out[periods:] = values[:-periods]
+        out[positions < periods] = np.nan
+    elif periods < 0:
+        out[:periods] = values[-periods:]
+        out[remaining < -periods] = np.nan
+    else:
+        out[:] = values
+    return out
+
+
+def ewm_mean(values, positions, span=None, alpha=None):
+    # Equivalent of groupby(symbol).transform(lambda x: x.ewm(span=..., adjust=False).mean()).
+    # Rows are laid out as (symbol, position) so the recursion runs once per position for all symbols.
+    if alpha is None:
+        alpha = 2.0 / (span + 1.0)
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 0:
+        return np.zeros(0)
+
+    group_ids = np.cumsum(positions == 0) - 1
+    grid = np.full((group_ids[-1] + 1, positions.max() + 1), np.nan)
+    grid[group_ids, positions] = values
+
+    result = np.full(grid.shape, np.nan)
+    weighted = grid[:, 0].copy()
+    old_wt = np.ones(len(grid))
+    result[:, 0] = weighted
+    for t in range(1, grid.shape[1]):
+        cur = grid[:, t]
+        observed = ~np.isnan(cur)
+        started = ~np.isnan(weighted)
+
+        # Same update rule as pandas' ewm(adjust=False, ignore_na=False)
+        old_wt = np.where(started, old_wt * (1.0 - alpha), old_wt)
+        update = started & observed
+        blended = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        weighted = np.where(update & (weighted != cur), blended, weighted)
+        old_wt = np.where(update, 1.0, old_wt)
+        weighted = np.where(~started & observed, cur, weighted)
+        result[:, t] = weighted
+
+    return result[group_ids, positions]
+
+
+class GroupedRolling:
+    # Feature-pipeline front end for the kernels above. Sort once by (symbol, date), then every
+    # rolling / shift / ewm call is a flat array pass instead of a groupby + Python callback.
+
+    def __init__(self, df, symbol_col="symbol"):
+        symbols = df[symbol_col].to_numpy()
+        self.df = df
+        self.positions = group_positions(symbols)
+        self.remaining = group_positions(symbols[::-1])[::-1]
+
+    def _values(self, col):
+        if isinstance(col, str):
+            return self.df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        return np.asarray(col, dtype=np.float64)
+
+    def rolling(self, col, window, op="mean"):
+        fn = {"mean": rolling_mean, "sum": rolling_sum, "std": rolling_std, "min": rolling_min, "max": rolling_max}[op]
+        return fn(self._values(col), window, self.positions)
+
+    def rolling_many(self, specs):
+        # specs: iterable of (column, window, op); returns {(column, window, op): array}
+        return {(col, window, op): self.rolling(col, window, op) for col, window, op in specs}
+
+    def shift(self, col, periods=1):
+        return shift(self._values(col), periods, self.positions, self.remaining)
+
+    def diff(self, col, periods=1):
+        return self._values(col) - self.shift(col, periods)
+
+    def pct_change(self, col, periods=1):
+        return self._values(col) / self.shift(col, periods) - 1
+
+    def ewm_mean(self, col, span=None, alpha=None):
+        return ewm_mean(self._values(col), self.positions, span=span, alpha=alpha)
+
+    def slope(self, col, window):
+        return rolling_slope(self._values(col), window, self.positions)
@@ -0,0 +1,102 @@
+# core/features/multi_timeframe.py
+
+import numpy as np
+import pandas as pd
+
+from core.config import DATA_DIR
+from core.features.feature_engineer import create_features, prepare_daily_frame
+from core.features.registry import DAILY_FEATURE_COLUMNS
+from core.features.weekly_feature_engineer import create_weekly_features
+from core.utils.aggregate_weekly import week_label
+from core.utils.load_multiple_bhavcopies import load_multiple_bhavcopies
+
+# Weekly columns joined onto daily rows are prefixed so they never collide with daily names
+WEEKLY_CONTEXT_PREFIX = "wk_"
+
+
+def build_weekly_bars(daily: pd.DataFrame) -> pd.DataFrame:
+    # Same bars as aggregate_weekly_data, but read off a frame already sorted by (symbol, date):
+    # each (symbol, week) is a contiguous run of rows, so no second sort or Grouper is needed
+    labels = week_label(daily["date"]).to_numpy()
+    symbols = daily["symbol"].to_numpy()
+    new_run = np.r_[True, (symbols[1:] != symbols[:-1]) | (labels[1:] != labels[:-1])]
+
+    starts = np.flatnonzero(new_run)
+    rows = np.arange(len(daily))
+
+    def first_valid(values):
+        # pandas "first" / "last" skip NaN: pick the first / last row in each run holding a value
+        valid = ~np.isnan(values)
+        first = np.minimum.reduceat(np.where(valid, rows, len(rows)), starts)
+        return np.where(first < len(rows), values[np.minimum(first, len(rows) - 1)], np.nan)
+
+    def last_valid(values):
+        valid = ~np.isnan(values)
+        last = np.maximum.reduceat(np.where(valid, rows, -1), starts)
+        return np.where(last >= 0, values[last], np.nan)
+
+    column = lambda name: daily[name].to_numpy(dtype=np.float64, na_value=np.nan)
+    volume = daily["volume"]
+    if volume.notna().all():
+        volume_sum = np.add.reduceat(volume.to_numpy(), starts)
+    else:
+        volume_sum = np.add.reduceat(np.nan_to_num(column("volume")), starts)
+
+    bars = pd.DataFrame({
+        "symbol": symbols[starts],
+        "date": labels[starts],
+        "open": first_valid(column("open")),
+        "high": np.fmax.reduceat(column("high"), starts),
+        "low": np.fmin.reduceat(column("low"), starts),
+        "close": last_valid(column("close")),
+        "volume": volume_sum,
+    })
+    return bars.dropna().reset_index(drop=True)
+
+
+def join_weekly_context(daily: pd.DataFrame, weekly: pd.DataFrame) -> pd.DataFrame:
+    # As-of join: each daily row gets the symbol's last *completed* weekly bar, i.e. the latest one
+    # labelled on or before the Monday that closed the previous week. No lookahead into the current week.
+    context_cols = [col for col in weekly.columns if col not in ("symbol", "date", "target")]
+    right = weekly[["symbol", "date"] + context_cols].rename(
+        columns={"date": "_week", **{col: f"{WEEKLY_CONTEXT_PREFIX}{col}" for col in context_cols}}
+    )
+    right["_week"] = pd.to_datetime(right["_week"]).astype("datetime64[ns]")
+    right.sort_values("_week", inplace=True, kind="stable")
+
+    left = daily.reset_index(drop=True)
+    left["_row"] = np.arange(len(left))
+    left["_asof"] = week_label(left["date"]) - pd.Timedelta(days=7)
+    left.sort_values("_asof", inplace=True, kind="stable")
+
+    joined = pd.merge_asof(left, right, left_on="_asof", right_on="_week", by="symbol", direction="backward")
+    joined.sort_values("_row", inplace=True)
+    return joined.drop(columns=["_row", "_asof", "_week"]).reset_index(drop=True)
+
+
+def create_multi_timeframe_features(df: pd.DataFrame, features=DAILY_FEATURE_COLUMNS, predict_mode=False, weekly_context=False):
+    # One typed copy and one (symbol, date) sort feed both timeframes. Returns (daily, weekly) frames
+    # equal to create_features / create_weekly_features(aggregate_weekly_data(...)) on the same input.
+    if df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    daily_sorted = prepare_daily_frame(df)
+    daily = create_features(daily_sorted, predict_mode=predict_mode, features=features, presorted=True)
+
+    # Weekly features are built over every bar: the as-of join needs the completed weeks even when
+    # only the latest bar is returned
+    weekly = create_weekly_features(build_weekly_bars(daily_sorted), predict_mode=False, presorted=True)
+
+    if weekly_context:
+        daily = join_weekly_context(daily, weekly)
+
+    if predict_mode:
+        weekly = weekly[weekly["date"] == weekly["date"].max()].drop(columns=["target"])
+
+    return daily, weekly
+
+
+def run_feature_job(data_dir=DATA_DIR, features=DAILY_FEATURE_COLUMNS, predict_mode=False, weekly_context=False, days=None):
+    df = load_multiple_bhavcopies(data_dir, days=days)
+    print(f"[INFO] Loaded {len(df)} rows of raw bhavcopy data")
+    return create_multi_timeframe_features(df, features, predict_mode=predict_mode, weekly_context=weekly_context)
@@ -0,0 +1,218 @@
+# core/features/online_state.py
+
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+
+from core.config import FEATURE_STATE_PATH
+from core.features.feature_cache import feature_code_version
+from core.features.registry import EMA_SPAN, OUTPUT_FEATURES
+from core.utils.atomic_files import replace_atomically
+
+# Trailing rows kept per symbol; each is the longest window any daily feature reads from that series
+BUFFER_LENGTHS = {
+    "close": 20,      # 20-day Bollinger bands, return_5d, slope_close_5d
+    "high": 5,        # position_in_range_5d
+    "low": 5,
+    "hl_range": 5,    # atr_5 / atr_volatility / range_compression_ratio
+    "volume": 3,      # volume_spike_ratio
+    "dm": 14,         # trend_zone_strength
+    "bb_width": 20,   # volatility_squeeze
+}
+
+RAW_COLUMNS = ["symbol", "open", "high", "low", "close", "volume", "deliverable_qty", "date"]
+
+# Same columns and order as create_features, so the frame can go straight into a model trained on it
+FEATURE_COLUMNS = list(OUTPUT_FEATURES)
+
+
+def state_code_version():
+    # The feature definitions plus the incremental formulas below: a checkpoint written by other code is
+    # rebuilt rather than rolled forward
+    digest = hashlib.sha256(feature_code_version().encode())
+    with open(os.path.abspath(__file__), "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+class OnlineFeatureState:
+    # Per-symbol rolling state for the daily feature set. Applying one bhavcopy pushes each traded
+    # symbol's values into its buffers and emits that day's feature rows in O(symbols).
+
+    def __init__(self, symbols=(), buffers=None, ewm=None, ewm_weight=None, last_date=None, latest=None):
+        self.symbols = [str(symbol) for symbol in symbols]
+        self.slot = {symbol: i for i, symbol in enumerate(self.symbols)}
+        n = len(self.symbols)
+        self.buffers = buffers or {name: np.full((n, length), np.nan) for name, length in BUFFER_LENGTHS.items()}
+        self.ewm = ewm if ewm is not None else np.full(n, np.nan)
+        self.ewm_weight = ewm_weight if ewm_weight is not None else np.ones(n)
+        self.last_date = last_date
+        self.latest = latest if latest is not None else pd.DataFrame(columns=RAW_COLUMNS + FEATURE_COLUMNS)
+
+    # ──────────────────────────────────────────────
+    # 💾 CHECKPOINTING
+    # ──────────────────────────────────────────────
+
+    def save(self, path=FEATURE_STATE_PATH):
+        arrays = {f"buffer__{name}": values for name, values in self.buffers.items()}
+        arrays.update({f"latest__{col}": self.latest[col].to_numpy() for col in self.latest.columns})
+
+        # Through a file object: given a path without .npz, np.savez would write beside it
+        with replace_atomically(path) as tmp_path, open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                code_version=np.array(state_code_version(), dtype=str),
+                symbols=np.array(self.symbols, dtype=str),
+                ewm=self.ewm,
+                ewm_weight=self.ewm_weight,
+                last_date=np.array(self.last_date or "", dtype=str),
+                **{key: (values.astype(str) if values.dtype == object else values) for key, values in arrays.items()},
+            )
+
+    @classmethod
+    def load(cls, path=FEATURE_STATE_PATH):
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path) as data:
+            if "code_version" not in data or str(data["code_version"]) != state_code_version():
+                print(f"[INFO] Feature state at {path} was written by other feature code, ignoring it")
+                return None
+            buffers = {name: data[f"buffer__{name}"] for name in BUFFER_LENGTHS}
+            latest = pd.DataFrame({col: data[f"latest__{col}"] for col in RAW_COLUMNS + FEATURE_COLUMNS})
+            return cls(
+                symbols=data["symbols"].tolist(),
+                buffers=buffers,
+                ewm=data["ewm"],
+                ewm_weight=data["ewm_weight"],
+                last_date=str(data["last_date"]) or None,
+                latest=latest,
+            )
+
+    # ──────────────────────────────────────────────
+    # 🔄 DAILY UPDATE
+    # ──────────────────────────────────────────────
+
+    def _slots(self, symbols):
+        new_symbols = [symbol for symbol in dict.fromkeys(symbols) if symbol not in self.slot]
+        if new_symbols:
+            for symbol in new_symbols:
+                self.slot[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+            grow = len(new_symbols)
+            self.buffers = {name: np.vstack([values, np.full((grow, values.shape[1]), np.nan)]) for name, values in self.buffers.items()}
+            self.ewm = np.r_[self.ewm, np.full(grow, np.nan)]
+            self.ewm_weight = np.r_[self.ewm_weight, np.ones(grow)]
+        return np.array([self.slot[symbol] for symbol in symbols], dtype=np.int64)
+
+    def _push(self, name, slots, values):
+        buffer = self.buffers[name]
+        buffer[slots, :-1] = buffer[slots, 1:]
+        buffer[slots, -1] = values
+
+    def update(self, day: pd.DataFrame, date_str: str) -> pd.DataFrame:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self._update(day, date_str)
+
+    def _update(self, day: pd.DataFrame, date_str: str) -> pd.DataFrame:
+        if self.last_date is not None and date_str <= self.last_date:
+            raise ValueError(f"Feature state is already at {self.last_date}, cannot apply {date_str}")
+
+        day = day.drop_duplicates(subset="symbol").sort_values("symbol")
+        symbols = day["symbol"].astype(str).tolist()
+        slots = self._slots(symbols)
+
+        o, h, l, c = (day[col].to_numpy(dtype=np.float64) for col in ("open", "high", "low", "close"))
+        volume = pd.to_numeric(day["volume"], errors="coerce").to_numpy(dtype=np.float64)
+        deliverable = pd.to_numeric(day["deliverable_qty"], errors="coerce").to_numpy(dtype=np.float64)
+
+        prev_close = self.buffers["close"][slots, -1]
+        prev_high = self.buffers["high"][slots, -1]
+        prev_low = self.buffers["low"][slots, -1]
+
+        hl_range = (h - l) / c
+        up_move = h - prev_high
+        down_move = np.abs(l - prev_low)
+        dm = np.where(up_move > down_move, up_move, 0)
+
+        self._push("close", slots, c)
+        self._push("high", slots, h)
+        self._push("low", slots, l)
+        self._push("hl_range", slots, hl_range)
+        self._push("volume", slots, volume)
+        self._push("dm", slots, dm)
+
+        closes = self.buffers["close"][slots]
+        bb_mean = closes.mean(axis=1)
+        bb_std = closes.std(axis=1, ddof=1)
+        bb_width = ((bb_mean + 2 * bb_std) - (bb_mean - 2 * bb_std)) / bb_mean
+        self._push("bb_width", slots, bb_width)
+
+        # ewm(span=5, adjust=False) recursion, same update rule as pandas
+        alpha = 2.0 / (EMA_SPAN + 1.0)
+        weighted = self.ewm[slots]
+        started = ~np.isnan(weighted)
+        observed = ~np.isnan(c)
+        old_weight = np.where(started, self.ewm_weight[slots] * (1.0 - alpha), self.ewm_weight[slots])
+        update = started & observed
+        blended = (old_weight * weighted + alpha * c) / (old_weight + alpha)
+        weighted = np.where(update & (weighted != c), blended, weighted)
+        self.ewm[slots] = np.where(~started & observed, c, weighted)
+        self.ewm_weight[slots] = np.where(update, 1.0, old_weight)
+
+        hl_window = self.buffers["hl_range"][slots]
+        slope_window = closes[:, -5:]
+        x_centred = np.arange(5) - 2.0
+
+        features = {
+            "price_change_t-1": c / prev_close - 1,
+            "deliv_ratio": deliverable / volume,
+            "hl_range": hl_range,
+            "range_compression_ratio": hl_range / hl_window[:, -3:].mean(axis=1),
+            "gap_pct": o / prev_close - 1,
+            "body_to_range_ratio": np.abs(c - o) / hl_range,
+            "atr_5": hl_window.mean(axis=1),
+            "atr_volatility": hl_window.std(axis=1, ddof=1),
+            "return_3d": c / closes[:, -4] - 1,
+            "return_5d": c / closes[:, -6] - 1,
+            "distance_from_ema_5": c - self.ewm[slots],
+        }
+        high_5d = self.buffers["high"][slots].max(axis=1)
+        low_5d = self.buffers["low"][slots].min(axis=1)
+        features["position_in_range_5d"] = (c - low_5d) / (high_5d - low_5d)
+        features["lower_wick_pct"] = (np.minimum(o, c) - l) / c
+        features["upper_wick_pct"] = (h - np.maximum(o, c)) / c
+        features["slope_close_5d"] = slope_window @ x_centred / (x_centred ** 2).sum()
+        features["volume_spike_ratio"] = volume / self.buffers["volume"][slots].mean(axis=1)
+        features["momentum_divergence"] = features["return_3d"] / features["volume_spike_ratio"]
+        features["closing_strength"] = (c - l) / (h - l)
+        features["volatility_squeeze"] = bb_width / self.buffers["bb_width"][slots].mean(axis=1)
+        features["trend_zone_strength"] = self.buffers["dm"][slots].mean(axis=1)
+
+        out = pd.DataFrame({
+            "symbol": symbols,
+            "open": o, "high": h, "low": l, "close": c,
+            "volume": volume, "deliverable_qty": deliverable,
+            "date": date_str,
+        })
+        for col in FEATURE_COLUMNS:
+            out[col] = features[col]
+
+        self.last_date = date_str
+        self.latest = out
+        return out
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Replays every date in df newer than the checkpoint; returns the newest day's rows
+        if self.last_date is not None:
+            df = df[df["date"] > self.last_date]
+        for date_str, day in df.groupby("date", sort=True):
+            self.update(day, date_str)
+        return self.latest
+
+
+def build_feature_state(df: pd.DataFrame) -> OnlineFeatureState:
+    state = OnlineFeatureState()
+    state.apply(df)
+    return state
@@ -0,0 +1,237 @@
+# core/features/registry.py
+
+from dataclasses import dataclass
+from typing import Callable, Tuple
+import numpy as np
+
+from core.features.kernels import GroupedRolling
+
+# Bhavcopy columns every feature ultimately reads from
+RAW_COLUMNS = ("open", "high", "low", "close", "volume", "deliverable_qty")
+
+# Bollinger window is the longest lookback of any feature; volatility_squeeze smooths its width again
+BB_WINDOW = 20
+BB_WIDTH_SMOOTHING = 20
+# ewm(adjust=False) never forgets; after 60 rows the truncated history weighs (2/3)^60 ≈ 3e-11
+EMA_SPAN = 5
+EMA_WARMUP_DAYS = 60
+
+
+@dataclass(frozen=True)
+class Feature:
+    name: str
+    inputs: Tuple[str, ...]
+    window: int                 # trailing rows of its inputs one value reads (1 = same row only)
+    compute: Callable
+    dtype: str = "float64"
+    output: bool = True         # False for intermediates that are never returned as columns
+
+
+FEATURE_REGISTRY = {}
+
+
+def feature(name, inputs, window=1, dtype="float64", output=True):
+    def register(fn):
+        FEATURE_REGISTRY[name] = Feature(name, tuple(inputs), window, fn, dtype, output)
+        return fn
+    return register
+
+
+class FeatureContext:
+    # Holds the (symbol, date)-sorted frame and every value computed so far, so shared
+    # intermediates (hl_range, return_3d, the Bollinger mean, ...) are computed once
+    def __init__(self, df):
+        self.df = df
+        self.g = GroupedRolling(df)
+        self.values = {}
+
+    def __getitem__(self, name):
+        if name in self.values:
+            return self.values[name]
+        return self.df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+# ──────────────────────────────────────────────
+# 📦 PHASE 1 – PRICE & VOLUME CORE FEATURES
+# ──────────────────────────────────────────────
+
+@feature("price_change_t-1", ["close"], window=2)
+def _price_change(ctx):
+    return ctx.g.pct_change(ctx["close"])
+
+@feature("deliv_ratio", ["deliverable_qty", "volume"])
+def _deliv_ratio(ctx):
+    return ctx["deliverable_qty"] / ctx["volume"]
+
+@feature("hl_range", ["high", "low", "close"])
+def _hl_range(ctx):
+    return (ctx["high"] - ctx["low"]) / ctx["close"]
+
+@feature("range_compression_ratio", ["hl_range"], window=3)
+def _range_compression_ratio(ctx):
+    return ctx["hl_range"] / ctx.g.rolling(ctx["hl_range"], 3, "mean")
+
+@feature("gap_pct", ["open", "close"], window=2)
+def _gap_pct(ctx):
+    return ctx["open"] / ctx.g.shift(ctx["close"], 1) - 1
+
+@feature("body_to_range_ratio", ["open", "close", "hl_range"])
+def _body_to_range_ratio(ctx):
+    return np.abs(ctx["close"] - ctx["open"]) / ctx["hl_range"]
+
+@feature("atr_5", ["hl_range"], window=5)
+def _atr_5(ctx):
+    return ctx.g.rolling(ctx["hl_range"], 5, "mean")
+
+@feature("atr_volatility", ["hl_range"], window=5)
+def _atr_volatility(ctx):
+    return ctx.g.rolling(ctx["hl_range"], 5, "std")
+
+# ──────────────────────────────────────────────
+# 📈 PHASE 2 – TREND, MOMENTUM & POSITIONING
+# ──────────────────────────────────────────────
+
+@feature("return_3d", ["close"], window=4)
+def _return_3d(ctx):
+    return ctx.g.pct_change(ctx["close"], 3)
+
+@feature("return_5d", ["close"], window=6)
+def _return_5d(ctx):
+    return ctx.g.pct_change(ctx["close"], 5)
+
+@feature("ema_5", ["close"], window=EMA_WARMUP_DAYS, output=False)
+def _ema_5(ctx):
+    return ctx.g.ewm_mean(ctx["close"], span=EMA_SPAN)
+
+@feature("distance_from_ema_5", ["close", "ema_5"])
+def _distance_from_ema_5(ctx):
+    return ctx["close"] - ctx["ema_5"]
+
+@feature("high_5d", ["high"], window=5, output=False)
+def _high_5d(ctx):
+    return ctx.g.rolling(ctx["high"], 5, "max")
+
+@feature("low_5d", ["low"], window=5, output=False)
+def _low_5d(ctx):
+    return ctx.g.rolling(ctx["low"], 5, "min")
+
+@feature("position_in_range_5d", ["close", "high_5d", "low_5d"])
+def _position_in_range_5d(ctx):
+    return (ctx["close"] - ctx["low_5d"]) / (ctx["high_5d"] - ctx["low_5d"])
+
+# ──────────────────────────────────────────────
+# 🕯️ PHASE 3 – CANDLE ANATOMY & TREND STRENGTH
+# ──────────────────────────────────────────────
+
+@feature("lower_wick_pct", ["open", "low", "close"])
+def _lower_wick_pct(ctx):
+    return (np.minimum(ctx["open"], ctx["close"]) - ctx["low"]) / ctx["close"]
+
+@feature("upper_wick_pct", ["open", "high", "close"])
+def _upper_wick_pct(ctx):
+    return (ctx["high"] - np.maximum(ctx["open"], ctx["close"])) / ctx["close"]
+
+@feature("slope_close_5d", ["close"], window=5)
+def _slope_close_5d(ctx):
+    # Closed-form least-squares slope over each symbol's trailing 5 closes (same values as np.polyfit)
+    return ctx.g.slope(ctx["close"], 5)
+
+# ──────────────────────────────────────────────
+# 🔀 PHASE 4 – COMPOSITE & DIVERGENCE SIGNALS
+# ──────────────────────────────────────────────
+
+@feature("volume_spike_ratio", ["volume"], window=3)
+def _volume_spike_ratio(ctx):
+    return ctx["volume"] / ctx.g.rolling(ctx["volume"], 3, "mean")
+
+@feature("momentum_divergence", ["return_3d", "volume_spike_ratio"])
+def _momentum_divergence(ctx):
+    return ctx["return_3d"] / ctx["volume_spike_ratio"]
+
+# ──────────────────────────────────────────────
+# 🧠 PHASE 5 – CONVICTION SIGNALS
+# ──────────────────────────────────────────────
+
+@feature("closing_strength", ["high", "low", "close"])
+def _closing_strength(ctx):
+    return (ctx["close"] - ctx["low"]) / (ctx["high"] - ctx["low"])
+
+# ──────────────────────────────────────────────
+# 🚀 PHASE 6 – VOLATILITY & TREND ZONE SIGNALS
+# ──────────────────────────────────────────────
+
+@feature("bb_width", ["close"], window=BB_WINDOW, output=False)
+def _bb_width(ctx):
+    # Bollinger Band Width normalized
+    rolling_mean = ctx.g.rolling(ctx["close"], BB_WINDOW, "mean")
+    rolling_std = ctx.g.rolling(ctx["close"], BB_WINDOW, "std")
+    upper_bb = rolling_mean + (2 * rolling_std)
+    lower_bb = rolling_mean - (2 * rolling_std)
+    return (upper_bb - lower_bb) / rolling_mean
+
+@feature("volatility_squeeze", ["bb_width"], window=BB_WIDTH_SMOOTHING)
+def _volatility_squeeze(ctx):
+    return ctx["bb_width"] / ctx.g.rolling(ctx["bb_width"], BB_WIDTH_SMOOTHING, "mean")
+
+@feature("directional_move", ["high", "low"], window=2, output=False)
+def _directional_move(ctx):
+    # ADX-like trend strength approximation (directional movement range)
+    up_move = ctx.g.diff(ctx["high"])
+    down_move = np.abs(ctx.g.diff(ctx["low"]))
+    return np.where(up_move > down_move, up_move, 0)
+
+@feature("trend_zone_strength", ["directional_move"], window=14)
+def _trend_zone_strength(ctx):
+    return ctx.g.rolling(ctx["directional_move"], 14, "mean")
+
+
+# ──────────────────────────────────────────────
+# 🧭 DAG RESOLUTION
+# ──────────────────────────────────────────────
+
+OUTPUT_FEATURES = [name for name, spec in FEATURE_REGISTRY.items() if spec.output]
+# Model input columns in training order: raw bhavcopy columns, then every output feature
+DAILY_FEATURE_COLUMNS = list(RAW_COLUMNS) + OUTPUT_FEATURES
+
+
+def resolve(names):
+    # Topological order of everything needed to produce `names`, dependencies first
+    order, done = [], set()
+
+    def visit(name, path):
+        if name in done or name in RAW_COLUMNS:
+            return
+        if name not in FEATURE_REGISTRY:
+            raise KeyError(f"Unknown feature: {name}")
+        if name in path:
+            raise ValueError(f"Feature dependency cycle: {' → '.join(path + (name,))}")
+        for dependency in FEATURE_REGISTRY[name].inputs:
+            visit(dependency, path + (name,))
+        done.add(name)
+        order.append(name)
+
+    for name in names:
+        visit(name, ())
+    return order
+
+
+def lookback_rows(names):
+    # Trailing rows per symbol needed so every requested value on the newest row is exact
+    memo = {}
+
+    def rows(name):
+        if name in RAW_COLUMNS:
+            return 1
+        if name not in memo:
+            spec = FEATURE_REGISTRY[name]
+            memo[name] = spec.window + max(rows(dependency) for dependency in spec.inputs) - 1
+        return memo[name]
+
+    return max((rows(name) for name in names), default=1)
+
+
+def compute(ctx: FeatureContext, names):
+    for name in resolve(names):
+        if name not in ctx.values:
+            ctx.values[name] = FEATURE_REGISTRY[name].compute(ctx)
+    return ctx
@@ -1,34 +1,43 @@
 import os
 import pandas as pd
-import joblib
-from core.config import (CONFIDENCE_THRESHOLD,DAILY_PREDICTIONS_DIR,DAILY_PREDICTIONS_LATEST_PATH,MODEL_DIR)
+from core.config import (CONFIDENCE_THRESHOLD,DAILY_PREDICTIONS_DIR,DAILY_PREDICTIONS_LATEST_PATH,ENSEMBLE_MODEL_NAME)
+from core.features.feature_cache import load_cached_features
+from core.features.registry import DAILY_FEATURE_COLUMNS
 from core.utils.dates import get_next_trading_day
+from core.utils.model_registry import load_model
+from core.predictor.scoring import predict_with_proba
 from core.utils.top_signals import print_top_signals
 
-ENSEMBLE_MODEL_PATH = os.path.join(MODEL_DIR, "ensemble_model.pkl")
-PROCESSED_DATA_PATH = "data/processed_data.csv"
-
-def run_ensemble_prediction(prediction_threshold=CONFIDENCE_THRESHOLD):
-    if not os.path.exists(ENSEMBLE_MODEL_PATH):
+def run_ensemble_prediction(prediction_threshold=CONFIDENCE_THRESHOLD, model=None, latest_df=None):
+    # model / latest_df: already in memory (the API's model cache), otherwise read from the
+    # registry and the feature cache
+    if model is None:
+        model, _ = load_model(ENSEMBLE_MODEL_NAME)
+    if model is None:
         print("[ERROR] Ensemble model not found. Please run ensemble_trainer.py first.")
         return
 
-    print("[INFO] Loading processed data...")
-    df = pd.read_csv(PROCESSED_DATA_PATH)
-    if df.empty:
+    model_features = list(getattr(model, "feature_names_in_", DAILY_FEATURE_COLUMNS))
+
+    if latest_df is None:
+        # Reads only the newest date partition of the feature cache
+        print("[INFO] Loading latest features...")
+        latest_df = load_cached_features(model_features, latest_only=True)
+    else:
+        latest_df = latest_df.copy()
+    if latest_df.empty:
         print("[WARNING] Processed data is empty.")
         return
 
-    latest_date = df["date"].max()
-    latest_df = df[df["date"] == latest_date].copy()
+    latest_date = pd.Timestamp(latest_df["date"].iloc[0]).strftime("%Y-%m-%d")
 
-    X = latest_df.drop(columns=["symbol", "date", "target"], errors="ignore")
+    X = latest_df[model_features]
     X = X.fillna(0)
 
-    model = joblib.load(ENSEMBLE_MODEL_PATH)
-
-    latest_df["prediction_class"] = model.predict(X)
-    latest_df["confidence"] = model.predict_proba(X).max(axis=1)
+    # Class and confidence from one pass over the ensemble
+    predictions, proba = predict_with_proba(model, X)
+    latest_df["prediction_class"] = predictions
+    latest_df["confidence"] = proba.max(axis=1)
     latest_df["prediction"] = latest_df["prediction_class"].map({1: "bullish", 0: "bearish"})
 
     final_pred_df = latest_df[latest_df["confidence"] >= prediction_threshold].copy()
@@ -3,12 +3,17 @@
 import os
 from datetime import datetime, timedelta
 import pandas as pd
-import joblib
 
-from core.config import (DATA_DIR, DAILY_MODEL_PATH,DAILY_PREDICTIONS_DIR, DAILY_PREDICTIONS_LATEST_PATH,CONFIDENCE_THRESHOLD, CONFIDENCE_BUCKETS)
+from core.config import (DATA_DIR, DAILY_MODEL_NAME, FEATURE_STATE_PATH,DAILY_PREDICTIONS_DIR, DAILY_PREDICTIONS_LATEST_PATH,CONFIDENCE_THRESHOLD, CONFIDENCE_BUCKETS)
 from core.utils.load_multiple_bhavcopies import load_multiple_bhavcopies
+from core.utils.panel_snapshot import load_market_panel, lookback_frame
 from core.utils.dates import get_next_trading_day
+from core.utils.model_registry import current_version, load_model
+from core.predictor.scoring import predict_with_proba
+from core.features.online_state import FEATURE_COLUMNS, OnlineFeatureState, build_feature_state
+from core.features.feature_cache import current_feature_cache, serving_features, latest_cached_date, read_feature_date
 from core.features.feature_engineer import create_features
+from core.features.registry import DAILY_FEATURE_COLUMNS, lookback_rows
 
 def run_daily_prediction(prediction_threshold = CONFIDENCE_THRESHOLD):
     today = datetime.now()
@@ -16,27 +21,58 @@ def run_daily_prediction(prediction_threshold = CONFIDENCE_THRESHOLD):
         print("[INFO] Weekend detected. No prediction will be made.")
         return
 
-    if not os.path.exists(DAILY_MODEL_PATH):
+    if current_version(DAILY_MODEL_NAME) is None:
         print("[ERROR] Trained model not found. Please run trainer.py first.")
         return
 
-    print("[INFO] Loading bhavcopies...")
-    df = load_multiple_bhavcopies(DATA_DIR)
-    features = create_features(df, predict_mode=True)
+    model, _ = load_model(DAILY_MODEL_NAME)
+    # Request exactly the columns the model was fitted on
+    model_features = list(getattr(model, "feature_names_in_", DAILY_FEATURE_COLUMNS))
+
+    # A feature cache already current with every bhavcopy (e.g. right after training) is read as is
+    cache_dir = current_feature_cache(serving_features(model_features), DATA_DIR)
+    # ⚡ Otherwise roll the checkpointed per-symbol state forward over only the bhavcopies it has not seen
+    state = OnlineFeatureState.load(FEATURE_STATE_PATH) if cache_dir is None else None
+    if cache_dir is not None:
+        latest_date = latest_cached_date(cache_dir)
+        print(f"[INFO] Reading cached features for {latest_date}...")
+        features = read_feature_date(cache_dir, latest_date)
+    elif state is None or not set(model_features) <= set(state.latest.columns):
+        # No usable checkpoint (none written by run_daily_training yet, or written by other feature code):
+        # compute over the lookback window only, counted in each symbol's own sessions so a symbol back
+        # from a suspension still gets all its rows
+        rebuild = set(model_features) <= set(FEATURE_COLUMNS)
+        lookback = lookback_rows(FEATURE_COLUMNS if rebuild else model_features)
+        print(f"[INFO] No usable feature state checkpoint, loading each symbol's last {lookback} trading days...")
+        panel = load_market_panel(DATA_DIR)
+        latest = panel.dates[-1] if len(panel.dates) else None
+        if rebuild:
+            # Replaying the same rows rebuilds the checkpoint, so the next run rolls forward from it
+            state = build_feature_state(lookback_frame(panel, lookback, start=latest, end=latest, date_format="%Y-%m-%d"))
+            state.save(FEATURE_STATE_PATH)
+            features = state.latest.copy()
+        else:
+            df = lookback_frame(panel, lookback, start=latest, end=latest)
+            features = create_features(df, predict_mode=True, features=model_features, presorted=True)
+    else:
+        print(f"[INFO] Loading bhavcopies after {state.last_date}...")
+        df = load_multiple_bhavcopies(DATA_DIR, start=state.last_date)
+        state.apply(df)
+        state.save(FEATURE_STATE_PATH)
+        features = state.latest.copy()
 
     if features.empty:
         print("[WARNING] No data after feature creation.")
         return
 
-    model = joblib.load(DAILY_MODEL_PATH)
-    X = features.drop(columns=["symbol", "date", "target"], errors="ignore")
-    predictions = model.predict(X)
-    confidences = model.predict_proba(X)[:, 1]
+    X = features[model_features]
+    predictions, proba = predict_with_proba(model, X)
+    confidences = proba[:, 1]
 
     features["prediction"] = predictions
     features["confidence"] = confidences
 
-    latest_date = features["date"].iloc[0]
+    latest_date = pd.Timestamp(features["date"].iloc[0]).strftime("%Y-%m-%d")
     predicted_date = get_next_trading_day(latest_date)
 
     # Filter by confidence and prediction
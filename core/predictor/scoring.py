@@ -0,0 +1,10 @@
+# core/predictor/scoring.py
+
+import numpy as np
+
+
+def predict_with_proba(model, X):
+    # (predicted class, class probabilities) from one predict_proba pass; predict() would walk every
+    # tree again only to take the same argmax
+    proba = model.predict_proba(X)
+    return model.classes_.take(np.argmax(proba, axis=1)), proba
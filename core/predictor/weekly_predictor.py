@@ -1,34 +1,35 @@
 # core/predictor/weekly_predictor.py
 
 import os
-from datetime import datetime, timedelta
-import pandas as pd
-import joblib
 
-from core.config import (DATA_DIR, WEEKLY_MODEL_PATH,WEEKLY_PREDICTIONS_DIR, WEEKLY_PREDICTIONS_LATEST_PATH,CONFIDENCE_THRESHOLD, CONFIDENCE_BUCKETS)
-from core.utils.load_multiple_bhavcopies import load_multiple_bhavcopies
-from core.utils.aggregate_weekly import aggregate_weekly_data
+from core.config import (DATA_DIR, WEEKLY_MODEL_NAME,WEEKLY_PREDICTIONS_DIR, WEEKLY_PREDICTIONS_LATEST_PATH,CONFIDENCE_THRESHOLD, CONFIDENCE_BUCKETS)
+from core.utils.weekly_bar_store import load_weekly_bars
 from core.utils.dates import get_next_trading_day
-from core.features.weekly_feature_engineer import create_weekly_features
+from core.utils.model_registry import current_version, load_model
+from core.predictor.scoring import predict_with_proba
+from core.features.weekly_feature_engineer import create_weekly_features, WEEKLY_PREDICT_LOOKBACK_WEEKS
 
-def run_weekly_prediction(prediction_threshold = CONFIDENCE_THRESHOLD):
-    if not os.path.exists(WEEKLY_MODEL_PATH):
+def run_weekly_prediction(prediction_threshold = CONFIDENCE_THRESHOLD, partial_week=True):
+    if current_version(WEEKLY_MODEL_NAME) is None:
         print("[ERROR] Trained weekly model not found.")
         return
 
-    print("[INFO] Loading daily bhavcopies...")
-    df = load_multiple_bhavcopies(DATA_DIR)
-    weekly_df = aggregate_weekly_data(df)
-    features = create_weekly_features(weekly_df, predict_mode=True)
+    # ⚡ Frozen weekly bars plus the week in progress: the read does not grow with history.
+    # partial_week=False predicts from the last completed week only.
+    print(f"[INFO] Loading last {WEEKLY_PREDICT_LOOKBACK_WEEKS} completed weekly bars...")
+    weekly_df = load_weekly_bars(DATA_DIR, weeks=WEEKLY_PREDICT_LOOKBACK_WEEKS, partial_week=partial_week)
+    if weekly_df["partial_week"].any():
+        print(f"[INFO] Latest bar is the week ending {weekly_df['date'].max().date()}, still in progress")
+    features = create_weekly_features(weekly_df.drop(columns=["partial_week"]), predict_mode=True)
 
     if features.empty:
         print("[WARNING] No data after weekly feature creation.")
         return
 
-    model = joblib.load(WEEKLY_MODEL_PATH)
+    model, _ = load_model(WEEKLY_MODEL_NAME)
     X = features.drop(columns=["symbol", "date", "target"], errors="ignore")
-    predictions = model.predict(X)
-    confidences = model.predict_proba(X)[:, 1]
+    predictions, proba = predict_with_proba(model, X)
+    confidences = proba[:, 1]
 
     features["prediction"] = predictions
     features["confidence"] = confidences
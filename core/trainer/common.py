@@ -1,29 +1,49 @@
 # core/trainer/common.py
 
 import os
-import joblib
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+import time
+import pandas as pd
+from core.config import VALIDATION_OUTPUT_DIR, INGEST_MANIFEST_PATH
+from core.trainer.hyperparameter_search import tuned_params, build_member
+from core.trainer.validation import walk_forward_validate, print_fold_report
+from core.utils.ingest_manifest import load_manifest, manifest_fingerprint
+from core.utils.model_registry import register_model
 
-def train_and_save_model(X, y, model_path: str):
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, stratify=y, random_state=42)
+def training_meta(features, dates, report=None, **timings):
+    # What produced a model: registered next to it so any version can be traced back to its data
+    dates = pd.to_datetime(pd.Series(dates))
+    metrics = ("accuracy", "precision", "recall", "f1", "roc_auc")
+    return {
+        "features": list(features),
+        "rows": len(dates),
+        "train_start": dates.min().strftime("%Y-%m-%d"),
+        "train_end": dates.max().strftime("%Y-%m-%d"),
+        "data_fingerprint": manifest_fingerprint(load_manifest(INGEST_MANIFEST_PATH)),
+        "metrics": {} if report is None or report.empty else
+                   {col: float(report[col].mean()) for col in metrics if col in report.columns},
+        "timings": {name: round(seconds, 3) for name, seconds in timings.items()},
+    }
 
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
-    model.fit(X_train, y_train)
+def train_and_save_model(X, y, model_name: str, dates):
+    # dates: trading date of every row. Scored walk-forward over time, then fit on every row
+    # Default RandomForest settings unless a search has tuned this model (hyperparameter_search daily)
+    params = tuned_params(model_name, "rf")
+    model = build_member("rf", params)
 
-    y_pred = model.predict(X_test)
+    start = time.perf_counter()
+    report = walk_forward_validate(model, X, y, dates)
+    validation_seconds = time.perf_counter() - start
+    print_fold_report(report, os.path.join(VALIDATION_OUTPUT_DIR, f"{model_name}.csv"))
 
-    print("[RESULTS]")
-    print(f"Accuracy:  {accuracy_score(y_test, y_pred):.4f}")
-    print(f"Precision: {precision_score(y_test, y_pred):.4f}")
-    print(f"Recall:    {recall_score(y_test, y_pred):.4f}")
-    print(f"F1 Score:  {f1_score(y_test, y_pred):.4f}")
+    start = time.perf_counter()
+    model.fit(X, y)
+    fit_seconds = time.perf_counter() - start
 
     print("\n[INFO] Feature Importances:")
     for feature, importance in sorted(zip(X.columns, model.feature_importances_), key=lambda x: x[1], reverse=True):
         print(f"{feature:<30} {importance:.4f}")
 
-    os.makedirs(os.path.dirname(model_path), exist_ok=True)
-    joblib.dump(model, model_path)
-    print(f"[SUCCESS] Model saved to {model_path}")
+    meta = training_meta(X.columns, dates, report, validation_seconds=validation_seconds, fit_seconds=fit_seconds)
+    meta.update(hyperparameters={"rf": params})
+    version = register_model(model, model_name, meta)
+    print(f"[SUCCESS] Model {model_name} version {version} saved")
@@ -1,89 +1,56 @@
 #core/trainer/ensemble_trainer.py
 
 import os
+import sys
+import time
+import numpy as np
 import pandas as pd
-import joblib
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier, VotingClassifier
-from sklearn.linear_model import LogisticRegression
-from lightgbm import LGBMClassifier
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
-
-from core.config import DAILY_PROCESSED_PATH, DATA_DIR, TARGET_COLUMN, MODEL_DIR
-from core.features.feature_engineer import create_features
-from core.utils.load_multiple_bhavcopies import load_multiple_bhavcopies
+from sklearn.ensemble import VotingClassifier
+
+from core.config import (DATA_DIR, TARGET_COLUMN, ENSEMBLE_MODEL_NAME, COMPACT_FEATURES, VALIDATION_OUTPUT_DIR, INCREMENTAL_WINDOW_DAYS,
+                         CV_SPLITS, CV_WORKERS, TRAIN_CORES, PRUNE_FEATURES, PRUNING_IMPORTANCE, PRUNING_METRIC,
+                         PRUNING_TOLERANCE, LGBM_DATASET_CACHE)
+from core.features.feature_cache import sync_feature_cache, read_cache_index, read_feature_cache
+from core.features.registry import DAILY_FEATURE_COLUMNS
+from core.trainer.common import training_meta
+from core.trainer.feature_pruning import holdout_split, holdout_score, rank_features, prune_features
+from core.trainer.hyperparameter_search import tuned_params, build_member
+from core.trainer.lgbm_dataset import sync_lgbm_dataset, load_lgbm_dataset
+from core.trainer.incremental import incremental_meta, full_refit_reason, warm_start_ensemble
+from core.trainer.parallel_fit import thread_budget, apply_thread_budget, fit_ensemble, print_fit_times
+from core.trainer.validation import walk_forward_validate, print_fold_report
+from core.utils.model_registry import load_model, load_model_meta, register_model
+from core.utils.parallel_load import resolve_workers
 
 # Paths
-MODEL_PATH = os.path.join(MODEL_DIR, "ensemble_model.pkl")
 IMPORTANCE_CSV = "outputs/ensemble_feature_importance.csv"
+VALIDATION_CSV = os.path.join(VALIDATION_OUTPUT_DIR, f"{ENSEMBLE_MODEL_NAME}.csv")
+PRUNING_CSV = os.path.join(VALIDATION_OUTPUT_DIR, f"{ENSEMBLE_MODEL_NAME}_pruning.csv")
 
-def run_ensemble_training():
-    print("[INFO] Loading data...")
-    df = load_multiple_bhavcopies(DATA_DIR)
-    print(f"[INFO] Loaded {len(df)} rows of raw bhavcopy data")
-
-    print("[INFO] Creating features...")
-    features = create_features(df, predict_mode=False)
-    print(f"[INFO] Processed dataset has {len(features)} rows")
-    
-    os.makedirs(os.path.dirname(DAILY_PROCESSED_PATH), exist_ok=True)
-    features.to_csv(DAILY_PROCESSED_PATH, index=False)
-    print(f"[INFO] Saved processed data to {DAILY_PROCESSED_PATH}")
-    
-    df = features
-
-    if df.empty:
-        print("[ERROR] Feature generation failed. No data to train on.")
-        return
-
-    X = df.drop(columns=["date", "symbol", TARGET_COLUMN], errors="ignore")
-    y = df[TARGET_COLUMN]
-
-    print("[INFO] Splitting dataset...")
-    X_train, X_test, y_train, y_test = train_test_split(X, y, stratify=y, test_size=0.2, random_state=42)
+ENSEMBLE_MEMBERS = ("rf", "lgbm", "lr")
 
-    # Drop rows with NaNs from training data
-    nan_mask = X_train.notna().all(axis=1)
-    X_train = X_train[nan_mask]
-    y_train = y_train[nan_mask]
+def ensemble_params():
+    # Settings of every member: defaults, or the winners of python -m core.trainer.hyperparameter_search
+    return {member: tuned_params(ENSEMBLE_MODEL_NAME, member) for member in ENSEMBLE_MEMBERS}
 
-    print("[INFO] Training base models...")
-    rf = RandomForestClassifier(n_estimators=100, random_state=42)
-    lgbm = LGBMClassifier(n_estimators=100, random_state=42)
-    lr = LogisticRegression(max_iter=1000, solver="lbfgs", random_state=42)
-
-    ensemble = VotingClassifier(
-        estimators=[("rf", rf), ("lgbm", lgbm), ("lr", lr)],
+def build_ensemble(params=None):
+    params = params or ensemble_params()
+    return VotingClassifier(
+        estimators=[(member, build_member(member, params[member])) for member in ENSEMBLE_MEMBERS],
         voting="soft"
     )
 
-    print("[INFO] Fitting ensemble model...")
-    ensemble.fit(X_train, y_train)
-
-    # Evaluate on test set
-    # Drop NaNs from test set
-    nan_mask_test = X_test.notna().all(axis=1)
-    X_test_clean = X_test[nan_mask_test]
-    y_test_clean = y_test[nan_mask_test]
-
-    # Predict and evaluate
-    y_pred = ensemble.predict(X_test_clean)
-
-    print("\n[RESULTS]")
-    print(f"Accuracy:  {accuracy_score(y_test_clean, y_pred):.4f}")
-    print(f"Precision: {precision_score(y_test_clean, y_pred):.4f}")
-    print(f"Recall:    {recall_score(y_test_clean, y_pred):.4f}")
-    print(f"F1 Score:  {f1_score(y_test_clean, y_pred):.4f}")
-
-    print(f"\n[INFO] Saving model to {MODEL_PATH}")
-    joblib.dump(ensemble, MODEL_PATH)
+def _training_rows(df, features=DAILY_FEATURE_COLUMNS):
+    # Drop rows with NaNs (LogisticRegression cannot take them)
+    X = df[features]
+    nan_mask = X.notna().all(axis=1)
+    return X[nan_mask], df.loc[nan_mask, TARGET_COLUMN]
 
+def _report_importances(ensemble, feature_names):
     # Retrieve fitted base models
     rf_fitted = ensemble.named_estimators_["rf"]
     lgbm_fitted = ensemble.named_estimators_["lgbm"]
 
-    feature_names = list(X.columns)
-
     print("\n[INFO] Feature Importances from RandomForest:")
     rf_importances = rf_fitted.feature_importances_
     for name, imp in sorted(zip(feature_names, rf_importances), key=lambda x: -x[1]):
@@ -102,7 +69,176 @@ def run_ensemble_training():
         "lgbm_importance": lgbm_importances
     }).to_csv(IMPORTANCE_CSV, index=False)
 
+def _run_incremental_update(path, index, meta, compact):
+    # Only the rows the saved model has not seen are read: the last trained date (its target was
+    # provisional until the next session landed) onwards, plus the recent window every member updates on
+    dates = sorted(index)
+    trained_through = meta["train_end"]
+    if dates[-1] <= trained_through:
+        print(f"[INFO] Model is already trained through {trained_through}. Nothing to update.")
+        return
+
+    window_start = min(trained_through, dates[max(0, len(dates) - INCREMENTAL_WINDOW_DAYS)])
+    df = read_feature_cache(path, start=window_start, compact=compact)
+    features = meta["features"]
+    X_recent, y_recent = _training_rows(df, features)
+    recent_dates = pd.to_datetime(df.loc[X_recent.index, "date"])
+    new_mask = recent_dates >= pd.Timestamp(trained_through)
+    X_new, y_new = X_recent[new_mask], y_recent[new_mask]
+    print(f"[INFO] {len(X_new)} new rows since {trained_through}, {len(X_recent)} rows in the recent window")
+
+    if y_new.nunique() < 2 or y_recent.nunique() < 2:
+        print("[WARNING] New rows hold a single class. Keeping the saved model.")
+        return
+
+    # Loaded onto the heap, not memory-mapped: warm starts write into the fitted arrays
+    ensemble, _ = load_model(ENSEMBLE_MODEL_NAME, meta["version"], mmap=False)
+    apply_thread_budget(ensemble, thread_budget())
+    print("[INFO] Warm-starting ensemble model...")
+    start = time.perf_counter()
+    warm_start_ensemble(ensemble, X_recent, y_recent)
+    fit_seconds = time.perf_counter() - start
+
+    rf_trees = len(ensemble.named_estimators_["rf"].estimators_)
+    # Metrics stay those of the last full refit's walk-forward validation
+    new_meta = training_meta(features, df.loc[X_recent.index, "date"], fit_seconds=fit_seconds)
+    # rows: every row from train_start on, as a full refit records it (the last trained date's rows were
+    # already counted); window_rows: the recent window this update fit on
+    total_rows = meta["rows"] + int((recent_dates > pd.Timestamp(trained_through)).sum())
+    new_meta.update(train_start=meta["train_start"], rows=total_rows, window_rows=len(X_recent),
+                    metrics=meta["metrics"], parent_version=meta["version"])
+    if "candidate_features" in meta:
+        new_meta.update(candidate_features=meta["candidate_features"], pruning=meta["pruning"])
+    if "hyperparameters" in meta:
+        new_meta.update(hyperparameters=meta["hyperparameters"])
+    new_meta.update(incremental_meta(index, new_meta["train_end"], rf_trees, meta, full_refit=False))
+    register_model(ensemble, ENSEMBLE_MODEL_NAME, new_meta)
+    _report_importances(ensemble, features)
+    print(f"\n[SUCCESS] Incremental update {meta['updates_since_refit'] + 1} complete ({rf_trees} RF trees).")
+
+def _prune_ensemble(X, y, dates, report):
+    # Smallest feature subset whose walk-forward score stays within PRUNING_TOLERANCE of the full set.
+    # Ranking, baseline and rounds use only the history before the last fold's test block; the subset
+    # is then kept only if it scores within tolerance of all features on that block.
+    # Returns (features, pruning metadata); the full-set report stays the model's metrics.
+    selection, holdout, fold = holdout_split(dates)
+    X_sel, y_sel, dates_sel = X[selection], y[selection], np.asarray(dates)[selection]
+    baseline_report = walk_forward_validate(build_ensemble(), X_sel, y_sel, dates_sel, dropna=True)
+    if baseline_report.empty:
+        print("[WARNING] Too few dates before the holdout block to prune. Keeping every feature.")
+        return list(X.columns), None
+
+    baseline = baseline_report[PRUNING_METRIC].mean()
+    print(f"\n[INFO] Pruning features by {PRUNING_IMPORTANCE} importance on dates through {fold['train_end']} "
+          f"(baseline {PRUNING_METRIC} {baseline:.4f})...")
+    ranking = rank_features(build_ensemble(), X_sel, y_sel, dates_sel, dropna=True)
+    selected, _, rounds = prune_features(build_ensemble(), X_sel, y_sel, dates_sel, ranking, baseline, dropna=True)
+
+    os.makedirs(os.path.dirname(PRUNING_CSV), exist_ok=True)
+    rounds.to_csv(PRUNING_CSV, index=False)
+    print(f"[INFO] Pruning rounds saved to {PRUNING_CSV}")
+
+    # The full set's last fold trained on the same history and scored the same block
+    full_score = float(report[PRUNING_METRIC].iloc[-1])
+    selected_score = full_score
+    if len(selected) < X.shape[1]:
+        selected_score = float(holdout_score(build_ensemble(), X[selected], y, selection, holdout, dropna=True)[PRUNING_METRIC])
+    accepted = selected_score >= full_score - PRUNING_TOLERANCE
+    print(f"[RESULTS] Holdout {fold['test_start']} to {fold['test_end']}: {PRUNING_METRIC} {selected_score:.4f} "
+          f"with {len(selected)} features, {full_score:.4f} with all {X.shape[1]}")
+    if accepted:
+        print(f"[RESULTS] Kept {len(selected)} of {X.shape[1]} features: {', '.join(selected)}")
+    else:
+        print("[WARNING] Pruned subset is outside tolerance on the holdout block. Keeping every feature.")
+
+    pruning = {
+        "importance": PRUNING_IMPORTANCE,
+        "metric": PRUNING_METRIC,
+        "tolerance": PRUNING_TOLERANCE,
+        "baseline": float(baseline),
+        "selection_end": fold["train_end"],
+        "holdout": {"start": fold["test_start"], "end": fold["test_end"], "all_features": full_score,
+                    "selected": selected_score, "n_selected": len(selected), "accepted": bool(accepted)},
+        "ranking": {name: float(value) for name, value in ranking.items()},
+    }
+    return (selected if accepted else list(X.columns)), pruning
+
+def run_ensemble_training(compact=COMPACT_FEATURES, incremental=False, prune=PRUNE_FEATURES):
+    # compact: float32 matrix end to end; folds, fit and predict never upcast it
+    # incremental: warm-start the saved ensemble on the days it has not seen, unless
+    # full_refit_reason forces a fit over the whole history
+    # prune: after the full fit, keep the smallest feature subset scoring within tolerance and refit on it;
+    # the metrics recorded stay those of the full feature set
+    print("[INFO] Loading features...")
+    path = sync_feature_cache(DAILY_FEATURE_COLUMNS, DATA_DIR)
+    index = read_cache_index(path)
+
+    if incremental and index:
+        meta = load_model_meta(ENSEMBLE_MODEL_NAME)
+        reason = full_refit_reason(meta, DAILY_FEATURE_COLUMNS, index, max(index), ensemble_params())
+        if reason is None:
+            return _run_incremental_update(path, index, meta, compact)
+        print(f"[INFO] Full refit: {reason}")
+
+    df = read_feature_cache(path, compact=compact)
+    print(f"[INFO] Processed dataset has {len(df)} rows")
+
+    if df.empty:
+        print("[ERROR] Feature generation failed. No data to train on.")
+        return
+
+    X = df[DAILY_FEATURE_COLUMNS]
+    y = df[TARGET_COLUMN]
+    # LightGBM's binned copy of the same rows for the full-history fit; walk-forward folds bin their own
+    # training rows, since these bins are drawn from every date
+    dataset_path = sync_lgbm_dataset(df, index, DAILY_FEATURE_COLUMNS) if LGBM_DATASET_CACHE else None
+
+    print("[INFO] Training base models...")
+    ensemble = build_ensemble()
+
+    # Score on later dates than the model trained on: purged, embargoed walk-forward folds.
+    # Folds already run one per process, so each gets its slice of the core budget.
+    print("[INFO] Running walk-forward validation...")
+    fold_cores = max(1, resolve_workers(TRAIN_CORES) // min(CV_SPLITS, resolve_workers(CV_WORKERS)))
+    apply_thread_budget(ensemble, thread_budget(fold_cores))
+    start = time.perf_counter()
+    report = walk_forward_validate(ensemble, X, y, df["date"], dropna=True)
+    validation_seconds = time.perf_counter() - start
+    print()
+    print_fold_report(report, VALIDATION_CSV)
+
+    # Fit on the full history
+    X_train, y_train = _training_rows(df)
+    lgbm_data = (load_lgbm_dataset(dataset_path), X_train.index.to_numpy()) if dataset_path else None
+
+    print("[INFO] Fitting ensemble model...")
+    fit_times = fit_ensemble(ensemble, X_train, y_train, TRAIN_CORES, lgbm_data)
+    print_fit_times(fit_times, thread_budget(TRAIN_CORES))
+
+    features, pruning = list(X.columns), None
+    if prune and not report.empty:
+        start = time.perf_counter()
+        selected, pruning = _prune_ensemble(X, y, df["date"], report)
+        validation_seconds += time.perf_counter() - start
+        if len(selected) < len(features):
+            features = selected
+            print("[INFO] Refitting ensemble on the pruned features...")
+            ensemble = build_ensemble()
+            X_train, y_train = _training_rows(df, features)
+            fit_times = fit_ensemble(ensemble, X_train, y_train, TRAIN_CORES)
+            print_fit_times(fit_times, thread_budget(TRAIN_CORES))
+
+    rf_trees = len(ensemble.named_estimators_["rf"].estimators_)
+    meta = training_meta(features, df["date"], report, validation_seconds=validation_seconds,
+                         **{f"fit_seconds_{name}": seconds for name, seconds in fit_times.items()})
+    if pruning is not None:
+        meta.update(candidate_features=list(X.columns), pruning=pruning)
+    meta.update(hyperparameters=ensemble_params())
+    meta.update(incremental_meta(index, meta["train_end"], rf_trees))
+    register_model(ensemble, ENSEMBLE_MODEL_NAME, meta)
+    _report_importances(ensemble, features)
+
     print("\n[SUCCESS] Ensemble training and evaluation complete.")
 
 if __name__ == "__main__":
-    run_ensemble_training()
+    run_ensemble_training(incremental="--incremental" in sys.argv[1:], prune="--prune" in sys.argv[1:] or PRUNE_FEATURES)
@@ -0,0 +1,91 @@
+# core/trainer/feature_pruning.py
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.inspection import permutation_importance
+
+from core.config import (PRUNING_IMPORTANCE, PRUNING_METRIC, PRUNING_TOLERANCE, PRUNING_STEP, PRUNING_MIN_FEATURES,
+                         PRUNING_PERMUTATION_REPEATS)
+from core.trainer.validation import walk_forward_folds, walk_forward_validate, fold_metrics
+
+
+def combined_importance(model, feature_names) -> pd.Series:
+    # Mean of each tree member's importances, every one normalised to sum to 1 first
+    members = model.named_estimators_.values() if hasattr(model, "named_estimators_") else [model]
+    importances = [
+        member.feature_importances_ / member.feature_importances_.sum()
+        for member in members
+        if hasattr(member, "feature_importances_") and member.feature_importances_.sum() > 0
+    ]
+    return pd.Series(np.mean(importances, axis=0), index=list(feature_names)).sort_values(ascending=False)
+
+
+def _fold_rows(X, y, train_mask, test_mask, dropna=False):
+    X_train, y_train, X_test, y_test = X[train_mask], y[train_mask], X[test_mask], y[test_mask]
+    if dropna:
+        train_mask, test_mask = X_train.notna().all(axis=1), X_test.notna().all(axis=1)
+        X_train, y_train, X_test, y_test = X_train[train_mask], y_train[train_mask], X_test[test_mask], y_test[test_mask]
+    return X_train, y_train, X_test, y_test
+
+
+def holdout_split(dates):
+    # Masks over the rows of `dates` for the last walk-forward fold: (its purged, embargoed training
+    # history, its test block, the fold). Pruning searches the history only; the block then judges the
+    # subset it found, so the folds that steered the search are not the ones that accept its result.
+    dates = pd.to_datetime(pd.Series(np.asarray(dates)))
+    fold = walk_forward_folds(np.sort(dates.dt.strftime("%Y-%m-%d").to_numpy()))[-1]
+    selection = (dates <= pd.Timestamp(fold["train_end"])).to_numpy()
+    holdout = (dates >= pd.Timestamp(fold["test_start"])).to_numpy()
+    return selection, holdout, fold
+
+
+def holdout_score(estimator, X, y, selection, holdout, dropna=False):
+    # Metrics on the holdout block of a clone fit on the selection rows
+    X_train, y_train, X_test, y_test = _fold_rows(X, y, selection, holdout, dropna)
+    return fold_metrics(clone(estimator).fit(X_train, y_train), X_test, y_test)
+
+
+def permutation_ranking(estimator, X, y, dates, dropna=False, repeats=PRUNING_PERMUTATION_REPEATS) -> pd.Series:
+    # Accuracy lost when a column is shuffled, scored on the latest walk-forward block with the model
+    # fit on everything purged before it, so no feature is rewarded for in-sample fit
+    train_mask, test_mask, _ = holdout_split(dates)
+    X_train, y_train, X_test, y_test = _fold_rows(X, y, train_mask, test_mask, dropna)
+    model = clone(estimator).fit(X_train, y_train)
+    result = permutation_importance(model, X_test, y_test, scoring="accuracy", n_repeats=repeats, random_state=42)
+    return pd.Series(result.importances_mean, index=list(X.columns)).sort_values(ascending=False)
+
+
+def rank_features(estimator, X, y, dates, method=PRUNING_IMPORTANCE, dropna=False) -> pd.Series:
+    # "combined": RF + LightGBM importances of a clone fit on exactly these rows
+    # "permutation": out-of-sample over their latest block, slower but model-agnostic
+    if method == "permutation":
+        return permutation_ranking(estimator, X, y, dates, dropna)
+    mask = X.notna().all(axis=1) if dropna else np.ones(len(X), dtype=bool)
+    return combined_importance(clone(estimator).fit(X[mask], y[mask]), X.columns)
+
+
+def prune_features(estimator, X, y, dates, ranking, baseline_score, metric=PRUNING_METRIC, tolerance=PRUNING_TOLERANCE,
+                   step=PRUNING_STEP, min_features=PRUNING_MIN_FEATURES, dropna=False):
+    # Drops the least important `step` fraction of the remaining features per round and re-scores
+    # walk-forward, until a subset scores more than `tolerance` below the full set.
+    # Returns (smallest accepted feature list in column order, its fold report, per-round table).
+    kept = list(ranking.index)
+    rounds = [{"n_features": len(kept), metric: baseline_score, "accepted": True, "dropped": ""}]
+    kept_report = None
+
+    while len(kept) > min_features:
+        n_keep = min(len(kept) - 1, max(min_features, int(len(kept) * (1 - step))))
+        candidate = kept[:n_keep]
+        columns = [col for col in X.columns if col in candidate]
+
+        report = walk_forward_validate(estimator, X[columns], y, dates, dropna=dropna)
+        score = report[metric].mean() if metric in report.columns else np.nan
+        accepted = bool(score >= baseline_score - tolerance)
+        rounds.append({"n_features": n_keep, metric: score, "accepted": accepted, "dropped": ", ".join(kept[n_keep:])})
+        print(f"[INFO] {n_keep:>3} features: {metric} {score:.4f} ({'kept' if accepted else 'outside tolerance'})")
+        if not accepted:
+            break
+        kept, kept_report = candidate, report
+
+    return [col for col in X.columns if col in kept], kept_report, pd.DataFrame(rounds)
@@ -0,0 +1,287 @@
+# core/trainer/hyperparameter_search.py
+# Usage: python -m core.trainer.hyperparameter_search [ensemble|daily] [rf] [lgbm] [lr]
+
+import os
+import sys
+import json
+import shutil
+import itertools
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from lightgbm import LGBMClassifier
+
+from core.config import (DATA_DIR, TARGET_COLUMN, DAILY_MODEL_NAME, ENSEMBLE_MODEL_NAME, TUNING_DIR, TUNED_PARAMS_PATH,
+                         TUNING_CANDIDATES, TUNING_ETA, TUNING_MIN_DATES, TUNING_SPLITS, TUNING_METRIC, TUNING_WORKERS)
+from core.features.feature_cache import sync_feature_cache, read_cache_index, read_feature_cache
+from core.features.registry import DAILY_FEATURE_COLUMNS
+from core.trainer.incremental import history_fingerprint
+from core.trainer.validation import walk_forward_folds, score_fold
+from core.utils.atomic_files import file_lock, replace_atomically
+from core.utils.parallel_load import resolve_workers
+
+MEMBER_CLASSES = {"rf": RandomForestClassifier, "lgbm": LGBMClassifier, "lr": LogisticRegression}
+
+# What the trainers used before any search; tuned settings are merged over these
+DEFAULT_PARAMS = {
+    "rf": {"n_estimators": 100, "random_state": 42},
+    "lgbm": {"n_estimators": 100, "random_state": 42},
+    "lr": {"max_iter": 1000, "solver": "lbfgs", "random_state": 42},
+}
+
+SEARCH_SPACES = {
+    "rf": {
+        "n_estimators": [100, 200, 400],
+        "max_depth": [None, 8, 12, 16],
+        "min_samples_leaf": [1, 5, 20, 50],
+        "max_features": ["sqrt", 0.3, 0.5],
+    },
+    "lgbm": {
+        "n_estimators": [100, 200, 400],
+        "learning_rate": [0.02, 0.05, 0.1],
+        "num_leaves": [15, 31, 63],
+        "min_child_samples": [20, 50, 100],
+        "colsample_bytree": [0.6, 0.8, 1.0],
+        "reg_lambda": [0.0, 1.0, 5.0],
+    },
+    "lr": {
+        "C": [0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0],
+    },
+}
+
+# Models the CLI can tune: (members, drop NaN rows like the trainer does)
+SEARCH_TARGETS = {
+    "ensemble": (ENSEMBLE_MODEL_NAME, ("rf", "lgbm", "lr"), True),
+    "daily": (DAILY_MODEL_NAME, ("rf",), False),
+}
+
+
+def _load_json(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _save_json(data, path):
+    with replace_atomically(path) as tmp_path, open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def tuned_params(model_name, member, path=TUNED_PARAMS_PATH) -> dict:
+    # Default settings with the last search's winner for this model member on top
+    tuned = _load_json(path).get(model_name, {}).get(member, {})
+    return {**DEFAULT_PARAMS[member], **tuned.get("params", {})}
+
+
+def build_member(member, params=None):
+    return MEMBER_CLASSES[member](**{**DEFAULT_PARAMS[member], **(params or {})})
+
+
+def sample_candidates(member, n_candidates=TUNING_CANDIDATES, seed=42):
+    # Seeded draw without replacement from the grid, so a resumed search sees the same candidates
+    space = SEARCH_SPACES[member]
+    grid = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    picks = np.random.default_rng(seed).choice(len(grid), size=min(n_candidates, len(grid)), replace=False)
+    return [grid[i] for i in sorted(picks)]
+
+
+def rung_budgets(n_candidates, n_dates, eta=TUNING_ETA, min_dates=TUNING_MIN_DATES):
+    # Trading days of history per rung: eta x more each rung, ending on the full history. The last rung
+    # is the one that leaves a single survivor; that survivor is not scored again on its own.
+    # Windows shorter than min_dates are raised to it, and the rungs that would then repeat a budget are
+    # dropped: a short history gets fewer, strictly growing rungs rather than the same window twice.
+    n_rungs, survivors = 1, n_candidates
+    while max(1, survivors // eta) > 1 and n_rungs < 10:
+        survivors //= eta
+        n_rungs += 1
+    first = min(min_dates, n_dates)
+    budgets = [max(first, int(n_dates / eta ** (n_rungs - 1 - r))) for r in range(n_rungs)]
+    return sorted(set(budgets))
+
+
+def _window_folds(dates, n_dates, n_splits):
+    # Walk-forward folds over the latest n_dates trading days, as row offsets into the full sorted matrix
+    unique_dates = np.unique(dates)
+    start = int(np.searchsorted(dates, unique_dates[-n_dates]))
+    folds = walk_forward_folds(dates[start:], n_splits)
+    for fold in folds:
+        fold["train_rows"] = tuple(start + row for row in fold["train_rows"])
+        fold["test_rows"] = tuple(start + row for row in fold["test_rows"])
+    return folds
+
+
+def _range_fingerprint(cache_index, last_date):
+    # Feature-cache fingerprint of the searched history; the last date's target is still provisional
+    return history_fingerprint(cache_index, last_date) if cache_index is not None else None
+
+
+def _search_estimator(member, params):
+    # Every fit in the pool gets one thread: the pool already spreads them over the cores
+    threads = {"n_jobs": 1} if member != "lr" else {}
+    quiet = {"verbose": -1} if member == "lgbm" else {}
+    return build_member(member, {**params, **threads, **quiet})
+
+
+def _score_candidates(member, candidates, folds, matrix_dir, dropna, metric, workers, on_scored):
+    # Every (candidate, fold) fit is its own task; a candidate is scored once all its folds are back
+    tasks = [(i, (fold, matrix_dir, _search_estimator(member, params), dropna))
+             for i, params in enumerate(candidates) for fold in folds]
+    fold_scores = {i: [] for i in range(len(candidates))}
+
+    def collect(i, row):
+        fold_scores[i].append(row.get(metric, np.nan))
+        if len(fold_scores[i]) == len(folds):
+            scores = [score for score in fold_scores[i] if not np.isnan(score)]
+            on_scored(candidates[i], float(np.mean(scores)) if scores else float("nan"))
+
+    workers = min(resolve_workers(workers), len(tasks))
+    if workers <= 1:
+        for i, args in tasks:
+            collect(i, score_fold(args))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(score_fold, args): i for i, args in tasks}
+        for future in as_completed(futures):
+            collect(futures[future], future.result())
+
+
+def successive_halving(member, X, y, dates, model_name, dropna=False, n_candidates=TUNING_CANDIDATES, eta=TUNING_ETA,
+                       min_dates=TUNING_MIN_DATES, n_splits=TUNING_SPLITS, metric=TUNING_METRIC, workers=TUNING_WORKERS,
+                       cache_index=None):
+    # Scores every candidate on the most recent trading days, keeps the best 1/eta, and re-scores the
+    # survivors on eta x more history until one is left on the full history. Every score is written to
+    # the state file as soon as it lands, so an interrupted search picks up where it stopped.
+    # Each member is scored on its own, not inside the soft-vote ensemble it is built into.
+    # cache_index: feature-cache fingerprints of the dates, so a resumed search notices changed history
+    # Returns (best params, best score, table of every (rung, candidate) score).
+    date_strs = pd.to_datetime(pd.Series(np.asarray(dates))).dt.strftime("%Y-%m-%d").to_numpy()
+    searched = {"first_date": date_strs.min(), "last_date": date_strs.max()}
+
+    state_path = os.path.join(TUNING_DIR, f"{model_name}_{member}.json")
+    settings = {
+        "features": list(X.columns), "metric": metric, "splits": n_splits, "dropna": dropna,
+        "candidates": n_candidates, "eta": eta, "min_dates": min_dates,
+        "space": {name: [str(value) for value in values] for name, values in SEARCH_SPACES[member].items()},
+    }
+    # The state is keyed on the dates it searched, not on the data today: trading days landing while a
+    # search is interrupted leave it resumable on its own range. Changed history inside that range, or a
+    # finished search on an older range, starts over on everything.
+    state = _load_json(state_path)
+    saved = state.get("range", {})
+    resumable = (
+        state.get("settings") == settings and bool(saved)
+        and saved.get("fingerprint") == _range_fingerprint(cache_index, saved["last_date"])
+        and (not state.get("complete") or saved["last_date"] == searched["last_date"])
+    )
+    if resumable:
+        keep = (date_strs >= saved["first_date"]) & (date_strs <= saved["last_date"])
+        X, y, date_strs = X[keep], y[keep], date_strs[keep]
+        print(f"[INFO] Resuming {member} search on {saved['first_date']} to {saved['last_date']}: "
+              f"{len(state['scores'])} scores already in {state_path}")
+    else:
+        if state:
+            print(f"[INFO] Search settings or searched history changed since the last {member} search, starting over")
+        searched["fingerprint"] = _range_fingerprint(cache_index, searched["last_date"])
+        state = {"settings": settings, "range": searched, "scores": {}}
+
+    order = np.argsort(date_strs, kind="stable")
+    dates = pd.to_datetime(pd.Series(date_strs[order])).to_numpy()
+    unique_dates = np.unique(dates)
+
+    candidates = sample_candidates(member, n_candidates)
+    budgets = rung_budgets(len(candidates), len(unique_dates), eta, min_dates)
+
+    def key(params, budget):
+        return f"{budget}|{json.dumps(params, sort_keys=True)}"
+
+    def record(budget):
+        def on_scored(params, score):
+            state["scores"][key(params, budget)] = score
+            _save_json(state, state_path)
+        return on_scored
+
+    matrix_dir = tempfile.mkdtemp(prefix="tuning_")
+    rows = []
+    try:
+        # Workers map the same read-only matrix instead of receiving a copy per task
+        np.save(os.path.join(matrix_dir, "X.npy"), np.ascontiguousarray(np.asarray(X)[order]))
+        np.save(os.path.join(matrix_dir, "y.npy"), np.asarray(y)[order])
+
+        survivors = candidates
+        for rung, budget in enumerate(budgets):
+            folds = _window_folds(dates, budget, n_splits)
+            pending = [params for params in survivors if key(params, budget) not in state["scores"]]
+            print(f"[INFO] {member} rung {rung}: {len(survivors)} candidates on the last {budget} trading days "
+                  f"({len(pending)} to fit, {len(folds)} folds each)")
+            if pending and folds:
+                _score_candidates(member, pending, folds, matrix_dir, dropna, metric, workers, record(budget))
+
+            scored = [(state["scores"].get(key(params, budget), float("nan")), params) for params in survivors]
+            scored.sort(key=lambda item: -np.inf if np.isnan(item[0]) else item[0], reverse=True)
+            rows.extend({"rung": rung, "dates": budget, metric: score, **params} for score, params in scored)
+            survivors = [params for _, params in scored[:max(1, len(scored) // eta)]]
+            if rung == len(budgets) - 1 or len(scored) == 1:
+                best_score, best = scored[0]
+                break
+        state["complete"] = True
+        _save_json(state, state_path)
+    finally:
+        shutil.rmtree(matrix_dir, ignore_errors=True)
+
+    return best, best_score, pd.DataFrame(rows)
+
+
+def save_tuned_params(model_name, member, params, score, metric=TUNING_METRIC, path=TUNED_PARAMS_PATH):
+    # Searches for other members or models may finish at the same time and update the same file
+    with file_lock(f"{path}.lock"):
+        tuned = _load_json(path)
+        tuned.setdefault(model_name, {})[member] = {
+            "params": params,
+            "score": score,
+            "metric": metric,
+            "scored_as": "standalone",  # not inside the ensemble the member is then built into
+            "tuned_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        _save_json(tuned, path)
+
+
+def run_search(target="ensemble", members=None):
+    model_name, target_members, dropna = SEARCH_TARGETS[target]
+    members = [member for member in (members or target_members) if member in target_members]
+
+    print("[INFO] Loading features...")
+    path = sync_feature_cache(DAILY_FEATURE_COLUMNS, DATA_DIR)
+    df = read_feature_cache(path)
+    index = read_cache_index(path)
+    if dropna:
+        df = df[df[DAILY_FEATURE_COLUMNS].notna().all(axis=1)]
+    X, y = df[DAILY_FEATURE_COLUMNS], df[TARGET_COLUMN]
+    print(f"[INFO] Tuning {', '.join(members)} for {model_name} on {len(X)} rows")
+
+    for member in members:
+        params, score, table = successive_halving(member, X, y, df["date"], model_name, dropna=dropna,
+                                                  cache_index=index)
+        output_path = os.path.join(TUNING_DIR, f"{model_name}_{member}.csv")
+        table.to_csv(output_path, index=False)
+        if np.isnan(score):
+            # No fold fit the windows (too little history for the splits): every score is NaN and the
+            # "best" candidate is arbitrary, so the trainers keep their current settings
+            print(f"[ERROR] {member}: no candidate could be scored on {len(X)} rows, tuned settings not saved")
+            continue
+        save_tuned_params(model_name, member, params, score)
+        print(f"[RESULTS] {member}: {TUNING_METRIC} {score:.4f} with {params}")
+        print(f"[INFO] Rung scores saved to {output_path}")
+
+    print(f"\n[SUCCESS] Tuned settings saved to {TUNED_PARAMS_PATH}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    target = args[0] if args and args[0] in SEARCH_TARGETS else "ensemble"
+    run_search(target, [arg for arg in args if arg in MEMBER_CLASSES] or None)
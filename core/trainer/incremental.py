@@ -0,0 +1,69 @@
+# core/trainer/incremental.py
+
+import hashlib
+import pandas as pd
+
+from core.config import (INCREMENTAL_RF_TREES, INCREMENTAL_LGBM_ROUNDS, FULL_REFIT_MAX_UPDATES,
+                         FULL_REFIT_MAX_DAYS, MAX_FOREST_TREES)
+
+# Warm-start bookkeeping is stored in the ensemble's registry metadata (see incremental_meta)
+
+
+def history_fingerprint(cache_index, through):
+    # Digest of the feature-cache fingerprints of every date before `through`. The date itself is
+    # left out: its target (and so its fingerprint) changes as soon as the next trading day lands.
+    digest = hashlib.sha256()
+    for date_str in sorted(d for d in cache_index if d < through):
+        digest.update(f"{date_str}:{cache_index[date_str]};".encode())
+    return digest.hexdigest()
+
+
+def full_refit_reason(meta, features, cache_index, latest_date, hyperparameters=None):
+    # None when a warm-started update is allowed, otherwise why the whole history must be refit
+    if meta is None:
+        return "no registered model"
+    if "cache_history" not in meta:
+        return "current model was not trained from the feature cache"
+    # A pruned model keeps the list it was pruned from; the registry changing that list needs a new search
+    if meta.get("candidate_features", meta["features"]) != list(features):
+        return "feature list changed"
+    if hyperparameters is not None and meta.get("hyperparameters") != hyperparameters:
+        return "hyperparameters changed"
+    if history_fingerprint(cache_index, meta["train_end"]) != meta["cache_history"]:
+        return f"bhavcopies before {meta['train_end']} changed"
+    if meta["updates_since_refit"] >= FULL_REFIT_MAX_UPDATES:
+        return f"{meta['updates_since_refit']} incremental updates since the last full refit"
+    if (pd.Timestamp(latest_date) - pd.Timestamp(meta["full_refit_through"])).days >= FULL_REFIT_MAX_DAYS:
+        return f"last full refit was on data through {meta['full_refit_through']}"
+    if meta["rf_trees"] + INCREMENTAL_RF_TREES > MAX_FOREST_TREES:
+        return f"RandomForest already holds {meta['rf_trees']} trees"
+    return None
+
+
+def warm_start_ensemble(ensemble, X_recent, y_recent):
+    # Updates a fitted soft-voting ensemble in place, every member on the recent window:
+    #   lgbm → boosts INCREMENTAL_LGBM_ROUNDS more rounds from the saved booster (rounds fit on one or
+    #          two new sessions alone would chase that day's noise)
+    #   rf   → keeps its trees and grows INCREMENTAL_RF_TREES more
+    #   lr   → restarts lbfgs from the previous coefficients
+    lgbm = ensemble.named_estimators_["lgbm"]
+    lgbm.set_params(n_estimators=INCREMENTAL_LGBM_ROUNDS)
+    lgbm.fit(X_recent, y_recent, init_model=lgbm.booster_)
+
+    rf = ensemble.named_estimators_["rf"]
+    rf.set_params(warm_start=True, n_estimators=len(rf.estimators_) + INCREMENTAL_RF_TREES)
+    rf.fit(X_recent, y_recent)
+
+    lr = ensemble.named_estimators_["lr"]
+    lr.set_params(warm_start=True)
+    lr.fit(X_recent, y_recent)
+    return ensemble
+
+
+def incremental_meta(cache_index, train_end, rf_trees, previous=None, full_refit=True):
+    return {
+        "cache_history": history_fingerprint(cache_index, train_end),
+        "full_refit_through": train_end if full_refit else previous["full_refit_through"],
+        "updates_since_refit": 0 if full_refit else previous["updates_since_refit"] + 1,
+        "rf_trees": int(rf_trees),
+    }
@@ -0,0 +1,37 @@
+# core/trainer/multi_timeframe_trainer.py
+
+import os
+from core.utils.load_multiple_bhavcopies import load_multiple_bhavcopies
+from core.features.feature_engineer import PREDICT_LOOKBACK_DAYS
+from core.features.multi_timeframe import create_multi_timeframe_features
+from core.features.online_state import build_feature_state
+from core.features.registry import DAILY_FEATURE_COLUMNS
+from core.trainer.common import train_and_save_model
+from core.config import DATA_DIR, DAILY_MODEL_NAME, WEEKLY_MODEL_NAME, WEEKLY_PROCESSED_PATH, FEATURE_STATE_PATH
+
+def run_combined_training():
+    # Evening refresh of both models: one load and one sort feed the daily and weekly feature sets
+    df = load_multiple_bhavcopies(DATA_DIR)
+    print(f"[INFO] Loaded {len(df)} rows of raw bhavcopy data")
+
+    daily, weekly = create_multi_timeframe_features(df, DAILY_FEATURE_COLUMNS)
+    print(f"[INFO] Daily dataset has {len(daily)} rows, weekly dataset has {len(weekly)} rows")
+
+    print("\n[INFO] Training daily model...")
+    train_and_save_model(daily[DAILY_FEATURE_COLUMNS], daily["target"], model_name=DAILY_MODEL_NAME, dates=daily["date"])
+
+    # The full history is already loaded: keep each recently traded symbol's own last sessions
+    recent_dates = sorted(df["date"].unique())[-PREDICT_LOOKBACK_DAYS:]
+    recent = df[df["symbol"].isin(df.loc[df["date"] >= recent_dates[0], "symbol"].unique())]
+    build_feature_state(recent.sort_values("date", kind="stable").groupby("symbol").tail(PREDICT_LOOKBACK_DAYS)).save(FEATURE_STATE_PATH)
+    print(f"[INFO] Feature state checkpointed to {FEATURE_STATE_PATH}")
+
+    os.makedirs(os.path.dirname(WEEKLY_PROCESSED_PATH), exist_ok=True)
+    weekly.to_csv(WEEKLY_PROCESSED_PATH, index=False)
+    print(f"[INFO] Weekly data saved to {WEEKLY_PROCESSED_PATH}")
+
+    print("\n[INFO] Training weekly model...")
+    train_and_save_model(weekly.drop(columns=["symbol", "date", "target"]), weekly["target"], model_name=WEEKLY_MODEL_NAME, dates=weekly["date"])
+
+if __name__ == "__main__":
+    run_combined_training()
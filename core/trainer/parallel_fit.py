@@ -0,0 +1,93 @@
+# core/trainer/parallel_fit.py
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sklearn.base import clone
+from sklearn.preprocessing import LabelEncoder
+from sklearn.utils import Bunch
+from sklearn.utils.multiclass import type_of_target
+
+from core.config import TRAIN_CORES, LGBM_CORE_SHARE
+from core.trainer.lgbm_dataset import BoosterClassifier, fit_lgbm_from_dataset
+from core.utils.parallel_load import resolve_workers
+
+
+def thread_budget(cores=TRAIN_CORES):
+    # Splits the cores between the base estimators so their threads add up to the budget:
+    # LogisticRegression's lbfgs runs on one, LightGBM takes LGBM_CORE_SHARE of the rest and the
+    # RandomForest builds trees on what remains. Below three cores the estimators take turns instead.
+    cores = resolve_workers(cores)
+    if cores < 3:
+        return {"concurrent": 1, "rf": cores, "lgbm": cores, "lr": 1}
+
+    lgbm = max(1, round((cores - 1) * LGBM_CORE_SHARE))
+    rf = max(1, cores - 1 - lgbm)
+    return {"concurrent": 3, "rf": rf, "lgbm": lgbm, "lr": 1}
+
+
+def apply_thread_budget(ensemble, budget):
+    # n_jobs is a constructor param, so clones (walk-forward folds) inherit it too. lbfgs ignores
+    # n_jobs, LogisticRegression's one core is only reserved.
+    params = {f"{name}__n_jobs": budget[name] for name, _ in ensemble.estimators if name in ("rf", "lgbm")}
+    ensemble.set_params(**params)
+    # A fitted ensemble's members are fitted copies of those templates: warm starts train these
+    for name, member in getattr(ensemble, "named_estimators_", {}).items():
+        if name not in ("rf", "lgbm") or member == "drop":
+            continue
+        if isinstance(member, BoosterClassifier):
+            member.set_params(params={**(member.params or {}), "n_jobs": budget[name]})
+        else:
+            member.set_params(n_jobs=budget[name])
+    return ensemble
+
+
+def fit_ensemble(ensemble, X, y, cores=TRAIN_CORES, lgbm_data=None, concurrent=None):
+    # Same fitted state as VotingClassifier.fit, with the base estimators fitted side by side on
+    # threads: RF tree building, LightGBM and lbfgs all release the GIL, and threads share X
+    # instead of pickling it to workers. Returns {estimator name: fit seconds}.
+    # lgbm_data: (binned Dataset, row of every X row in it) → LightGBM trains without re-binning X
+    # concurrent: fit this many at a time with the n_jobs the estimators already carry, no budget
+    # The checks VotingClassifier.fit runs before fitting anything
+    y_type = type_of_target(y, input_name="y")
+    if y_type not in ("binary", "multiclass"):
+        raise ValueError(f"fit_ensemble needs a binary or multiclass target, got a {y_type} one")
+    if ensemble.weights is not None and len(ensemble.weights) != len(ensemble.estimators):
+        raise ValueError(f"Got {len(ensemble.weights)} weights for {len(ensemble.estimators)} estimators")
+
+    if concurrent is None:
+        budget = thread_budget(cores)
+        apply_thread_budget(ensemble, budget)
+        concurrent = budget["concurrent"]
+
+    label_encoder = LabelEncoder().fit(y)
+    y_encoded = label_encoder.transform(y)
+
+    def fit_one(item):
+        name, estimator = item
+        start = time.perf_counter()
+        if name == "lgbm" and lgbm_data is not None:
+            estimator = fit_lgbm_from_dataset(estimator, *lgbm_data, feature_names=hasattr(X, "columns"))
+        else:
+            estimator.fit(X, y_encoded)
+        return estimator, time.perf_counter() - start
+
+    estimators = [(name, clone(estimator)) for name, estimator in ensemble.estimators if estimator != "drop"]
+    with ThreadPoolExecutor(max_workers=concurrent) as executor:
+        fitted = list(executor.map(fit_one, estimators))
+
+    # n_features_in_ is read off estimators_[0], so it needs no setting here
+    ensemble.le_ = label_encoder
+    ensemble.classes_ = label_encoder.classes_
+    ensemble.estimators_ = [estimator for estimator, _ in fitted]
+    fitted_by_name = {name: estimator for (name, _), (estimator, _) in zip(estimators, fitted)}
+    ensemble.named_estimators_ = Bunch(**{name: fitted_by_name.get(name, "drop") for name, _ in ensemble.estimators})
+    if hasattr(ensemble.estimators_[0], "feature_names_in_"):
+        ensemble.feature_names_in_ = ensemble.estimators_[0].feature_names_in_
+
+    return {name: seconds for (name, _), (_, seconds) in zip(estimators, fitted)}
+
+
+def print_fit_times(fit_times, budget):
+    print("[INFO] Base estimator fit times:")
+    for name, seconds in fit_times.items():
+        print(f"  {name:<6} {seconds:>8.2f}s  ({budget[name]} threads)")
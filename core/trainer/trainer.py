@@ -1,29 +1,30 @@
 # core/trainer/trainer.py
 
-import os
-import pandas as pd
-from core.utils.load_multiple_bhavcopies import load_multiple_bhavcopies
-from core.features.feature_engineer import create_features
+from core.utils.panel_snapshot import load_market_panel, lookback_frame
+from core.features.feature_cache import load_cached_features
+from core.features.feature_engineer import PREDICT_LOOKBACK_DAYS
+from core.features.registry import DAILY_FEATURE_COLUMNS
+from core.features.online_state import build_feature_state
 from core.trainer.common import train_and_save_model
-from core.config import DATA_DIR, DAILY_PROCESSED_PATH, DAILY_MODEL_PATH
+from core.config import DATA_DIR, DAILY_MODEL_NAME, FEATURE_STATE_PATH, COMPACT_FEATURES
 
-PROCESSED_PATH = "data/processed_data.csv"
-
-def run_daily_training():
-    df = load_multiple_bhavcopies(DATA_DIR)
-    print(f"[INFO] Loaded {len(df)} rows of raw bhavcopy data")
-    
-    features = create_features(df, predict_mode=False)
+def run_daily_training(compact=COMPACT_FEATURES):
+    # Only trading dates whose bhavcopies changed since the last run are recomputed
+    features = load_cached_features(DAILY_FEATURE_COLUMNS, DATA_DIR, compact=compact)
     print(f"[INFO] Processed dataset has {len(features)} rows")
 
-    os.makedirs(os.path.dirname(DAILY_PROCESSED_PATH), exist_ok=True)
-    features.to_csv(DAILY_PROCESSED_PATH, index=False)
-    print(f"[INFO] Saved processed data to {DAILY_PROCESSED_PATH}")
-
-    X = features.drop(columns=["symbol", "date", "target"])
+    X = features[DAILY_FEATURE_COLUMNS]
     y = features["target"]
 
-    train_and_save_model(X, y, model_path=DAILY_MODEL_PATH)
+    train_and_save_model(X, y, model_name=DAILY_MODEL_NAME, dates=features["date"])
+
+    # Checkpoint the online feature state next to the model so prediction only replays new days;
+    # its buffers only reach back over the predict lookback, counted in each symbol's own sessions
+    panel = load_market_panel(DATA_DIR, verbose=False)
+    recent = panel.dates[-min(PREDICT_LOOKBACK_DAYS, len(panel.dates))] if len(panel.dates) else None
+    df = lookback_frame(panel, PREDICT_LOOKBACK_DAYS, start=recent, by_symbol=False, date_format="%Y-%m-%d")
+    build_feature_state(df).save(FEATURE_STATE_PATH)
+    print(f"[INFO] Feature state checkpointed to {FEATURE_STATE_PATH}")
 
 if __name__ == "__main__":
     run_daily_training()
@@ -0,0 +1,131 @@
+# core/trainer/validation.py
+
+import os
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+
+from core.config import CV_SPLITS, CV_EMBARGO_DAYS, CV_WORKERS
+from core.utils.parallel_load import map_in_order
+
+# Targets compare a row's close with the next bar's close, so a training row reads one bar ahead
+LABEL_HORIZON = 1
+
+
+def walk_forward_folds(dates, n_splits=CV_SPLITS, embargo=CV_EMBARGO_DAYS, label_horizon=LABEL_HORIZON):
+    # Expanding-window folds over trading dates. Test blocks are the last n_splits equal slices of the
+    # date range; each fold trains on every date before its block minus a purge (label_horizon, so no
+    # training target peeks into the test window) and an embargo gap.
+    # dates must be sorted ascending; bounds are row offsets into that order.
+    dates = np.asarray(dates)
+    unique_dates, first_rows = np.unique(dates, return_index=True)
+    first_rows = np.r_[first_rows, len(dates)]
+
+    n_dates = len(unique_dates)
+    test_size = max(1, n_dates // (n_splits + 1))
+    gap = label_horizon + embargo
+
+    folds = []
+    for k in range(n_splits):
+        test_start = n_dates - (n_splits - k) * test_size
+        test_end = n_dates if k == n_splits - 1 else test_start + test_size
+        train_end = test_start - gap
+        if train_end < 1 or test_start >= test_end:
+            continue
+        folds.append({
+            "fold": len(folds),
+            "train_start": str(unique_dates[0]),
+            "train_end": str(unique_dates[train_end - 1]),
+            "test_start": str(unique_dates[test_start]),
+            "test_end": str(unique_dates[test_end - 1]),
+            "train_rows": (0, int(first_rows[train_end])),
+            "test_rows": (int(first_rows[test_start]), int(first_rows[test_end])),
+        })
+    return folds
+
+
+def score_fold(args):
+    fold, matrix_dir, estimator, dropna = args
+    # Every worker maps the same read-only matrix; the fold slices below are views, not copies
+    X = np.load(os.path.join(matrix_dir, "X.npy"), mmap_mode="r")
+    y = np.load(os.path.join(matrix_dir, "y.npy"), mmap_mode="r")
+
+    X_train, y_train = X[slice(*fold["train_rows"])], y[slice(*fold["train_rows"])]
+    X_test, y_test = X[slice(*fold["test_rows"])], y[slice(*fold["test_rows"])]
+    if dropna:
+        train_mask = ~np.isnan(X_train).any(axis=1)
+        test_mask = ~np.isnan(X_test).any(axis=1)
+        X_train, y_train = X_train[train_mask], y_train[train_mask]
+        X_test, y_test = X_test[test_mask], y_test[test_mask]
+
+    row = {key: value for key, value in fold.items() if not key.endswith("_rows")}
+    row.update({"train_rows": len(y_train), "test_rows": len(y_test)})
+    if len(y_test) == 0 or len(np.unique(y_train)) < 2:
+        # Nothing to score, or a single-class train window no classifier can fit
+        return row
+
+    model = clone(estimator)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    row["fit_seconds"] = time.perf_counter() - start
+
+    row.update(fold_metrics(model, X_test, y_test))
+    return row
+
+
+def fold_metrics(model, X_test, y_test):
+    # One predict_proba pass gives both the class (same argmax as predict) and the score
+    proba = model.predict_proba(X_test)
+    y_pred = model.classes_.take(np.argmax(proba, axis=1))
+    return {
+        "accuracy": accuracy_score(y_test, y_pred),
+        "precision": precision_score(y_test, y_pred, zero_division=0),
+        "recall": recall_score(y_test, y_pred, zero_division=0),
+        "f1": f1_score(y_test, y_pred, zero_division=0),
+        "roc_auc": roc_auc_score(y_test, proba[:, 1]) if len(np.unique(y_test)) > 1 else np.nan,
+    }
+
+
+def walk_forward_validate(estimator, X, y, dates, n_splits=CV_SPLITS, embargo=CV_EMBARGO_DAYS, workers=CV_WORKERS,
+                          dropna=False) -> pd.DataFrame:
+    # Per-fold metrics table. Folds run across the process pool, so wall time follows cores, not folds.
+    # dropna: score only NaN-free rows (for estimators such as LogisticRegression that reject NaN)
+    # Every fold fits from its own rows: LightGBM's saved Dataset is not used here, its bin boundaries
+    # are drawn from all rows, test blocks included.
+    order = np.argsort(np.asarray(dates), kind="stable")
+    dates = np.asarray(dates)[order]
+    folds = walk_forward_folds(dates, n_splits, embargo)
+    if not folds:
+        print(f"[WARNING] {len(np.unique(dates))} trading dates are too few for walk-forward validation")
+        return pd.DataFrame()
+
+    matrix_dir = tempfile.mkdtemp(prefix="walk_forward_")
+    try:
+        np.save(os.path.join(matrix_dir, "X.npy"), np.ascontiguousarray(np.asarray(X)[order]))
+        np.save(os.path.join(matrix_dir, "y.npy"), np.asarray(y)[order])
+        tasks = [(fold, matrix_dir, estimator, dropna) for fold in folds]
+        rows = map_in_order(score_fold, tasks, workers)
+    finally:
+        shutil.rmtree(matrix_dir, ignore_errors=True)
+
+    return pd.DataFrame(rows)
+
+
+def print_fold_report(report: pd.DataFrame, output_path=None):
+    if report.empty:
+        return
+
+    metrics = [col for col in ("accuracy", "precision", "recall", "f1", "roc_auc") if col in report.columns]
+    print("[RESULTS] Walk-forward validation")
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.float_format", "{:.4f}".format):
+        print(report.drop(columns=["train_start"]).to_string(index=False))
+    print("Mean:  " + "  ".join(f"{col} {report[col].mean():.4f}" for col in metrics))
+
+    if output_path:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        report.to_csv(output_path, index=False)
+        print(f"[INFO] Fold metrics saved to {output_path}")
@@ -2,21 +2,17 @@
 
 import os
 import pandas as pd
-from core.utils.load_multiple_bhavcopies import load_multiple_bhavcopies
-from core.utils.aggregate_weekly import aggregate_weekly_data
+from core.utils.weekly_bar_store import load_weekly_bars
 from core.features.weekly_feature_engineer import create_weekly_features
 from core.trainer.common import train_and_save_model
-from core.config import DATA_DIR, WEEKLY_MODEL_PATH
+from core.config import DATA_DIR, WEEKLY_MODEL_NAME
 
 PROCESSED_WEEKLY_PATH = "data/weekly_processed.csv"
 
 def run_weekly_training():
-    print("[INFO] Loading daily bhavcopies...")
-    df = load_multiple_bhavcopies(DATA_DIR)
-    print(f"[INFO] Loaded {len(df)} rows of raw data")
-
-    print("[INFO] Aggregating to weekly format...")
-    weekly_df = aggregate_weekly_data(df)
+    # Completed weeks come from the frozen bar store, only the week in progress is aggregated
+    print("[INFO] Loading weekly bars...")
+    weekly_df = load_weekly_bars(DATA_DIR).drop(columns=["partial_week"])
     print(f"[INFO] Weekly dataset has {len(weekly_df)} rows")
 
     print("[INFO] Creating features...")
@@ -30,7 +26,7 @@ def run_weekly_training():
     X = features.drop(columns=["symbol", "date", "target"])
     y = features["target"]
 
-    train_and_save_model(X, y, model_path=WEEKLY_MODEL_PATH)
+    train_and_save_model(X, y, model_name=WEEKLY_MODEL_NAME, dates=features["date"])
 
 if __name__ == "__main__":
     run_weekly_training()
@@ -1,20 +1,27 @@
 #core/utils/aggregate_weekly.py
+import numpy as np
 import pandas as pd
 
-def aggregate_weekly_data(df: pd.DataFrame) -> pd.DataFrame:
-    df["date"] = pd.to_datetime(df["date"])
-    df.set_index("date", inplace=True)
+from core.utils.market_panel import MarketPanel
+
+WEEK_FREQ = "W-MON"
+WEEKLY_FIELDS = ("open", "high", "low", "close", "volume")
 
-    df_weekly = (
-        df.groupby(["symbol", pd.Grouper(freq="W-MON")])
-        .agg({
-            "open": "first",
-            "high": "max",
-            "low": "min",
-            "close": "last",
-            "volume": "sum"
-        })
-        .reset_index()
-        .dropna()
-    )
-    return df_weekly
+def week_label(dates):
+    # Label of the W-MON week each date falls in (the Monday that closes it), same bins as pd.Grouper.
+    # Day arithmetic instead of to_period: 1970-01-01 was a Thursday (weekday 3)
+    days = pd.DatetimeIndex(pd.to_datetime(dates)).normalize().to_numpy().astype("datetime64[D]")
+    weekday = (days.astype(np.int64) + 3) % 7
+    return pd.DatetimeIndex((days + (-weekday) % 7).astype("datetime64[ns]"))
+
+def aggregate_weekly_data(df: pd.DataFrame) -> pd.DataFrame:
+    # Same bars as groupby([symbol, Grouper(freq=W-MON)]) with first/max/min/last/sum, computed on the
+    # dense (date, symbol) panel: one reduceat per field over the date axis instead of a groupby
+    if df.empty:
+        return pd.DataFrame(columns=["symbol", "date", *WEEKLY_FIELDS])
+    panel = MarketPanel.from_long(df, fields=WEEKLY_FIELDS).to_weekly(WEEK_FREQ)
+    df_weekly = panel.to_long(date_format=None, by_symbol=True)[["symbol", "date", *WEEKLY_FIELDS]].dropna()
+    # The panel holds float64; an integer volume column stays integer like the groupby sum
+    if pd.api.types.is_integer_dtype(df["volume"]):
+        df_weekly["volume"] = df_weekly["volume"].astype(np.int64)
+    return df_weekly.reset_index(drop=True)
@@ -0,0 +1,46 @@
+# core/utils/atomic_files.py
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, writers are not serialised
+    fcntl = None
+
+# mkstemp creates files 0600; replaced files get the permissions a plain open() would have given them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def replace_atomically(path):
+    # Yields a temp path beside `path` and moves it into place once the block finishes. The name is
+    # unique per call, so concurrent writers of the same target never write into each other's file;
+    # the leading dot keeps it out of Parquet dataset discovery.
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    os.close(fd)
+    os.chmod(tmp_path, 0o666 & ~_UMASK)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@contextmanager
+def file_lock(lock_path):
+    # Exclusive lock across processes for read-modify-write updates (manifests, indexes, snapshots)
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    with open(lock_path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,217 @@
+# core/utils/bhavcopy_store.py
+
+import os
+import shutil
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from core.config import DATA_DIR, STORE_DIR, INGEST_MANIFEST_PATH, LOADER_WORKERS
+from core.utils.atomic_files import file_lock, replace_atomically
+from core.utils.parallel_load import map_in_order, parse_bhavcopy_file
+from core.utils.ingest_manifest import load_manifest, save_manifest, needs_ingest, record_ingest
+
+# One Parquet file per trading date, hive-partitioned as date=YYYY-MM-DD
+STORE_SCHEMA = pa.schema([
+    ("symbol", pa.string()),
+    ("open", pa.float64()),
+    ("high", pa.float64()),
+    ("low", pa.float64()),
+    ("close", pa.float64()),
+    ("volume", pa.int64()),
+    ("deliverable_qty", pa.int64()),
+])
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+PARTITION_FILE = "part-0.parquet"
+LOCK_FILE = ".lock"  # held while a process syncs the store and its manifest
+
+
+def store_paths(data_dir=DATA_DIR):
+    # (store dir, ingest manifest) for the bhavcopies in data_dir. DATA_DIR ingests into STORE_DIR; any
+    # other folder gets a store of its own beside it, so its days never mix into the shared one
+    if os.path.abspath(data_dir) == os.path.abspath(DATA_DIR):
+        return STORE_DIR, INGEST_MANIFEST_PATH
+    store_dir = f"{os.path.normpath(data_dir)}_store"
+    return store_dir, os.path.join(store_dir, os.path.basename(INGEST_MANIFEST_PATH))
+
+
+def partition_path(date_str, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f"date={date_str}", PARTITION_FILE)
+
+
+def list_store_dates(store_dir=STORE_DIR):
+    if not os.path.isdir(store_dir):
+        return []
+
+    dates = [
+        name.split("=", 1)[1]
+        for name in os.listdir(store_dir)
+        if name.startswith("date=") and os.path.exists(os.path.join(store_dir, name, PARTITION_FILE))
+    ]
+    return sorted(dates)
+
+
+def write_partition(df: pd.DataFrame, date_str: str, store_dir=STORE_DIR):
+    df = df[list(STORE_SCHEMA.names)].copy()
+    df["symbol"] = df["symbol"].astype(str)
+    df["volume"] = pd.to_numeric(df["volume"], errors="coerce").astype("Int64")
+    df["deliverable_qty"] = pd.to_numeric(df["deliverable_qty"], errors="coerce").astype("Int64")
+    df = df.sort_values("symbol", kind="stable")
+
+    table = pa.Table.from_pandas(df, schema=STORE_SCHEMA, preserve_index=False)
+
+    # Write beside the target and swap in, so readers never see a half-written partition
+    with replace_atomically(partition_path(date_str, store_dir)) as tmp_path:
+        pq.write_table(table, tmp_path)
+    return len(df)
+
+
+def read_store(store_dir=STORE_DIR, start=None, end=None, symbols=None, days=None) -> pd.DataFrame:
+    dates = list_store_dates(store_dir)
+    if days:
+        dates = dates[-days:]
+    if start:
+        dates = [d for d in dates if d >= start]
+    if end:
+        dates = [d for d in dates if d <= end]
+
+    if not dates:
+        return pd.DataFrame(columns=list(STORE_SCHEMA.names) + ["date"])
+
+    dataset = ds.dataset(store_dir, format="parquet", partitioning=PARTITIONING, schema=STORE_SCHEMA.append(pa.field("date", pa.string())))
+
+    # Date filter prunes whole partitions, the symbol filter is pushed down to row groups
+    predicate = (ds.field("date") >= dates[0]) & (ds.field("date") <= dates[-1])
+    if symbols is not None:
+        predicate = predicate & ds.field("symbol").isin(list(symbols))
+
+    table = dataset.to_table(filter=predicate)
+    df = table.to_pandas()
+    df.sort_values(by=["date", "symbol"], inplace=True, kind="stable")
+    df.reset_index(drop=True, inplace=True)
+    return df
+
+
+def normalize_bhavcopy_filenames(data_dir=DATA_DIR):
+    # NSE downloads arrive as sec_bhavdata_full_DDMMYYYY.csv, keep only DDMMYYYY.csv
+    for filename in os.listdir(data_dir):
+        if filename.startswith("sec_bhavdata_full_") and filename.endswith(".csv"):
+            date_str = filename.replace("sec_bhavdata_full_", "").replace(".csv", "")
+            try:
+                parsed_date = datetime.strptime(date_str, "%d%m%Y")
+                clean_name = parsed_date.strftime("%d%m%Y") + ".csv"
+                raw_path = os.path.join(data_dir, filename)
+                clean_path = os.path.join(data_dir, clean_name)
+
+                if not os.path.exists(clean_path):
+                    os.rename(raw_path, clean_path)
+                    print(f"[RENAME] {filename} ➔ {clean_name}")
+                else:
+                    print(f"[SKIP] Already exists: {clean_name}")
+            except Exception as e:
+                print(f"[ERROR] Failed to rename {filename}: {e}")
+
+
+def list_bhavcopy_files(data_dir=DATA_DIR, manifest=None):
+    # Returns [(file_name, "YYYY-MM-DD")] sorted by trading date
+    manifest = manifest or {}
+    entries = []
+    for filename in os.listdir(data_dir):
+        if not filename.endswith(".csv"):
+            continue
+        if filename in manifest:
+            entries.append((filename, manifest[filename]["date"]))
+            continue
+        try:
+            parsed_date = datetime.strptime(filename[:-4], "%d%m%Y")
+        except ValueError:
+            continue
+        entries.append((filename, parsed_date.strftime("%Y-%m-%d")))
+
+    entries.sort(key=lambda entry: entry[1])
+    return entries
+
+
+def store_is_current(data_dir=DATA_DIR):
+    # Whether sync_store would find nothing to ingest, rename or drop. Reads only stats and the manifest
+    # (no hashing, no lock, no writes), so a serving process can check without syncing anything itself.
+    store_dir, manifest_path = store_paths(data_dir)
+    if not os.path.isdir(data_dir):
+        return True
+    if any(name.startswith("sec_bhavdata_full_") for name in os.listdir(data_dir)):
+        return False
+
+    manifest = load_manifest(manifest_path)
+    files = list_bhavcopy_files(data_dir, manifest)
+    if {file for file, _ in files} != set(manifest):
+        return False
+    for file, _ in files:
+        stat = os.stat(os.path.join(data_dir, file))
+        if (manifest[file]["size"], manifest[file]["mtime"]) != (stat.st_size, stat.st_mtime):
+            return False
+    return set(list_store_dates(store_dir)) == {date_str for _, date_str in files}
+
+
+def _ingest_file(args):
+    path, date_str, store_dir = args
+    return write_partition(parse_bhavcopy_file(path), date_str, store_dir)
+
+
+def sync_store(data_dir=DATA_DIR, verbose=True, workers=LOADER_WORKERS):
+    # Ingests data_dir into its own store (see store_paths)
+    store_dir, manifest_path = store_paths(data_dir)
+    # One process syncs a store at a time: the API's model cache and training jobs share it
+    with file_lock(os.path.join(store_dir, LOCK_FILE)):
+        normalize_bhavcopy_filenames(data_dir)
+
+        manifest = load_manifest(manifest_path)
+        stored = set(list_store_dates(store_dir))
+        files = list_bhavcopy_files(data_dir, manifest)
+
+        # Files deleted or renamed since the last sync: their entries go, and so does every partition no
+        # remaining file covers (a renamed file is re-parsed under its new name below)
+        present = {file for file, _ in files}
+        removed = [file for file in manifest if file not in present]
+        for file in removed:
+            del manifest[file]
+        orphaned = sorted(stored - {date_str for _, date_str in files})
+        for date_str in orphaned:
+            shutil.rmtree(os.path.dirname(partition_path(date_str, store_dir)), ignore_errors=True)
+        stored -= set(orphaned)
+        if verbose and (removed or orphaned):
+            print(f"[INFO] Dropped {len(removed)} missing bhavcopy files and {len(orphaned)} trading dates from {store_dir}")
+
+        # Only files that are new, changed on disk, or missing their partition get parsed
+        pending = []
+        for file, date_str in files:
+            path = os.path.join(data_dir, file)
+            changed, stat, sha256 = needs_ingest(manifest, file, path)
+            if changed or date_str not in stored:
+                pending.append((file, date_str, path, stat, sha256))
+
+        if verbose and pending:
+            print(f"[INFO] Ingesting {len(pending)} new or changed bhavcopy files into {store_dir}")
+
+        # Each worker parses and writes its own partition; only the manifest is updated here
+        row_counts = map_in_order(_ingest_file, [(path, date_str, store_dir) for _, date_str, path, _, _ in pending], workers)
+
+        for (file, date_str, path, stat, sha256), rows in zip(pending, row_counts):
+            record_ingest(manifest, file, path, stat, date_str, rows, sha256)
+            if verbose:
+                print(f" - {file} → {date_str} ({rows} rows)")
+
+        save_manifest(manifest, manifest_path)
+        return len(pending)
+
+
+def migrate_csv_folder(data_dir=DATA_DIR):
+    store_dir, _ = store_paths(data_dir)
+    print(f"[INFO] Migrating bhavcopies from {data_dir} to {store_dir}...")
+    count = sync_store(data_dir)
+    print(f"[SUCCESS] Store holds {len(list_store_dates(store_dir))} trading dates ({count} newly migrated)")
+
+
+if __name__ == "__main__":
+    migrate_csv_folder()
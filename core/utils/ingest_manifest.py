@@ -0,0 +1,71 @@
+# core/utils/ingest_manifest.py
+
+import os
+import json
+import hashlib
+
+from core.config import INGEST_MANIFEST_PATH
+from core.utils.atomic_files import replace_atomically
+
+
+def load_manifest(path=INGEST_MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=INGEST_MANIFEST_PATH):
+    # Read-modify-write callers hold their store's or cache's sync lock (see atomic_files.file_lock)
+    with replace_atomically(path) as tmp_path:
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def needs_ingest(manifest, file_name, path):
+    # size + mtime is the cheap check; only hash when those moved
+    stat = os.stat(path)
+    entry = manifest.get(file_name)
+    if entry is None:
+        return True, stat, None
+
+    if entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+        return False, stat, entry["sha256"]
+
+    sha256 = file_hash(path)
+    if sha256 == entry["sha256"]:
+        # Touched but not changed: refresh the stat fields, keep the parsed partition
+        entry["size"] = stat.st_size
+        entry["mtime"] = stat.st_mtime
+        return False, stat, sha256
+
+    return True, stat, sha256
+
+
+def record_ingest(manifest, file_name, path, stat, date_str, rows, sha256=None):
+    manifest[file_name] = {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "sha256": sha256 or file_hash(path),
+        "rows": int(rows),
+        "date": date_str,
+    }
+    return manifest[file_name]
+
+
+def manifest_fingerprint(manifest):
+    # Stable digest over every ingested file, used to key downstream caches
+    digest = hashlib.sha256()
+    for file_name in sorted(manifest, key=lambda name: manifest[name]["date"]):
+        entry = manifest[file_name]
+        digest.update(f"{entry['date']}:{entry['sha256']};".encode())
+    return digest.hexdigest()
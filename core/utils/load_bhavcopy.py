@@ -1,6 +1,30 @@
 import pandas as pd
 
-def load_bhavcopy(file_path):
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+
+REQUIRED_COLUMNS = ['symbol', 'open_price', 'high_price', 'low_price', 'close_price', 'ttl_trd_qnty', 'deliv_qty']
+PRICE_COLUMNS = ['open_price', 'high_price', 'low_price', 'close_price']
+QUANTITY_COLUMNS = ['ttl_trd_qnty', 'deliv_qty']
+
+# Rename columns to consistent internal format
+RENAME_MAP = {
+    'open_price': 'open',
+    'high_price': 'high',
+    'low_price': 'low',
+    'close_price': 'close',
+    'ttl_trd_qnty': 'volume',
+    'deliv_qty': 'deliverable_qty'
+}
+
+def load_bhavcopy(file_path, fast=False, price_dtype="float32"):
+    if fast:
+        return load_bhavcopy_fast(file_path, price_dtype=price_dtype)
+
     df = pd.read_csv(file_path)
     df.columns = [col.strip().lower() for col in df.columns]
 
@@ -10,22 +34,81 @@ def load_bhavcopy(file_path):
     if 'series' in df.columns:
         df = df[df['series'].str.strip() == 'EQ']
 
-    required = ['symbol', 'open_price', 'high_price', 'low_price', 'close_price', 'ttl_trd_qnty','deliv_qty']
+    required = REQUIRED_COLUMNS
     missing = set(required) - set(df.columns)
     if missing:
         raise ValueError(f"Missing columns in bhavcopy: {missing}")
 
     df = df[required]
+    df.rename(columns=RENAME_MAP, inplace=True)
+
+    return df
+
+def read_bhavcopy_header(file_path):
+    with open(file_path, "r") as f:
+        return [col.strip().lower() for col in f.readline().split(",")]
+
+def load_bhavcopy_fast(file_path, price_dtype="float32"):
+    # ⚡ Reads only the 7 required columns (+ series) with explicit dtypes.
+    # NSE pads every field after the first with a space; both engines absorb it at parse time.
+    header = read_bhavcopy_header(file_path)
+    missing = set(REQUIRED_COLUMNS) - set(header)
+    if missing:
+        raise ValueError(f"Missing columns in bhavcopy: {missing}")
+
+    usecols = REQUIRED_COLUMNS + (['series'] if 'series' in header else [])
+
+    if pa is not None:
+        df = _read_with_pyarrow(file_path, header, usecols, price_dtype)
+    else:
+        df = _read_with_pandas(file_path, header, usecols, price_dtype)
+
+    df = df[REQUIRED_COLUMNS].rename(columns=RENAME_MAP)
+    df.reset_index(drop=True, inplace=True)
+    return df
+
+def _read_with_pyarrow(file_path, header, usecols, price_dtype):
+    column_types = {col: pa.from_numpy_dtype(price_dtype) for col in PRICE_COLUMNS}
+    column_types.update({col: pa.float64() for col in QUANTITY_COLUMNS})
+
+    table = pacsv.read_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(column_names=header, skip_rows=1, use_threads=False),
+        convert_options=pacsv.ConvertOptions(include_columns=usecols, column_types=column_types, null_values=["-", " -"], strings_can_be_null=False),
+    )
+
+    # Filter and cast while still columnar, so pandas only ever sees the EQ rows
+    if 'series' in table.column_names:
+        table = table.filter(pc.equal(pc.utf8_trim_whitespace(table['series']), 'EQ')).drop_columns(['series'])
+
+    # Deliverable quantity is "-" for non-EQ series, so it can only be made integral after the filter
+    for col in QUANTITY_COLUMNS:
+        if table[col].null_count == 0:
+            table = table.set_column(table.column_names.index(col), col, table[col].cast(pa.int64()))
+
+    table = table.set_column(table.column_names.index('symbol'), 'symbol', table['symbol'].dictionary_encode())
+    return table.to_pandas()
+
+def _read_with_pandas(file_path, header, usecols, price_dtype):
+    dtype = {col: price_dtype for col in PRICE_COLUMNS}
+    dtype.update({col: "float64" for col in QUANTITY_COLUMNS})
+    dtype.update({'symbol': 'category', 'series': 'category'})
+
+    df = pd.read_csv(
+        file_path,
+        header=0,
+        names=header,
+        usecols=usecols,
+        dtype={col: dtype[col] for col in usecols},
+        skipinitialspace=True,
+        na_values=["-"],
+    )
+
+    if 'series' in df.columns:
+        df = df[df['series'] == 'EQ'].drop(columns=['series'])
+
+    for col in QUANTITY_COLUMNS:
+        df[col] = df[col].astype("int64" if df[col].notna().all() else "Int64")
 
-    # Rename columns to consistent internal format
-    rename_map = {
-        'open_price': 'open',
-        'high_price': 'high',
-        'low_price': 'low',
-        'close_price': 'close',
-        'ttl_trd_qnty': 'volume',
-        'deliv_qty': 'deliverable_qty'
-    }
-    df.rename(columns=rename_map, inplace=True)
-
-    return df
\ No newline at end of file
+    df['symbol'] = df['symbol'].cat.remove_unused_categories()
+    return df
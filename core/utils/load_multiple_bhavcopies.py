@@ -1,30 +1,31 @@
-from datetime import datetime
 import os
 import pandas as pd
-from core.utils.load_bhavcopy import load_bhavcopy
-from core.config import DATA_DIR
+from core.utils.parallel_load import map_in_order, parse_bhavcopy_file, assemble_frames
+from core.utils.bhavcopy_store import normalize_bhavcopy_filenames, read_store, store_paths, sync_store
+from core.utils.panel_snapshot import load_market_panel, panel_to_frame, snapshot_path
+from core.config import DATA_DIR, USE_BHAVCOPY_STORE, USE_PANEL_SNAPSHOT, LOADER_WORKERS
+
+def load_multiple_bhavcopies(data_dir = DATA_DIR, days=None, verbose=True, start=None, end=None, symbols=None, use_store=USE_BHAVCOPY_STORE, use_snapshot=USE_PANEL_SNAPSHOT, workers=LOADER_WORKERS):
+
+    # --- 🗺️ Memory-mapped panel snapshot: zero-copy open, only touched dates page in ---
+    if use_store and use_snapshot:
+        panel = load_market_panel(data_dir, verbose=verbose, workers=workers)
+        df = panel_to_frame(panel, start=start, end=end, symbols=symbols, days=days)
+        if verbose:
+            print(f"[INFO] Loaded {df['date'].nunique()} trading dates from {snapshot_path(data_dir)}")
+        return df
+
+    # --- 🗄️ Columnar store: ingest new CSVs once, then read typed partitions ---
+    if use_store:
+        store_dir, _ = store_paths(data_dir)
+        sync_store(data_dir, verbose=verbose, workers=workers)
+        df = read_store(store_dir, start=start, end=end, symbols=symbols, days=days)
+        if verbose:
+            print(f"[INFO] Loaded {df['date'].nunique()} trading dates from {store_dir}")
+        return df
 
-def load_multiple_bhavcopies(data_dir = DATA_DIR, days=None, verbose=True):
-    
     # --- 🛠️ Precheck Step: Auto-rename messy bhavcopies first ---
-    files = [f for f in os.listdir(data_dir) if f.endswith(".csv")]
-
-    for filename in files:
-        if filename.startswith("sec_bhavdata_full_") and filename.endswith(".csv"):
-            date_str = filename.replace("sec_bhavdata_full_", "").replace(".csv", "")
-            try:
-                parsed_date = datetime.strptime(date_str, "%d%m%Y")
-                clean_name = parsed_date.strftime("%d%m%Y") + ".csv"
-                raw_path = os.path.join(data_dir, filename)
-                clean_path = os.path.join(data_dir, clean_name)
-
-                if not os.path.exists(clean_path):
-                    os.rename(raw_path, clean_path)
-                    print(f"[RENAME] {filename} ➔ {clean_name}")
-                else:
-                    print(f"[SKIP] Already exists: {clean_name}")
-            except Exception as e:
-                print(f"[ERROR] Failed to rename {filename}: {e}")
+    normalize_bhavcopy_filenames(data_dir)
 
     # --- 🧠 Now safe to sort clean files by date ---
     
@@ -39,15 +40,22 @@ def load_multiple_bhavcopies(data_dir = DATA_DIR, days=None, verbose=True):
     if verbose:
         print(f"[INFO] Loading {len(files)} bhavcopy files (sorted by date):")
 
-    data_frames = []
+    selected = []
     for file in files:
         parsed_date = pd.to_datetime(file.replace(".csv", ""), format="%d%m%Y")
+        date_str = parsed_date.strftime("%Y-%m-%d")
+        if (start and date_str < start) or (end and date_str > end):
+            continue
         if verbose:
-            print(f" - {file} → {parsed_date.strftime('%Y-%m-%d')}")
+            print(f" - {file} → {date_str}")
+        selected.append((os.path.join(data_dir, file), date_str))
+
+    if not selected:
+        return pd.DataFrame()
 
-        path = os.path.join(data_dir, file)
-        df = load_bhavcopy(path)
-        df["date"] = parsed_date.strftime("%Y-%m-%d")
-        data_frames.append(df)
+    # ⚡ Files are parsed across the worker pool and come back in date order
+    data_frames = map_in_order(parse_bhavcopy_file, [path for path, _ in selected], workers)
+    if symbols is not None:
+        data_frames = [df[df["symbol"].isin(symbols)] for df in data_frames]
 
-    return pd.concat(data_frames, ignore_index=True)
+    return assemble_frames(data_frames, [date_str for _, date_str in selected])
@@ -0,0 +1,194 @@
+# core/utils/market_panel.py
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+PANEL_FIELDS = ("open", "high", "low", "close", "volume", "deliverable_qty")
+
+
+class MarketPanel:
+    # Dense (field, date, symbol) block: every field is a contiguous (n_dates, n_symbols)
+    # float64 array, NaN wherever a symbol was not listed / not traded on a date.
+
+    def __init__(self, values: np.ndarray, dates, symbols, fields=PANEL_FIELDS, first_traded=None):
+        values = np.asarray(values)
+        if values.shape != (len(fields), len(dates), len(symbols)):
+            raise ValueError(f"Panel shape {values.shape} does not match ({len(fields)}, {len(dates)}, {len(symbols)})")
+
+        self.values = values
+        self.dates = pd.DatetimeIndex(dates)
+        self.symbols = pd.Index(symbols)
+        self.fields = tuple(fields)
+        self._field_pos = {name: i for i, name in enumerate(self.fields)}
+        self._first_traded = None if first_traded is None else np.asarray(first_traded, dtype=np.int64)
+
+    # ──────────────────────────────────────────────
+    # 🔁 LONG FORMAT CONVERSION
+    # ──────────────────────────────────────────────
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame, fields=PANEL_FIELDS):
+        dates = pd.to_datetime(df["date"])
+        date_codes, date_uniques = pd.factorize(dates, sort=True)
+        symbol_codes, symbol_uniques = pd.factorize(df["symbol"], sort=True)
+
+        # One cell per (date, symbol): a second row would silently overwrite the first
+        duplicated = pd.Series(date_codes * len(symbol_uniques) + symbol_codes).duplicated().to_numpy()
+        if duplicated.any():
+            rows = df.loc[duplicated, ["date", "symbol"]].head(5).astype(str)
+            examples = ", ".join(f"{date} {symbol}" for date, symbol in rows.itertuples(index=False))
+            raise ValueError(f"{int(duplicated.sum())} duplicate (date, symbol) rows, e.g. {examples}")
+
+        values = np.full((len(fields), len(date_uniques), len(symbol_uniques)), np.nan)
+        for i, name in enumerate(fields):
+            values[i, date_codes, symbol_codes] = pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+        return cls(values, date_uniques, symbol_uniques, fields)
+
+    def to_long(self, fields=None, date_format="%Y-%m-%d", by_symbol=False) -> pd.DataFrame:
+        # by_symbol: rows in (symbol, date) order, the layout the feature kernels expect, read off the
+        # transposed arrays instead of sorting a (date, symbol) frame afterwards
+        fields = fields or self.fields
+        # A (date, symbol) cell exists in long format only if the symbol traded that day
+        traded = ~np.isnan(self["close"])
+        # Symbols come out sorted even where a snapshot extension appended new ones at the end
+        order = np.argsort(self.symbols.to_numpy(), kind="stable")
+        if by_symbol:
+            symbol_pos, date_idx = np.nonzero(traded[:, order].T)
+        else:
+            date_idx, symbol_pos = np.nonzero(traded[:, order])
+        symbol_idx = order[symbol_pos]
+
+        out = {"symbol": self.symbols.to_numpy()[symbol_idx]}
+        for name in fields:
+            out[name] = self[name][date_idx, symbol_idx]
+        dates = self.dates[date_idx]
+        out["date"] = dates.strftime(date_format) if date_format else dates
+        return pd.DataFrame(out)
+
+    # ──────────────────────────────────────────────
+    # 🧭 INDEXING
+    # ──────────────────────────────────────────────
+
+    def __getitem__(self, field) -> np.ndarray:
+        return self.values[self._field_pos[field]]
+
+    @property
+    def shape(self):
+        return len(self.dates), len(self.symbols)
+
+    def symbol_column(self, symbol):
+        return self.symbols.get_loc(symbol)
+
+    def date_row(self, date):
+        return self.dates.get_loc(pd.Timestamp(date))
+
+    @property
+    def first_traded(self) -> np.ndarray:
+        # Date position of each symbol's first traded session (len(dates) if it never traded)
+        if self._first_traded is None:
+            traded = ~np.isnan(self["close"])
+            self._first_traded = np.where(traded.any(axis=0), traded.argmax(axis=0), len(self.dates))
+        return self._first_traded
+
+    def lookback_start(self, start, end, rows):
+        # Position of the first date needed so every symbol traded in dates[start:end + 1] also gets its
+        # `rows` previous traded sessions (all of them where its history is shorter). The rows are the
+        # symbol's own, so a suspended symbol reaches back further than `rows` sessions of the calendar;
+        # the window is widened backwards in doubling steps instead of counting over the whole history.
+        close = self["close"]
+        cols = np.flatnonzero((~np.isnan(close[start:end + 1])).any(axis=0))
+        if start == 0 or not len(cols) or rows <= 0:
+            return start
+        first = self.first_traded[cols]
+
+        step = rows
+        while True:
+            lo = max(0, start - step)
+            traded = ~np.isnan(close[lo:start][:, cols])
+            # Traded sessions from each date up to start, per symbol
+            remaining = traded[::-1].cumsum(axis=0)[::-1]
+            reached = remaining >= rows
+            enough = reached.any(axis=0)
+            if lo == 0 or (enough | (first >= lo)).all():
+                break
+            step *= 2
+
+        # Last date at which a symbol still has `rows` sessions ahead of it; its listing date otherwise
+        last_reached = len(reached) - 1 - reached[::-1].argmax(axis=0)
+        needed = np.where(enough, lo + last_reached, np.maximum(first, lo))
+        return int(min(needed.min(), start))
+
+    def slice_dates(self, start=None, end=None):
+        lo = self.dates.searchsorted(pd.Timestamp(start)) if start is not None else 0
+        hi = self.dates.searchsorted(pd.Timestamp(end), side="right") if end is not None else len(self.dates)
+        return MarketPanel(self.values[:, lo:hi], self.dates[lo:hi], self.symbols, self.fields)
+
+    # ──────────────────────────────────────────────
+    # 📐 STRIDED ARRAY OPERATIONS (along the date axis)
+    # ──────────────────────────────────────────────
+
+    def shift(self, field, periods=1) -> np.ndarray:
+        values = self[field]
+        out = np.full_like(values, np.nan)
+        if periods > 0:
+            out[periods:] = values[:-periods]
+        elif periods < 0:
+            out[:periods] = values[-periods:]
+        else:
+            out[:] = values
+        return out
+
+    def pct_change(self, field, periods=1) -> np.ndarray:
+        return self[field] / self.shift(field, periods) - 1
+
+    def forward_return(self, periods=1, field="close") -> np.ndarray:
+        return self.shift(field, -periods) / self[field] - 1
+
+    def rolling_windows(self, field, window) -> np.ndarray:
+        # (n_dates - window + 1, n_symbols, window) view, no copy
+        return sliding_window_view(self[field], window, axis=0)
+
+    def rolling(self, field, window, func=np.mean) -> np.ndarray:
+        out = np.full(self.shape, np.nan)
+        if window <= len(self.dates):
+            out[window - 1:] = func(self.rolling_windows(field, window), axis=-1)
+        return out
+
+    # ──────────────────────────────────────────────
+    # 📅 WEEKLY RESAMPLING
+    # ──────────────────────────────────────────────
+
+    def to_weekly(self, freq="W-MON"):
+        # Same bars as groupby([symbol, Grouper(freq)]) with first/max/min/last/sum
+        labels = self.dates.to_period(freq).end_time.normalize()
+        starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+        ends = np.r_[starts[1:], len(self.dates)] - 1
+        week_dates = labels[starts]
+
+        rows = np.arange(len(self.dates))[:, None]
+        valid = ~np.isnan(self["close"])
+        # Forward / backward fill the row index of the last / next traded day per symbol
+        last_row = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)[ends]
+        first_row = np.minimum.accumulate(np.where(valid, rows, len(self.dates))[::-1], axis=0)[::-1][starts]
+        has_trades = last_row >= starts[:, None]
+
+        cols = np.arange(len(self.symbols))
+        first_row = np.where(has_trades, first_row, 0)
+        last_row = np.where(has_trades, last_row, 0)
+
+        aggregations = {
+            "open": lambda v: v[first_row, cols],
+            "high": lambda v: np.fmax.reduceat(v, starts, axis=0),
+            "low": lambda v: np.fmin.reduceat(v, starts, axis=0),
+            "close": lambda v: v[last_row, cols],
+            "volume": lambda v: np.add.reduceat(np.nan_to_num(v), starts, axis=0),
+            "deliverable_qty": lambda v: np.add.reduceat(np.nan_to_num(v), starts, axis=0),
+        }
+
+        weekly = np.full((len(self.fields), len(starts), len(self.symbols)), np.nan)
+        for i, name in enumerate(self.fields):
+            weekly[i] = np.where(has_trades, aggregations[name](self[name]), np.nan)
+
+        return MarketPanel(weekly, week_dates, self.symbols, self.fields)
@@ -0,0 +1,149 @@
+# core/utils/model_registry.py
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+from datetime import datetime
+import joblib
+
+from core.config import MODEL_REGISTRY_DIR, MODEL_REGISTRY_KEEP
+from core.utils.ingest_manifest import load_manifest, save_manifest, file_hash
+
+# models/registry/<name>/<version>/{model.joblib, meta.json}. <name>/current.json names the
+# promoted version and the ones promoted before it; swapping that one small file is the whole
+# promotion, so readers see either the old model or the new one, never a half-written file.
+MODEL_FILE = "model.joblib"
+META_FILE = "meta.json"
+CURRENT_FILE = "current.json"
+
+
+def _model_dir(name, registry_dir=MODEL_REGISTRY_DIR):
+    return os.path.join(registry_dir, name)
+
+
+def _pointer(name, registry_dir=MODEL_REGISTRY_DIR):
+    return load_manifest(os.path.join(_model_dir(name, registry_dir), CURRENT_FILE))
+
+
+def list_versions(name, registry_dir=MODEL_REGISTRY_DIR):
+    # Oldest first: versions start with their creation timestamp
+    model_dir = _model_dir(name, registry_dir)
+    if not os.path.isdir(model_dir):
+        return []
+    return sorted(
+        entry for entry in os.listdir(model_dir)
+        if os.path.exists(os.path.join(model_dir, entry, META_FILE))
+    )
+
+
+def current_version(name, registry_dir=MODEL_REGISTRY_DIR):
+    return _pointer(name, registry_dir).get("version")
+
+
+def load_model_meta(name, version=None, registry_dir=MODEL_REGISTRY_DIR):
+    version = version or current_version(name, registry_dir)
+    if version is None:
+        return None
+    with open(os.path.join(_model_dir(name, registry_dir), version, META_FILE), "r") as f:
+        return json.load(f)
+
+
+def promote_model(name, version, registry_dir=MODEL_REGISTRY_DIR):
+    if version not in list_versions(name, registry_dir):
+        raise ValueError(f"Model {name} has no version {version}")
+
+    pointer = _pointer(name, registry_dir)
+    previous = [pointer["version"]] if pointer.get("version") else []
+    history = [v for v in previous + pointer.get("history", []) if v != version]
+    save_manifest({"version": version, "history": history, "promoted_at": datetime.now().isoformat(timespec="seconds")},
+                  os.path.join(_model_dir(name, registry_dir), CURRENT_FILE))
+    return version
+
+
+def rollback_model(name, registry_dir=MODEL_REGISTRY_DIR):
+    # Re-points current at the version promoted before it; the rolled-back version stays on disk
+    history = [v for v in _pointer(name, registry_dir).get("history", []) if v in list_versions(name, registry_dir)]
+    if not history:
+        raise ValueError(f"Model {name} has no earlier version to roll back to")
+    save_manifest({"version": history[0], "history": history[1:], "promoted_at": datetime.now().isoformat(timespec="seconds")},
+                  os.path.join(_model_dir(name, registry_dir), CURRENT_FILE))
+    return history[0]
+
+
+def _prune(name, registry_dir):
+    # Keeps the newest MODEL_REGISTRY_KEEP versions, plus whatever the pointer can still roll back to
+    pointer = _pointer(name, registry_dir)
+    protected = {pointer.get("version")} | set(pointer.get("history", [])[:MODEL_REGISTRY_KEEP])
+    versions = list_versions(name, registry_dir)
+    for version in versions[:-MODEL_REGISTRY_KEEP]:
+        if version not in protected:
+            shutil.rmtree(os.path.join(_model_dir(name, registry_dir), version), ignore_errors=True)
+
+
+def register_model(model, name, meta, promote=True, registry_dir=MODEL_REGISTRY_DIR):
+    # Writes the model and its metadata into a new version directory and (by default) promotes it.
+    # meta: feature list, training range, data fingerprint, metrics, timings (see training_meta).
+    # Dumped uncompressed so numpy arrays inside can be memory-mapped back by load_model.
+    model_dir = _model_dir(name, registry_dir)
+    os.makedirs(model_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".staging_", dir=model_dir)
+    try:
+        model_path = os.path.join(staging, MODEL_FILE)
+        joblib.dump(model, model_path)
+        sha256 = file_hash(model_path)
+
+        created_at = datetime.now()
+        version = f"{created_at:%Y%m%dT%H%M%S}-{sha256[:8]}"
+        meta = {
+            **meta,
+            "name": name,
+            "version": version,
+            "created_at": created_at.isoformat(timespec="seconds"),
+            "sha256": sha256,
+            "size_bytes": os.path.getsize(model_path),
+        }
+        with open(os.path.join(staging, META_FILE), "w") as f:
+            json.dump(meta, f, indent=2, default=str)
+
+        os.replace(staging, os.path.join(model_dir, version))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if promote:
+        promote_model(name, version, registry_dir)
+    _prune(name, registry_dir)
+    print(f"[INFO] Registered {name} version {version}{' (current)' if promote else ''}")
+    return version
+
+
+def load_model(name, version=None, mmap=True, verify=False, registry_dir=MODEL_REGISTRY_DIR):
+    # (model, meta) for the current or a given version; (None, None) if nothing is registered.
+    # mmap: numpy arrays are mapped read-only from the file instead of copied onto the heap, so
+    # processes serving the same version share one copy through the page cache. Use mmap=False to
+    # mutate the model (e.g. warm-start training).
+    meta = load_model_meta(name, version, registry_dir)
+    if meta is None:
+        return None, None
+
+    model_path = os.path.join(_model_dir(name, registry_dir), meta["version"], MODEL_FILE)
+    if verify and file_hash(model_path) != meta["sha256"]:
+        raise ValueError(f"Model {name} version {meta['version']} does not match its recorded sha256")
+    return joblib.load(model_path, mmap_mode="r" if mmap else None), meta
+
+
+if __name__ == "__main__":
+    # python -m core.utils.model_registry list|rollback|promote <name> [version]
+    command, name = sys.argv[1], sys.argv[2]
+    if command == "rollback":
+        print(f"[SUCCESS] {name} rolled back to {rollback_model(name)}")
+    elif command == "promote":
+        print(f"[SUCCESS] {name} promoted to {promote_model(name, sys.argv[3])}")
+    else:
+        current = current_version(name)
+        for version in list_versions(name):
+            meta = load_model_meta(name, version)
+            marker = "*" if version == current else " "
+            print(f"{marker} {version}  {meta.get('train_start')} → {meta.get('train_end')}  {meta.get('metrics', {})}")
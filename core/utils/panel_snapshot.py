@@ -0,0 +1,186 @@
+# core/utils/panel_snapshot.py
+
+import os
+import json
+import uuid
+import numpy as np
+import pandas as pd
+
+from core.config import (DATA_DIR, STORE_DIR, PANEL_SNAPSHOT_PATH, LOADER_WORKERS, PANEL_SNAPSHOT_DATE_HEADROOM,
+                         PANEL_SNAPSHOT_SYMBOL_HEADROOM)
+from core.utils.atomic_files import file_lock, replace_atomically
+from core.utils.bhavcopy_store import read_store, store_paths, sync_store
+from core.utils.ingest_manifest import load_manifest, manifest_fingerprint
+from core.utils.market_panel import MarketPanel
+
+# A snapshot is a directory: header.json (dates, symbols, each date's source hash, the current data file)
+# and a float64 (field, date, symbol) block with spare rows and columns for dates and symbols to come.
+# A new session is written into the spare rows, then published by replacing header.json: cells a reader
+# can see never change under its memmap. A rebuild writes a new data file for the same reason.
+HEADER_FILE = "header.json"
+LOCK_FILE = ".lock"
+SNAPSHOT_DTYPE = "<f8"
+
+
+def read_snapshot_header(path=PANEL_SNAPSHOT_PATH):
+    header_path = os.path.join(path, HEADER_FILE)
+    if not os.path.exists(header_path):
+        return None
+    with open(header_path, "r") as f:
+        return json.load(f)
+
+
+def _data_block(path, header, mode="r"):
+    shape = (len(header["fields"]), *header["capacity"])
+    return np.memmap(os.path.join(path, header["data_file"]), dtype=header["dtype"], mode=mode, shape=shape)
+
+
+def _publish(path, header):
+    with replace_atomically(os.path.join(path, HEADER_FILE)) as tmp_path:
+        with open(tmp_path, "w") as f:
+            json.dump(header, f)
+
+
+def write_snapshot(panel: MarketPanel, path=PANEL_SNAPSHOT_PATH, sources=None, fingerprint=None, previous=None):
+    # Full rebuild into a fresh data file with room for PANEL_SNAPSHOT_*_HEADROOM more dates / symbols.
+    # The data file the previous header pointed at stays for readers that opened it; older ones go.
+    n_dates, n_symbols = panel.shape
+    header = {
+        "fields": list(panel.fields),
+        "dates": panel.dates.strftime("%Y-%m-%d").tolist(),
+        "symbols": [str(symbol) for symbol in panel.symbols],
+        "sources": sources or {},
+        "first_traded": panel.first_traded.tolist(),
+        "fingerprint": fingerprint,
+        "dtype": SNAPSHOT_DTYPE,
+        "capacity": [n_dates + PANEL_SNAPSHOT_DATE_HEADROOM, n_symbols + PANEL_SNAPSHOT_SYMBOL_HEADROOM],
+        "data_file": f"panel-{uuid.uuid4().hex[:12]}.f8",
+    }
+
+    os.makedirs(path, exist_ok=True)
+    block = _data_block(path, header, mode="w+")
+    block[:] = np.nan
+    block[:, :n_dates, :n_symbols] = panel.values
+    block.flush()
+    del block
+    _publish(path, header)
+
+    keep = {header["data_file"], previous["data_file"] if previous else None}
+    for name in os.listdir(path):
+        if name.startswith("panel-") and name not in keep:
+            os.remove(os.path.join(path, name))
+
+
+def _appended_dates(header, sources):
+    # Dates the snapshot lacks when it only needs newer sessions added; None when a date it holds
+    # changed or went away, or a missing date falls before its last one (both need a rebuild)
+    if header is None or not header["dates"] or "first_traded" not in header:
+        return None
+    if any(sources.get(date_str) != sha256 for date_str, sha256 in header["sources"].items()):
+        return None
+    new_dates = sorted(set(sources) - set(header["sources"]))
+    if not new_dates or new_dates[0] <= header["dates"][-1]:
+        return None
+    return new_dates
+
+
+def _extend_snapshot(path, header, new_panel: MarketPanel, sources, fingerprint):
+    # Writes new_panel's sessions into the spare rows (new symbols take spare columns) and publishes
+    # them. False when they do not fit in the capacity left.
+    n_dates = len(header["dates"])
+    known = pd.Index(header["symbols"])
+    symbols = known.append(new_panel.symbols.difference(known))
+    end = n_dates + len(new_panel.dates)
+    if end > header["capacity"][0] or len(symbols) > header["capacity"][1]:
+        return False
+
+    block = _data_block(path, header, mode="r+")
+    block[:, n_dates:end] = np.nan  # whatever an interrupted extension left there
+    block[:, n_dates:end, symbols.get_indexer(new_panel.symbols)] = new_panel.values
+    block.flush()
+    del block
+
+    added = new_panel.symbols.difference(known)
+    first_new = n_dates + new_panel.first_traded[new_panel.symbols.get_indexer(added)]
+    _publish(path, {
+        **header,
+        "dates": header["dates"] + new_panel.dates.strftime("%Y-%m-%d").tolist(),
+        "symbols": [str(symbol) for symbol in symbols],
+        "first_traded": header["first_traded"] + first_new.tolist(),
+        "sources": sources,
+        "fingerprint": fingerprint,
+    })
+    return True
+
+
+def open_snapshot(path=PANEL_SNAPSHOT_PATH, header=None) -> MarketPanel:
+    # Zero-copy: the panel is a read-only memmap view of the used rows and columns, pages load only when touched
+    header = header or read_snapshot_header(path)
+    values = _data_block(path, header)[:, :len(header["dates"]), :len(header["symbols"])]
+    return MarketPanel(values, header["dates"], header["symbols"], header["fields"], header.get("first_traded"))
+
+
+def snapshot_path(data_dir=DATA_DIR):
+    # PANEL_SNAPSHOT_PATH for DATA_DIR; any other folder's snapshot sits in its own store
+    store_dir, _ = store_paths(data_dir)
+    return PANEL_SNAPSHOT_PATH if store_dir == STORE_DIR else os.path.join(store_dir, "_panel_snapshot")
+
+
+def load_market_panel(data_dir=DATA_DIR, path=None, verbose=True, workers=LOADER_WORKERS) -> MarketPanel:
+    store_dir, manifest_path = store_paths(data_dir)
+    path = path or snapshot_path(data_dir)
+    sync_store(data_dir, verbose=verbose, workers=workers)
+    manifest = load_manifest(manifest_path)
+    fingerprint = manifest_fingerprint(manifest)
+
+    header = read_snapshot_header(path)
+    if header is not None and header["fingerprint"] == fingerprint:
+        return open_snapshot(path, header)
+
+    # One process updates the snapshot; the others wait and then find it current
+    with file_lock(os.path.join(path, LOCK_FILE)):
+        header = read_snapshot_header(path)
+        if header is not None and header["fingerprint"] == fingerprint:
+            return open_snapshot(path, header)
+
+        sources = {entry["date"]: entry["sha256"] for entry in manifest.values()}
+        new_dates = _appended_dates(header, sources)
+        if new_dates:
+            new_panel = MarketPanel.from_long(read_store(store_dir, start=new_dates[0]), fields=header["fields"])
+            if _extend_snapshot(path, header, new_panel, sources, fingerprint):
+                if verbose:
+                    print(f"[INFO] Added {len(new_dates)} trading dates to the panel snapshot at {path}")
+                return open_snapshot(path)
+
+        if verbose:
+            print(f"[INFO] Rebuilding panel snapshot at {path}...")
+        write_snapshot(MarketPanel.from_long(read_store(store_dir)), path, sources, fingerprint, previous=header)
+        return open_snapshot(path)
+
+
+def panel_to_frame(panel: MarketPanel, start=None, end=None, symbols=None, days=None, by_symbol=False, date_format="%Y-%m-%d"):
+    if days and len(panel.dates):
+        panel = panel.slice_dates(panel.dates[-min(days, len(panel.dates))], None)
+    panel = panel.slice_dates(start, end)
+    if symbols is not None:
+        cols = np.flatnonzero(panel.symbols.isin(list(symbols)))
+        panel = MarketPanel(panel.values[:, :, cols], panel.dates, panel.symbols[cols], panel.fields)
+
+    df = panel.to_long(date_format=date_format, by_symbol=by_symbol)
+    # Quantities are float in the panel (NaN = not listed); restore integers where complete
+    for col in ("volume", "deliverable_qty"):
+        if col in df.columns and df[col].notna().all():
+            df[col] = df[col].astype("int64")
+    return df
+
+
+def lookback_frame(panel: MarketPanel, rows, start=None, end=None, by_symbol=True, date_format=None):
+    # Sessions in [start, end] plus, for every symbol traded in them, the `rows - 1` sessions it traded
+    # before: what the row-based feature windows read. By default in the (symbol, date) layout
+    # create_features(presorted=True) takes.
+    if not len(panel.dates):
+        return panel_to_frame(panel, by_symbol=by_symbol, date_format=date_format)
+    lo = panel.dates.searchsorted(pd.Timestamp(start)) if start is not None else 0
+    hi = panel.dates.searchsorted(pd.Timestamp(end), side="right") - 1 if end is not None else len(panel.dates) - 1
+    first = panel.lookback_start(lo, hi, rows - 1)
+    return panel_to_frame(panel, start=panel.dates[first], end=panel.dates[hi], by_symbol=by_symbol, date_format=date_format)
@@ -0,0 +1,69 @@
+# core/utils/parallel_load.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from core.config import LOADER_WORKERS
+from core.utils.load_bhavcopy import load_bhavcopy
+
+
+def resolve_workers(workers=LOADER_WORKERS):
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def map_in_order(fn, items, workers=LOADER_WORKERS):
+    # executor.map yields in submission order, so callers get results sorted the same way as items
+    items = list(items)
+    workers = min(resolve_workers(workers), len(items))
+    if workers <= 1:
+        return [fn(item) for item in items]
+
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fn, items, chunksize=chunksize))
+
+
+def parse_bhavcopy_file(path):
+    # float64 prices keep paise exact for high-priced scrips; float32 is for in-memory use only
+    return load_bhavcopy(path, fast=True, price_dtype="float64")
+
+
+def _column_dtype(frames, col):
+    dtypes = [frame[col].dtype for frame in frames]
+    if any(not pd.api.types.is_numeric_dtype(dtype) for dtype in dtypes):
+        return object
+    if any(isinstance(dtype, pd.api.extensions.ExtensionDtype) for dtype in dtypes):
+        # Nullable Int64 (missing deliverable qty) widens to float64 with NaN
+        return np.float64
+    return np.result_type(*dtypes)
+
+
+def assemble_frames(frames, dates):
+    # Preallocate every output column once and copy each file into its slice,
+    # instead of building the intermediate block list pd.concat would
+    total = sum(len(frame) for frame in frames)
+    if total == 0:
+        return pd.DataFrame()
+
+    columns = list(frames[0].columns)
+    out = {col: np.empty(total, dtype=_column_dtype(frames, col)) for col in columns}
+    out_dates = np.empty(total, dtype=object)
+
+    offset = 0
+    for frame, date_str in zip(frames, dates):
+        n = len(frame)
+        for col in columns:
+            target = out[col]
+            if target.dtype.kind == "f":
+                target[offset:offset + n] = frame[col].to_numpy(dtype=target.dtype, na_value=np.nan)
+            else:
+                target[offset:offset + n] = frame[col].to_numpy(dtype=target.dtype)
+        out_dates[offset:offset + n] = date_str
+        offset += n
+
+    out["date"] = out_dates
+    return pd.DataFrame(out, copy=False)
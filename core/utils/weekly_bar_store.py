@@ -0,0 +1,105 @@
+# core/utils/weekly_bar_store.py
+
+import os
+import hashlib
+import pandas as pd
+import pyarrow.dataset as ds
+
+from core.config import DATA_DIR, WEEKLY_BAR_DIR
+from core.utils.aggregate_weekly import aggregate_weekly_data, week_label
+from core.utils.atomic_files import file_lock, replace_atomically
+from core.utils.bhavcopy_store import LOCK_FILE, partition_path, list_store_dates, read_store, store_paths, sync_store
+from core.utils.ingest_manifest import load_manifest, save_manifest
+
+# Completed W-MON weeks are aggregated once and frozen as date=<week label> partitions. The week
+# still in progress is rebuilt from its own few daily partitions on every read and never persisted.
+WEEKLY_BAR_INDEX = "_index.json"
+WEEKLY_BAR_COLUMNS = ["symbol", "date", "open", "high", "low", "close", "volume"]
+
+
+def _weeks(manifest):
+    # {week label "YYYY-MM-DD": [(trading date, sha256), ...]} in date order
+    entries = sorted((entry["date"], entry["sha256"]) for entry in manifest.values())
+    labels = week_label([date_str for date_str, _ in entries]).strftime("%Y-%m-%d") if entries else []
+
+    weeks = {}
+    for label, entry in zip(labels, entries):
+        weeks.setdefault(label, []).append(entry)
+    return weeks
+
+
+def _week_fingerprint(entries):
+    return hashlib.sha256(";".join(f"{d}:{sha}" for d, sha in entries).encode()).hexdigest()
+
+
+def _aggregate_week(entries, store_dir):
+    daily = read_store(store_dir, start=entries[0][0], end=entries[-1][0])
+    return aggregate_weekly_data(daily)[WEEKLY_BAR_COLUMNS]
+
+
+def _write_week(df: pd.DataFrame, label, bar_dir):
+    with replace_atomically(partition_path(label, bar_dir)) as tmp_path:
+        df.to_parquet(tmp_path, index=False)
+
+
+def sync_weekly_bars(data_dir=DATA_DIR, bar_dir=WEEKLY_BAR_DIR, verbose=True):
+    # Freezes every completed week whose bhavcopies are new or changed. A week is complete once the
+    # store holds a trading date past its closing Monday. Returns (weeks, in-progress week label or None).
+    store_dir, manifest_path = store_paths(data_dir)
+    sync_store(data_dir, verbose=verbose)
+    weeks = _weeks(load_manifest(manifest_path))
+    if not weeks:
+        return weeks, None
+
+    latest_date = max(entries[-1][0] for entries in weeks.values())
+    labels = sorted(weeks)
+    open_week = labels[-1] if latest_date < labels[-1] else None
+
+    with file_lock(os.path.join(bar_dir, LOCK_FILE)):
+        index_path = os.path.join(bar_dir, WEEKLY_BAR_INDEX)
+        index = load_manifest(index_path)
+        frozen = set(list_store_dates(bar_dir))
+
+        pending = [
+            label for label in labels
+            if label != open_week and (label not in frozen or index.get(label) != _week_fingerprint(weeks[label]))
+        ]
+        if verbose and pending:
+            print(f"[INFO] Freezing {len(pending)} completed weeks into {bar_dir}")
+
+        for label in pending:
+            _write_week(_aggregate_week(weeks[label], store_dir), label, bar_dir)
+            index[label] = _week_fingerprint(weeks[label])
+        if pending:
+            save_manifest(index, index_path)
+
+    return weeks, open_week
+
+
+def load_weekly_bars(data_dir=DATA_DIR, weeks=None, partial_week=True, bar_dir=WEEKLY_BAR_DIR, verbose=True) -> pd.DataFrame:
+    # Same frame as aggregate_weekly_data over the daily history, read from frozen weeks.
+    # weeks: only the latest N bars per call (N frozen partitions + the open week), so a
+    # prediction read does not grow with history.
+    # partial_week=False drops the week in progress, e.g. to train only on closed bars mid-week.
+    all_weeks, open_week = sync_weekly_bars(data_dir, bar_dir, verbose=verbose)
+
+    frozen = [label for label in sorted(all_weeks) if label != open_week]
+    if weeks:
+        frozen = frozen[-weeks:]
+
+    frames = []
+    if frozen:
+        dataset = ds.dataset([partition_path(label, bar_dir) for label in frozen], format="parquet")
+        frames.append(dataset.to_table().to_pandas())
+    if partial_week and open_week is not None:
+        frames.append(_aggregate_week(all_weeks[open_week], store_paths(data_dir)[0]))
+
+    if not frames:
+        return pd.DataFrame(columns=WEEKLY_BAR_COLUMNS + ["partial_week"])
+
+    df = pd.concat(frames, ignore_index=True)
+    df["date"] = pd.to_datetime(df["date"])
+    df["partial_week"] = df["date"] == pd.Timestamp(open_week) if open_week else False
+    df.sort_values(by=["symbol", "date"], inplace=True, kind="stable")
+    df.reset_index(drop=True, inplace=True)
+    return df
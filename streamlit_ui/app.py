@@ -8,6 +8,7 @@ import plotly.express as px
 
 from core.trainer.trainer import run_daily_training
 from core.trainer.weekly_trainer import run_weekly_training
+from core.trainer.multi_timeframe_trainer import run_combined_training
 from core.predictor.predictor import run_daily_prediction
 from core.predictor.weekly_predictor import run_weekly_prediction
 from core.backtest.backtest import run_daily_backtest
@@ -64,7 +65,7 @@ elif pipeline_option == "⚙️ Train Model":
     st.subheader("🛠️ Model Training")
     col1, col2 = st.columns(2)
     with col1:
-        model_type = st.selectbox("Model Type", ["Daily", "Weekly"])
+        model_type = st.selectbox("Model Type", ["Daily", "Weekly", "Daily + Weekly"])
     with col2:
         train_button = st.button("🚀 Start Training", use_container_width=True)
     
@@ -72,8 +73,10 @@ elif pipeline_option == "⚙️ Train Model":
         with st.spinner(f"Training {model_type.lower()} model..."):
             if model_type == "Daily":
                 run_daily_training()
-            else:
+            elif model_type == "Weekly":
                 run_weekly_training()
+            else:
+                run_combined_training()
         st.success(f"🎉 {model_type} model trained successfully!")
 
 # Predictions Section
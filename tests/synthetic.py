@@ -0,0 +1,32 @@
+# tests/synthetic.py
+
+import numpy as np
+import pandas as pd
+
+
+def write_bhavcopies(data_dir, dates, symbols, skip=None, seed=0, only=None):
+    # Synthetic NSE bhavcopies, one DDMMYYYY.csv per date; skip: {symbol: dates it did not trade}.
+    # The same arguments always give the same files; only: write just these dates (a later session)
+    rng = np.random.default_rng(seed)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    closes = 100 + rng.normal(0, 1, (len(dates), len(symbols))).cumsum(axis=0)
+    for i, date in enumerate(pd.DatetimeIndex(dates)):
+        if only is not None and date not in only:
+            continue
+        rows = []
+        day_rng = np.random.default_rng([seed, i])
+        for j, symbol in enumerate(symbols):
+            if skip and date.strftime("%Y-%m-%d") in skip.get(symbol, ()):
+                continue
+            close = round(float(closes[i, j]), 2)
+            spread = abs(day_rng.normal(0, 1.5)) + 0.05
+            rows.append({
+                "SYMBOL": symbol, "SERIES": "EQ",
+                "OPEN_PRICE": round(close + day_rng.normal(0, 0.5), 2),
+                "HIGH_PRICE": round(close + spread, 2), "LOW_PRICE": round(close - spread, 2),
+                "CLOSE_PRICE": close,
+                "TTL_TRD_QNTY": int(day_rng.integers(10_000, 1_000_000)),
+                "DELIV_QTY": int(day_rng.integers(1_000, 10_000)),
+            })
+        pd.DataFrame(rows).to_csv(data_dir / f"{date:%d%m%Y}.csv", index=False)
+
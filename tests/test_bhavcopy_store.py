@@ -0,0 +1,65 @@
+# tests/test_bhavcopy_store.py
+
+import os
+
+import pandas as pd
+
+from core.utils.bhavcopy_store import list_store_dates, partition_path, read_store, store_paths, sync_store
+from core.utils.ingest_manifest import load_manifest
+from tests.synthetic import write_bhavcopies
+
+SYMBOLS = ["AAA", "BBB", "CCC"]
+
+
+def _stamps(store_dir):
+    return {date_str: os.stat(partition_path(date_str, store_dir)).st_mtime_ns for date_str in list_store_dates(store_dir)}
+
+
+def test_reingest_is_idempotent(tmp_path):
+    data_dir = tmp_path / "bhavcopies"
+    dates = pd.bdate_range("2023-01-02", periods=8)
+    write_bhavcopies(data_dir, dates, SYMBOLS)
+    store_dir, manifest_path = store_paths(str(data_dir))
+
+    assert sync_store(str(data_dir), verbose=False) == len(dates)
+    manifest, stamps = load_manifest(manifest_path), _stamps(store_dir)
+    stored = read_store(store_dir)
+    assert list_store_dates(store_dir) == [f"{date:%Y-%m-%d}" for date in dates]
+    assert len(stored) == len(dates) * len(SYMBOLS)
+    first = pd.read_csv(data_dir / f"{dates[0]:%d%m%Y}.csv")
+    assert stored.loc[stored["date"] == f"{dates[0]:%Y-%m-%d}", "close"].tolist() == first["CLOSE_PRICE"].tolist()
+
+    # Nothing changed: nothing parsed, manifest and partitions untouched
+    assert sync_store(str(data_dir), verbose=False) == 0
+    assert load_manifest(manifest_path) == manifest
+    assert _stamps(store_dir) == stamps
+
+    # Touched but identical: only the manifest's stat fields move
+    path = data_dir / f"{dates[3]:%d%m%Y}.csv"
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    assert sync_store(str(data_dir), verbose=False) == 0
+    touched = load_manifest(manifest_path)[path.name]
+    assert touched["mtime"] == 1.0 and touched["sha256"] == manifest[path.name]["sha256"]
+    assert _stamps(store_dir) == stamps
+
+
+def test_changed_renamed_and_removed_files(tmp_path):
+    data_dir = tmp_path / "bhavcopies"
+    dates = pd.bdate_range("2023-01-02", periods=6)
+    write_bhavcopies(data_dir, dates, SYMBOLS)
+    store_dir, manifest_path = store_paths(str(data_dir))
+    sync_store(str(data_dir), verbose=False)
+
+    # A corrected file is parsed again, and only that one
+    changed = f"{dates[2]:%Y-%m-%d}"
+    write_bhavcopies(data_dir, dates, SYMBOLS, seed=1, only=dates[2:3])
+    assert sync_store(str(data_dir), verbose=False) == 1
+    corrected = pd.read_csv(data_dir / f"{dates[2]:%d%m%Y}.csv")
+    assert read_store(store_dir, start=changed, end=changed)["close"].tolist() == corrected["CLOSE_PRICE"].tolist()
+
+    # A deleted file takes its partition with it; an NSE download name is normalised and ingested
+    os.remove(data_dir / f"{dates[0]:%d%m%Y}.csv")
+    os.rename(data_dir / f"{dates[5]:%d%m%Y}.csv", data_dir / f"sec_bhavdata_full_{dates[5]:%d%m%Y}.csv")
+    sync_store(str(data_dir), verbose=False)
+    assert list_store_dates(store_dir) == [f"{date:%Y-%m-%d}" for date in dates[1:]]
+    assert sorted(load_manifest(manifest_path)) == sorted(f"{date:%d%m%Y}.csv" for date in dates[1:])
@@ -0,0 +1,59 @@
+# tests/test_feature_cache.py
+
+import pandas as pd
+
+from core.features.feature_cache import (current_feature_cache, read_cache_index, read_feature_cache, serving_features,
+                                        sync_feature_cache)
+from core.features.feature_engineer import create_features
+from core.features.registry import DAILY_FEATURE_COLUMNS, lookback_rows
+from core.utils.bhavcopy_store import list_store_dates, store_paths
+from core.utils.ingest_manifest import load_manifest
+from core.utils.load_multiple_bhavcopies import load_multiple_bhavcopies
+from tests.synthetic import write_bhavcopies
+
+SYMBOLS = ["AAA", "BBB", "CCC"]
+
+
+def test_new_day_matches_full_history_after_a_suspension(tmp_path):
+    # BBB is suspended for longer than the lookback, so its window on the new day reaches back past
+    # the last lookback_rows trading dates
+    bhavcopy_dir = tmp_path / "bhavcopies"
+    window = lookback_rows(DAILY_FEATURE_COLUMNS)
+    dates = pd.bdate_range("2023-01-02", periods=window * 3)
+    suspended = {"BBB": {date.strftime("%Y-%m-%d") for date in dates[-window - 10:-3]}}
+    write_bhavcopies(bhavcopy_dir, dates, SYMBOLS, skip=suspended, only=dates[:-1])
+    cache_dir = tmp_path / "feature_cache"
+    path = sync_feature_cache(DAILY_FEATURE_COLUMNS, str(bhavcopy_dir), str(cache_dir), verbose=False)
+    before = read_cache_index(path)
+
+    # The next session arrives: only it and yesterday's target are recomputed
+    write_bhavcopies(bhavcopy_dir, dates, SYMBOLS, skip=suspended, only=dates[-1:])
+    path = sync_feature_cache(DAILY_FEATURE_COLUMNS, str(bhavcopy_dir), str(cache_dir), verbose=False)
+    after = read_cache_index(path)
+    assert [date for date in after if before.get(date) != after[date]] == [f"{dates[-2]:%Y-%m-%d}", f"{dates[-1]:%Y-%m-%d}"]
+
+    cached = read_feature_cache(path, compact=False)
+    full = create_features(load_multiple_bhavcopies(str(bhavcopy_dir), verbose=False), features=DAILY_FEATURE_COLUMNS, compact=False)
+    full = full.sort_values(["symbol", "date"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(cached[full.columns], full, check_dtype=False)
+
+
+def test_read_only_check_sees_new_bhavcopies_without_ingesting(tmp_path):
+    # What the API's model cache runs: it decides whether to submit a sync job, and writes nothing
+    bhavcopy_dir, cache_dir = tmp_path / "bhavcopies", str(tmp_path / "feature_cache")
+    dates = pd.bdate_range("2023-01-02", periods=30)
+    write_bhavcopies(bhavcopy_dir, dates, SYMBOLS, only=dates[:-1])
+    path = sync_feature_cache(DAILY_FEATURE_COLUMNS, str(bhavcopy_dir), cache_dir, verbose=False)
+    assert current_feature_cache(DAILY_FEATURE_COLUMNS, str(bhavcopy_dir), cache_dir, ingest=False) == path
+
+    write_bhavcopies(bhavcopy_dir, dates, SYMBOLS, only=dates[-1:])
+    store_dir, manifest_path = store_paths(str(bhavcopy_dir))
+    manifest = load_manifest(manifest_path)
+    assert current_feature_cache(DAILY_FEATURE_COLUMNS, str(bhavcopy_dir), cache_dir, ingest=False) is None
+    assert load_manifest(manifest_path) == manifest
+    assert list_store_dates(store_dir)[-1] == f"{dates[-2]:%Y-%m-%d}"
+
+    # A pruned model's columns are served from the same full cache
+    assert serving_features(DAILY_FEATURE_COLUMNS[-3:]) == list(DAILY_FEATURE_COLUMNS)
+    sync_feature_cache(serving_features(DAILY_FEATURE_COLUMNS[-3:]), str(bhavcopy_dir), cache_dir, verbose=False)
+    assert current_feature_cache(DAILY_FEATURE_COLUMNS, str(bhavcopy_dir), cache_dir, ingest=False) == path
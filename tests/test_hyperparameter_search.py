@@ -0,0 +1,19 @@
+# tests/test_hyperparameter_search.py
+
+import pytest
+
+from core.trainer.hyperparameter_search import rung_budgets
+
+
+@pytest.mark.parametrize("n_candidates, n_dates, expected", [
+    (27, 1500, [166, 500, 1500]),
+    (27, 158, [60, 158]),   # 17 and 52 are both raised to 60: one rung, not two on the same window
+    (27, 400, [60, 133, 400]),
+    (27, 40, [40]),         # less history than min_dates: everything is scored once on all of it
+    (1, 500, [500]),
+])
+def test_rung_budgets_grow_strictly_and_end_on_full_history(n_candidates, n_dates, expected):
+    budgets = rung_budgets(n_candidates, n_dates, eta=3, min_dates=60)
+    assert budgets == expected
+    assert all(a < b for a, b in zip(budgets, budgets[1:]))
+    assert budgets[-1] == n_dates
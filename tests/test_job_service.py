@@ -0,0 +1,86 @@
+# tests/test_job_service.py
+
+import time
+
+import pytest
+
+from api.services.job_service import JobManager
+
+
+def nap(seconds=0.0, tag=None):
+    # Job bodies run in spawned workers, so they live at module level
+    time.sleep(seconds)
+    return {'status': 'success', 'tag': tag}
+
+
+def service_error():
+    return {'status': 'error', 'message': 'no model'}
+
+
+def crash():
+    raise RuntimeError("boom")
+
+
+def _wait(manager, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in ('succeeded', 'failed', 'cancelled'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} still {job['status']}")
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(workers=2, history=2)
+    yield manager
+    manager.shutdown()
+
+
+def test_identical_live_submissions_share_a_job(manager):
+    first = manager.submit('nap', nap, seconds=1.0, tag='a')
+    again = manager.submit('nap', nap, tag='a', seconds=1.0)
+    other = manager.submit('nap', nap, seconds=1.0, tag='b')
+    assert not first['deduplicated'] and again == {**first, 'deduplicated': True}
+    assert other['job_id'] != first['job_id']
+
+    job = _wait(manager, first['job_id'])
+    assert job['status'] == 'succeeded' and job['result']['tag'] == 'a'
+    # Once finished, the same submission runs again
+    assert manager.submit('nap', nap, seconds=1.0, tag='a')['job_id'] != first['job_id']
+
+
+def test_exclusive_kind_dedups_across_params(manager):
+    first = manager.submit('train', nap, exclusive=True, seconds=1.0, tag='full')
+    second = manager.submit('train', nap, exclusive=True, seconds=0.0, tag='incremental')
+    assert second['job_id'] == first['job_id'] and second['deduplicated']
+
+
+def test_failures_are_reported(manager):
+    crashed = _wait(manager, manager.submit('crash', crash)['job_id'])
+    assert crashed['status'] == 'failed' and 'boom' in crashed['error']
+    reported = _wait(manager, manager.submit('service', service_error)['job_id'])
+    assert reported['status'] == 'failed' and reported['error'] == 'no model'
+
+
+def test_oldest_finished_jobs_are_trimmed(manager):
+    ids = []
+    for tag in range(4):
+        ids.append(manager.submit('nap', nap, tag=tag)['job_id'])
+        _wait(manager, ids[-1])
+    assert [manager.get(job_id) is None for job_id in ids] == [True, True, False, False]
+
+
+def test_live_jobs_are_never_trimmed(manager):
+    finished = manager.submit('nap', nap, tag='done')['job_id']
+    _wait(manager, finished)
+    live = [manager.submit('nap', nap, seconds=2.0, tag=tag)['job_id'] for tag in range(3)]
+
+    # Over the history limit while they run: only the finished job may go
+    assert manager.get(finished) is None
+    assert all(manager.get(job_id)['status'] in ('queued', 'running') for job_id in live)
+
+    # Finished, they are trimmed like any other: the last one to finish is kept
+    _wait(manager, live[-1])
+    assert sum(manager.get(job_id) is not None for job_id in live) == 2
@@ -0,0 +1,75 @@
+# tests/test_kernels.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.features.kernels import GroupedRolling, rolling_linregress
+
+
+def _panel(seed=0):
+    # (symbol, date)-sorted closes: very different price levels, scattered NaNs, and symbols shorter
+    # than the longest window (a single row included)
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i, (n_rows, level) in enumerate([(3, 50000), (40, 10), (25, 3000), (1, 5), (60, 50000), (19, 120)]):
+        close = level * np.exp(np.cumsum(rng.normal(0, 0.02, n_rows)))
+        close[rng.random(n_rows) < 0.08] = np.nan
+        frames.append(pd.DataFrame({"symbol": f"S{i}", "close": close}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _reference(df, fn):
+    return df.groupby("symbol", sort=False)["close"].transform(fn).to_numpy()
+
+
+def _assert_matches(got, expected, rtol=1e-9):
+    np.testing.assert_array_equal(np.isnan(got), np.isnan(expected))
+    np.testing.assert_allclose(got, expected, rtol=rtol, equal_nan=True)
+
+
+@pytest.mark.parametrize("window", [1, 5, 20, 70])
+@pytest.mark.parametrize("op", ["mean", "sum", "std", "min", "max"])
+def test_rolling_matches_pandas_groupby_rolling(op, window):
+    df = _panel()
+    got = GroupedRolling(df).rolling("close", window, op)
+    _assert_matches(got, _reference(df, lambda x: getattr(x.rolling(window), op)()))
+
+
+@pytest.mark.parametrize("periods", [1, 3, -2])
+def test_shift_diff_pct_change_stay_inside_symbols(periods):
+    df = _panel()
+    g = GroupedRolling(df)
+    _assert_matches(g.shift("close", periods), _reference(df, lambda x: x.shift(periods)))
+    _assert_matches(g.diff("close", periods), _reference(df, lambda x: x.diff(periods)))
+    _assert_matches(g.pct_change("close", periods), _reference(df, lambda x: x / x.shift(periods) - 1))
+
+
+def test_ewm_mean_matches_pandas_adjust_false():
+    df = _panel()
+    got = GroupedRolling(df).ewm_mean("close", span=5)
+    _assert_matches(got, _reference(df, lambda x: x.ewm(span=5, adjust=False).mean()))
+
+
+@pytest.mark.parametrize("window", [2, 5, 20])
+def test_linregress_matches_polyfit(window):
+    df = _panel()
+    positions = GroupedRolling(df).positions
+    got = rolling_linregress(df["close"].to_numpy(), window, positions, intercept=True, r2=True)
+
+    def fit(values):
+        slope, intercept = np.polyfit(np.arange(window), values, 1)
+        r2 = np.corrcoef(np.arange(window), values)[0, 1] ** 2 if window > 2 else 1.0
+        return slope, intercept, r2
+
+    for i, name in enumerate(["slope", "intercept", "r2"]):
+        expected = _reference(df, lambda x: x.rolling(window).apply(lambda v: fit(v)[i], raw=True))
+        _assert_matches(got[name], expected, rtol=1e-7)
+
+
+def test_std_keeps_precision_on_high_priced_flat_windows():
+    # Σx² - (Σx)²/n on 50,000-rupee closes would lose every digit of a one-paisa spread
+    close = 50000 + np.tile([0.0, 0.01], 30)
+    df = pd.DataFrame({"symbol": "S", "close": close})
+    got = GroupedRolling(df).rolling("close", 20, "std")
+    _assert_matches(got, df["close"].rolling(20).std().to_numpy(), rtol=1e-6)
@@ -0,0 +1,46 @@
+# tests/test_lgbm_dataset.py
+
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from lightgbm import LGBMClassifier
+
+from core.features.registry import DAILY_FEATURE_COLUMNS
+from core.trainer.lgbm_dataset import DATASET_PARAMS, BoosterClassifier, fit_lgbm_from_dataset
+
+
+def _training_set(n_rows=2000, seed=11):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n_rows, len(DAILY_FEATURE_COLUMNS))), columns=DAILY_FEATURE_COLUMNS)
+    X.iloc[::13, 4] = np.nan
+    y = pd.Series((X.iloc[:, :3].sum(axis=1) + rng.normal(0, 1, len(X)) > 0).astype(int))
+    return X, y
+
+
+def _fit_pair(X, y, rows):
+    # Bins from the training rows only, as a walk-forward fold would see them
+    dataset = lgb.Dataset(X.iloc[rows], label=y.iloc[rows].to_numpy(np.float32), params=DATASET_PARAMS).construct()
+    fitted = fit_lgbm_from_dataset(LGBMClassifier(n_estimators=40, random_state=0, verbose=-1), dataset)
+    reference = LGBMClassifier(n_estimators=40, random_state=0, verbose=-1, feature_pre_filter=False).fit(X.iloc[rows], y.iloc[rows])
+    return fitted, reference
+
+
+def test_fit_from_the_binned_dataset_matches_fit_on_the_rows():
+    X, y = _training_set()
+    fitted, reference = _fit_pair(X, y, np.arange(1500))
+
+    assert isinstance(fitted, BoosterClassifier)
+    np.testing.assert_array_equal(fitted.classes_, reference.classes_)
+    np.testing.assert_array_equal(fitted.feature_importances_, reference.feature_importances_)
+    np.testing.assert_allclose(fitted.predict_proba(X), reference.predict_proba(X), rtol=0, atol=1e-12)
+
+
+def test_warm_start_boosts_like_lgbm_classifier():
+    X, y = _training_set()
+    fitted, reference = _fit_pair(X, y, np.arange(1500))
+    recent = slice(1000, 2000)
+
+    fitted.set_params(n_estimators=10).fit(X.iloc[recent], y.iloc[recent], init_model=fitted.booster_)
+    reference.set_params(n_estimators=10).fit(X.iloc[recent], y.iloc[recent], init_model=reference.booster_)
+    assert fitted.booster_.num_trees() == reference.booster_.num_trees() == 50
+    np.testing.assert_allclose(fitted.predict_proba(X), reference.predict_proba(X), rtol=0, atol=1e-12)
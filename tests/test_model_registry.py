@@ -0,0 +1,92 @@
+# tests/test_model_registry.py
+
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from core.utils import model_registry
+from core.utils.model_registry import (current_version, list_versions, load_model, load_model_meta, promote_model,
+                                       register_model, rollback_model)
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    # Versions are named after their creation second: each registration here lands one second later
+    class Clock(datetime):
+        tick = 0
+
+        @classmethod
+        def now(cls, tz=None):
+            cls.tick += 1
+            return datetime(2024, 1, 1) + timedelta(seconds=cls.tick)
+
+    monkeypatch.setattr(model_registry, "datetime", Clock)
+    return str(tmp_path / "registry")
+
+
+def _register(registry, i, **kwargs):
+    model = {"coef": np.arange(5, dtype=np.float64) * i}
+    return register_model(model, "daily", {"train_end": f"2024-01-{i + 1:02d}"}, registry_dir=registry, **kwargs)
+
+
+def test_register_promotes_and_round_trips(registry):
+    version = _register(registry, 1)
+    assert current_version("daily", registry) == version
+
+    model, meta = load_model("daily", registry_dir=registry, verify=True)
+    np.testing.assert_array_equal(model["coef"], np.arange(5) * 1.0)
+    assert meta["version"] == version and meta["train_end"] == "2024-01-02"
+    assert meta == load_model_meta("daily", version, registry)
+
+    # Not promoted: registered and loadable by version, current stays where it was
+    staged = _register(registry, 2, promote=False)
+    assert current_version("daily", registry) == version
+    assert load_model("daily", staged, registry_dir=registry)[1]["version"] == staged
+    assert load_model("other", registry_dir=registry) == (None, None)
+
+
+def test_rollback_walks_back_through_promotions(registry):
+    v1, v2, v3 = (_register(registry, i) for i in (1, 2, 3))
+    assert rollback_model("daily", registry) == v2
+    assert rollback_model("daily", registry) == v1
+    with pytest.raises(ValueError):
+        rollback_model("daily", registry)
+
+    # Promoting again puts the replaced version back on the history
+    promote_model("daily", v3, registry)
+    assert rollback_model("daily", registry) == v1
+    with pytest.raises(ValueError):
+        promote_model("daily", "20990101T000000-deadbeef", registry)
+
+
+def test_pruning_keeps_newest_and_rollback_targets(registry, monkeypatch):
+    monkeypatch.setattr(model_registry, "MODEL_REGISTRY_KEEP", 3)
+    versions = [_register(registry, i) for i in range(1, 7)]
+
+    # Newest three, plus the one the pointer can still roll back to beyond them
+    assert list_versions("daily", registry) == versions[2:]
+    assert [rollback_model("daily", registry) for _ in range(3)] == versions[4:1:-1]
+    with pytest.raises(ValueError):
+        rollback_model("daily", registry)
+
+    # A staged (unpromoted) version is pruned like any other once it is old enough
+    staged = _register(registry, 7, promote=False)
+    for i in range(8, 11):
+        _register(registry, i)
+    assert staged not in list_versions("daily", registry)
+
+
+def test_verify_rejects_a_modified_model_file(registry):
+    version = _register(registry, 1)
+    load_model("daily", registry_dir=registry, verify=True)
+
+    path = os.path.join(registry, "daily", version, model_registry.MODEL_FILE)
+    with open(path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 0xFF]))
+    with pytest.raises(ValueError, match="sha256"):
+        load_model("daily", registry_dir=registry, verify=True)
@@ -0,0 +1,50 @@
+# tests/test_online_state.py
+
+import numpy as np
+import pandas as pd
+
+from core.features.feature_engineer import create_features
+from core.features import online_state
+from core.features.online_state import FEATURE_COLUMNS, OnlineFeatureState, build_feature_state
+from core.features.registry import OUTPUT_FEATURES
+from core.utils.load_multiple_bhavcopies import load_multiple_bhavcopies
+from tests.synthetic import write_bhavcopies
+
+
+def test_online_state_matches_create_features(tmp_path):
+    # Replaying day by day gives the rows create_features computes over the full history, including
+    # for a symbol that skipped sessions and one listed part way through
+    dates = pd.bdate_range("2023-01-02", periods=80)
+    skip = {
+        "BBB": {f"{date:%Y-%m-%d}" for date in dates[30:45]},
+        "CCC": {f"{date:%Y-%m-%d}" for date in dates[:50]},
+    }
+    write_bhavcopies(tmp_path / "bhavcopies", dates, ["AAA", "BBB", "CCC"], skip=skip)
+    df = load_multiple_bhavcopies(str(tmp_path / "bhavcopies"), verbose=False)
+
+    state = build_feature_state(df[df["date"] < f"{dates[-1]:%Y-%m-%d}"])
+    latest = state.apply(df)
+    expected = create_features(df, predict_mode=True, features=FEATURE_COLUMNS, compact=False)
+
+    latest = latest.sort_values("symbol").reset_index(drop=True)
+    expected = expected.sort_values("symbol").reset_index(drop=True)
+    assert latest["symbol"].tolist() == expected["symbol"].tolist()
+    np.testing.assert_allclose(latest[FEATURE_COLUMNS].to_numpy(np.float64), expected[FEATURE_COLUMNS].to_numpy(np.float64), rtol=1e-9, atol=1e-12)
+
+
+def test_checkpoint_is_keyed_by_feature_code(tmp_path, monkeypatch):
+    dates = pd.bdate_range("2023-01-02", periods=30)
+    write_bhavcopies(tmp_path / "bhavcopies", dates, ["AAA", "BBB"])
+    df = load_multiple_bhavcopies(str(tmp_path / "bhavcopies"), verbose=False)
+    path = str(tmp_path / "feature_state.npz")
+    state = build_feature_state(df)
+    state.save(path)
+
+    loaded = OnlineFeatureState.load(path)
+    assert FEATURE_COLUMNS == OUTPUT_FEATURES
+    assert loaded.last_date == state.last_date
+    np.testing.assert_array_equal(loaded.buffers["close"], state.buffers["close"])
+
+    # Edited feature code: the checkpoint is not rolled forward, the caller rebuilds it
+    monkeypatch.setattr(online_state, "state_code_version", lambda: "edited")
+    assert OnlineFeatureState.load(path) is None
@@ -0,0 +1,56 @@
+# tests/test_parallel_fit.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.base import clone
+
+from core.features.registry import DAILY_FEATURE_COLUMNS
+from core.trainer.ensemble_trainer import build_ensemble
+from core.trainer.lgbm_dataset import BoosterClassifier
+from core.trainer.parallel_fit import apply_thread_budget, fit_ensemble
+
+
+def _training_set(n_rows=400, seed=7):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n_rows, len(DAILY_FEATURE_COLUMNS))), columns=DAILY_FEATURE_COLUMNS)
+    y = pd.Series((X.iloc[:, :3].sum(axis=1) + rng.normal(0, 1, n_rows) > 0).astype(int))
+    return X, y
+
+
+@pytest.mark.parametrize("dropped", [None, "lr"])
+def test_fit_ensemble_matches_voting_classifier_fit(dropped):
+    X, y = _training_set()
+    ensemble = build_ensemble()
+    if dropped:
+        ensemble.set_params(**{dropped: "drop"})
+    reference = clone(ensemble).fit(X, y)
+    fit_ensemble(ensemble, X, y, concurrent=1)
+
+    assert set(vars(ensemble)) == set(vars(reference))
+    assert list(ensemble.named_estimators_) == list(reference.named_estimators_)
+    assert ensemble.n_features_in_ == reference.n_features_in_ == X.shape[1]
+    assert list(ensemble.feature_names_in_) == list(reference.feature_names_in_)
+    np.testing.assert_array_equal(ensemble.classes_, reference.classes_)
+    np.testing.assert_allclose(ensemble.predict_proba(X), reference.predict_proba(X))
+
+
+def test_fit_ensemble_rejects_what_voting_classifier_rejects():
+    X, y = _training_set()
+    with pytest.raises(ValueError):
+        fit_ensemble(build_ensemble(), X, X.iloc[:, 0], concurrent=1)
+    with pytest.raises(ValueError):
+        fit_ensemble(build_ensemble().set_params(weights=[1, 1]), X, y, concurrent=1)
+
+
+def test_thread_budget_reaches_fitted_members():
+    # Warm starts train the fitted members, not the templates in ensemble.estimators
+    X, y = _training_set()
+    ensemble = build_ensemble()
+    fit_ensemble(ensemble, X, y, concurrent=1)
+    ensemble.named_estimators_["lgbm"] = BoosterClassifier(params={"objective": "binary", "n_jobs": 1})
+
+    apply_thread_budget(ensemble, {"rf": 3, "lgbm": 2, "lr": 1})
+    assert ensemble.named_estimators_["rf"].n_jobs == 3
+    assert ensemble.named_estimators_["lgbm"].params == {"objective": "binary", "n_jobs": 2}
+    assert ensemble.get_params()["rf__n_jobs"] == 3
@@ -0,0 +1,22 @@
+# tests/test_scoring.py
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+
+from core.predictor.scoring import predict_with_proba
+
+
+def test_one_pass_gives_predict_and_predict_proba():
+    rng = np.random.default_rng(5)
+    X = pd.DataFrame(rng.normal(size=(400, 6)), columns=[f"f{i}" for i in range(6)])
+    y = pd.Series(np.where(X["f0"] + rng.normal(0, 1, len(X)) > 0, 1, 0))
+    model = VotingClassifier([
+        ("rf", RandomForestClassifier(n_estimators=20, random_state=0)),
+        ("lr", LogisticRegression(max_iter=1000)),
+    ], voting="soft").fit(X, y)
+
+    predictions, proba = predict_with_proba(model, X)
+    np.testing.assert_array_equal(predictions, model.predict(X))
+    np.testing.assert_array_equal(proba, model.predict_proba(X))
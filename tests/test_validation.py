@@ -0,0 +1,94 @@
+# tests/test_validation.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression
+
+from core.trainer.validation import fold_metrics, walk_forward_folds, walk_forward_validate
+
+
+def _row_dates(n_dates=60, seed=0):
+    # Sorted row dates with a different number of rows (symbols) on each trading day
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range("2023-01-02", periods=n_dates).strftime("%Y-%m-%d").to_numpy()
+    return np.repeat(days, rng.integers(1, 6, n_dates)), days
+
+
+@pytest.mark.parametrize("n_splits, embargo, horizon", [(5, 1, 1), (3, 0, 1), (4, 3, 2)])
+def test_no_training_date_inside_purge_and_embargo(n_splits, embargo, horizon):
+    dates, days = _row_dates()
+    position = {day: i for i, day in enumerate(days)}
+    folds = walk_forward_folds(dates, n_splits, embargo, horizon)
+    assert folds
+
+    for fold in folds:
+        train_dates = dates[slice(*fold["train_rows"])]
+        test_dates = dates[slice(*fold["test_rows"])]
+        # Trading-day window no training row may fall in: its label reaches into the test block, or it
+        # sits in the embargo on either side
+        lo = position[fold["test_start"]] - horizon - embargo
+        hi = position[fold["test_end"]] + embargo
+        train_positions = np.array([position[day] for day in train_dates])
+        assert not ((train_positions >= lo) & (train_positions <= hi)).any()
+        assert train_positions.max() == lo - 1   # nothing purged beyond the gap
+        assert set(test_dates) == set(days[position[fold["test_start"]]:position[fold["test_end"]] + 1])
+
+
+def test_fold_boundaries():
+    dates, days = _row_dates(n_dates=62)
+    folds = walk_forward_folds(dates, n_splits=5, embargo=1)
+    assert [fold["fold"] for fold in folds] == list(range(5))
+
+    for fold in folds:
+        start, end = fold["train_rows"]
+        assert start == 0 and fold["train_start"] == days[0]
+        assert dates[end - 1] == fold["train_end"] and dates[end] > fold["train_end"]
+        start, end = fold["test_rows"]
+        assert dates[start] == fold["test_start"] and dates[end - 1] == fold["test_end"]
+        assert start == 0 or dates[start - 1] < fold["test_start"]
+        assert end == len(dates) or dates[end] > fold["test_end"]
+
+    # Test blocks are back to back, equal in size but for the last, which runs to the newest date
+    blocks = [np.unique(dates[slice(*fold["test_rows"])]) for fold in folds]
+    assert all(a[-1] < b[0] for a, b in zip(blocks, blocks[1:]))
+    assert {len(block) for block in blocks[:-1]} == {62 // 6}
+    assert folds[-1]["test_end"] == days[-1] and folds[-1]["test_rows"][1] == len(dates)
+
+
+def test_folds_without_training_history_are_dropped():
+    dates, _ = _row_dates(n_dates=6)
+    folds = walk_forward_folds(dates, n_splits=5, embargo=1)
+    assert all(fold["train_rows"][1] > 0 for fold in folds)
+    assert len(folds) < 5
+    assert walk_forward_folds(dates[:1], n_splits=3) == []
+
+
+@pytest.mark.parametrize("dropna", [False, True])
+def test_validate_through_mapped_matrix_matches_in_memory_folds(dropna):
+    # Rows arrive unsorted; workers read the saved .npy matrices memory-mapped
+    dates, _ = _row_dates(n_dates=80, seed=3)
+    rng = np.random.default_rng(3)
+    X = pd.DataFrame(rng.normal(size=(len(dates), 4)), columns=list("abcd"))
+    y = pd.Series((X["a"] + rng.normal(0, 1, len(X)) > 0).astype(int))
+    if dropna:
+        X.iloc[rng.choice(len(X), 15, replace=False), 1] = np.nan
+    shuffle = rng.permutation(len(dates))
+    estimator = LogisticRegression(max_iter=1000)
+
+    report = walk_forward_validate(estimator, X.iloc[shuffle], y.iloc[shuffle], dates[shuffle],
+                                   n_splits=3, embargo=1, workers=2, dropna=dropna)
+
+    folds = walk_forward_folds(dates, n_splits=3, embargo=1)
+    assert len(report) == len(folds)
+    for fold, (_, row) in zip(folds, report.iterrows()):
+        train, test = X.iloc[slice(*fold["train_rows"])], X.iloc[slice(*fold["test_rows"])]
+        y_train, y_test = y.iloc[slice(*fold["train_rows"])], y.iloc[slice(*fold["test_rows"])]
+        if dropna:
+            keep_train, keep_test = train.notna().all(axis=1), test.notna().all(axis=1)
+            train, y_train, test, y_test = train[keep_train], y_train[keep_train], test[keep_test], y_test[keep_test]
+        expected = fold_metrics(clone(estimator).fit(train.to_numpy(), y_train.to_numpy()), test.to_numpy(), y_test.to_numpy())
+        assert row["train_rows"] == len(y_train) and row["test_rows"] == len(y_test)
+        for metric, value in expected.items():
+            assert row[metric] == pytest.approx(value)
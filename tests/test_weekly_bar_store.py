@@ -0,0 +1,67 @@
+# tests/test_weekly_bar_store.py
+
+import os
+
+import pandas as pd
+
+from core.utils.aggregate_weekly import aggregate_weekly_data
+from core.utils.bhavcopy_store import list_store_dates, partition_path, read_store, store_paths
+from core.utils.weekly_bar_store import WEEKLY_BAR_COLUMNS, load_weekly_bars
+from tests.synthetic import write_bhavcopies
+
+SYMBOLS = ["AAA", "BBB", "CCC"]
+# Tue 2023-01-03 .. Fri 2023-01-27: W-MON weeks close on Mondays 01-09, 01-16, 01-23 and 01-30
+DATES = pd.bdate_range("2023-01-03", "2023-01-27")
+
+
+def _expected(data_dir):
+    df = aggregate_weekly_data(read_store(store_paths(str(data_dir))[0]))
+    df["date"] = pd.to_datetime(df["date"])
+    return df.sort_values(["symbol", "date"], kind="stable").reset_index(drop=True)
+
+
+def _load(data_dir, bar_dir, **kwargs):
+    return load_weekly_bars(str(data_dir), bar_dir=str(bar_dir), verbose=False, **kwargs)
+
+
+def test_partial_week_is_rebuilt_from_daily_partitions(tmp_path):
+    data_dir, bar_dir = tmp_path / "bhavcopies", tmp_path / "weekly"
+    # Through Wednesday 01-18: the week closing 01-23 is still in progress
+    write_bhavcopies(data_dir, DATES, SYMBOLS, only=DATES[DATES <= "2023-01-18"])
+    bars = _load(data_dir, bar_dir)
+    pd.testing.assert_frame_equal(bars[WEEKLY_BAR_COLUMNS], _expected(data_dir), check_dtype=False)
+    assert bars.loc[bars["partial_week"], "date"].unique().tolist() == [pd.Timestamp("2023-01-23")]
+    assert list_store_dates(str(bar_dir)) == ["2023-01-09", "2023-01-16"]   # the open week is never frozen
+
+    # Thursday lands: the open bar takes it in, frozen weeks stay as written
+    stamps = {label: os.stat(partition_path(label, str(bar_dir))).st_mtime_ns for label in list_store_dates(str(bar_dir))}
+    write_bhavcopies(data_dir, DATES, SYMBOLS, only=DATES[DATES == "2023-01-19"])
+    bars = _load(data_dir, bar_dir)
+    pd.testing.assert_frame_equal(bars[WEEKLY_BAR_COLUMNS], _expected(data_dir), check_dtype=False)
+    assert {label: os.stat(partition_path(label, str(bar_dir))).st_mtime_ns for label in stamps} == stamps
+
+    # Closed bars only, and only the latest N of them
+    closed = _load(data_dir, bar_dir, partial_week=False)
+    assert not closed["partial_week"].any() and closed["date"].max() == pd.Timestamp("2023-01-16")
+    assert _load(data_dir, bar_dir, weeks=1, partial_week=False)["date"].unique().tolist() == [pd.Timestamp("2023-01-16")]
+
+
+def test_week_is_frozen_once_complete_and_refrozen_when_a_day_changes(tmp_path):
+    data_dir, bar_dir = tmp_path / "bhavcopies", tmp_path / "weekly"
+    write_bhavcopies(data_dir, DATES, SYMBOLS, only=DATES[DATES <= "2023-01-20"])
+    _load(data_dir, bar_dir)
+    assert "2023-01-23" not in list_store_dates(str(bar_dir))
+    # Monday 01-23 is the week's last session: the week is complete and frozen with it
+    write_bhavcopies(data_dir, DATES, SYMBOLS, only=DATES[DATES == "2023-01-23"])
+    bars = _load(data_dir, bar_dir)
+    assert "2023-01-23" in list_store_dates(str(bar_dir)) and not bars["partial_week"].any()
+    write_bhavcopies(data_dir, DATES, SYMBOLS, only=DATES[DATES == "2023-01-24"])
+    bars = _load(data_dir, bar_dir)
+    assert bars.loc[bars["partial_week"], "date"].unique().tolist() == [pd.Timestamp("2023-01-30")]
+
+    # A corrected bhavcopy inside a frozen week: that week alone is aggregated again
+    untouched = os.stat(partition_path("2023-01-09", str(bar_dir))).st_mtime_ns
+    write_bhavcopies(data_dir, DATES, SYMBOLS, seed=7, only=DATES[DATES == "2023-01-12"])
+    bars = _load(data_dir, bar_dir)
+    pd.testing.assert_frame_equal(bars[WEEKLY_BAR_COLUMNS], _expected(data_dir), check_dtype=False)
+    assert os.stat(partition_path("2023-01-09", str(bar_dir))).st_mtime_ns == untouched